@@ -0,0 +1,229 @@
+"""
+Database and API micro-benchmarks at configurable data sizes.
+
+Run from backend/:
+    python -m benchmarks.bench_db --scales 1000,100000 --output bench_db.json
+    python -m benchmarks.bench_db --scales 1000000 --repeat 3   # slow, needs a few GB of RAM
+
+For each scale N, seeds a fresh temporary SQLite file with N listings spread
+over the real sources, N/10 sublease posts and N/2 comments, then times the
+database.py functions and the /listings and /subleases endpoints (in-process,
+through httpx's ASGI transport, so no server or network is involved). Each
+operation is repeated and summarized as min / median / p95 / max milliseconds.
+The JSON report also records the git commit, Python and SQLite versions, so
+reports from two commits can be diffed directly.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx  # noqa: E402
+
+import database  # noqa: E402
+from main import app  # noqa: E402
+
+SOURCES = ["meridian", "playalife", "koto", "solis", "wolfe"]
+STREETS = ["Del Playa Dr", "Sabado Tarde Rd", "Trigo Rd", "Pasado Rd", "El Colegio Rd", "Embarcadero del Norte"]
+SEED_BATCH = 50_000
+
+
+def synthetic_listing(i: int, source: str, rng: random.Random) -> dict:
+    bedrooms = rng.choice([0, 1, 1, 2, 2, 3, 4, 5, None])
+    return {
+        "address": f"{6500 + i // 7} {rng.choice(STREETS)} Unit {i}",
+        "price": rng.choice([None] + list(range(900, 9000, 50))),
+        "bedrooms": bedrooms,
+        "bathrooms": rng.choice([1, 1.5, 2, 2.5, 3, None]),
+        "category": rng.choice(["Residential"] * 8 + ["Commercial", "Storage"]),
+        "square_feet": rng.choice([None, 450, 700, 950, 1200]),
+        "move_in_date": rng.choice([None, "Now", "Sep 15th, 2026", "Jul 1st, 2027"]),
+        "listing_link": f"https://example.com/{source}/{i}",
+        "source": source,
+    }
+
+
+def listings_by_source(scale: int, seed: int = 0) -> dict[str, list[dict]]:
+    rng = random.Random(seed)
+    grouped = {source: [] for source in SOURCES}
+    for i in range(scale):
+        source = SOURCES[i % len(SOURCES)]
+        grouped[source].append(synthetic_listing(i, source, rng))
+    return grouped
+
+
+async def seed(scale: int, grouped: dict[str, list[dict]]) -> dict:
+    """Listings go through upsert_listings; posts and comments are bulk-inserted."""
+    start = time.perf_counter()
+    for source, listings in grouped.items():
+        await database.upsert_listings(listings, source)
+
+    rng = random.Random(1)
+    posts = max(1, scale // 10)
+    comments = scale // 2
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    async with database._write() as db:
+        for offset in range(0, posts, SEED_BATCH):
+            await db.executemany(
+                """
+                INSERT INTO sublease_posts (title, location, rent, dates, description,
+                                            author_email, author_name, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (
+                        f"Sublease {i}", f"{6600 + i % 300} {rng.choice(STREETS)}", f"${rng.randint(700, 2500)}",
+                        "Summer 2027", "Furnished room, utilities included. " * 3,
+                        f"user{i % 5000}@ucsb.edu", f"User {i % 5000}",
+                        (base + timedelta(minutes=i)).isoformat(),
+                    )
+                    for i in range(offset, min(offset + SEED_BATCH, posts))
+                ],
+            )
+        for offset in range(0, comments, SEED_BATCH):
+            await db.executemany(
+                """
+                INSERT INTO sublease_comments (post_id, text, author_name, author_email, created_at)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                [
+                    (
+                        # Skewed towards low ids so some posts have long threads.
+                        min(posts, int(rng.paretovariate(1.2))), "Is this still available?",
+                        f"User {i % 5000}", f"user{i % 5000}@ucsb.edu",
+                        (base + timedelta(minutes=i)).isoformat(),
+                    )
+                    for i in range(offset, min(offset + SEED_BATCH, comments))
+                ],
+            )
+        await db.commit()
+    return {"listings": scale, "posts": posts, "comments": comments, "seconds": round(time.perf_counter() - start, 3)}
+
+
+def summarize(samples: list[float]) -> dict:
+    ms = sorted(s * 1000 for s in samples)
+    return {
+        "runs": len(ms),
+        "min_ms": round(ms[0], 3),
+        "median_ms": round(statistics.median(ms), 3),
+        "p95_ms": round(ms[min(len(ms) - 1, int(len(ms) * 0.95))], 3),
+        "max_ms": round(ms[-1], 3),
+    }
+
+
+async def timed(repeat: int, fn, before=None) -> dict:
+    samples = []
+    for _ in range(repeat):
+        if before is not None:
+            before()
+        start = time.perf_counter()
+        await fn()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+async def bench_scale(scale: int, repeat: int) -> dict:
+    workdir = tempfile.mkdtemp(prefix=f"bench-db-{scale}-")
+    database.DB_PATH = os.path.join(workdir, "listings.db")
+    await database.init_db()
+    await database.open_pool()
+    try:
+        grouped = listings_by_source(scale)
+        report = {"seed": await seed(scale, grouped)}
+        source, listings = "koto", grouped["koto"]
+        changed = [dict(l, price=(l["price"] or 0) + 1) if i % 100 == 0 else l for i, l in enumerate(listings)]
+        hot_post = 1
+
+        ops = {}
+        ops["upsert_listings.unchanged"] = await timed(repeat, lambda: database.upsert_listings(listings, source))
+        # Alternate so every run really changes 1% of the source's rows.
+        versions = itertools.cycle([changed, listings])
+        ops["upsert_listings.1pct_changed"] = await timed(
+            repeat, lambda: database.upsert_listings(next(versions), source)
+        )
+        ops["get_all_listings"] = await timed(repeat, database.get_all_listings)
+        ops["get_scrape_metadata"] = await timed(repeat, database.get_scrape_metadata)
+        ops["query_listings.first_page"] = await timed(
+            repeat, lambda: database.query_listings({}, sort="price_asc", limit=50)
+        )
+        ops["get_sublease_posts"] = await timed(repeat, database.get_sublease_posts)
+        ops["get_comments_for_post.hot"] = await timed(repeat, lambda: database.get_comments_for_post(hot_post))
+        ops["get_comments_for_post.sparse"] = await timed(
+            repeat, lambda: database.get_comments_for_post(report["seed"]["posts"])
+        )
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            async def get(path):
+                response = await client.get(path)
+                response.raise_for_status()
+
+            # A generation bump empties the response cache, so "cold" measures the DB path.
+            cold = database._bump_generation
+            ops["GET /listings.cold"] = await timed(repeat, lambda: get("/listings"), before=cold)
+            ops["GET /listings.warm"] = await timed(repeat, lambda: get("/listings"))
+            ops["GET /listings?limit=50.cold"] = await timed(
+                repeat, lambda: get("/listings?limit=50&sort=price_asc"), before=cold
+            )
+            ops["GET /subleases"] = await timed(repeat, lambda: get("/subleases"))
+            ops["GET /subleases/{id}/comments"] = await timed(repeat, lambda: get(f"/subleases/{hot_post}/comments"))
+
+        report["operations"] = ops
+        report["db_bytes"] = os.path.getsize(database.DB_PATH)
+        return report
+    finally:
+        await database.close_pool()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "run_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+    }
+
+
+async def main(scales: list[int], repeat: int) -> dict:
+    report = {"environment": environment(), "repeat": repeat, "scales": {}}
+    for scale in scales:
+        print(f"[bench] scale {scale:,}...", file=sys.stderr)
+        report["scales"][str(scale)] = await bench_scale(scale, repeat)
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scales", default="1000,100000", help="comma-separated listing counts")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write the JSON report here as well as stdout")
+    args = parser.parse_args()
+    result = asyncio.run(main([int(s) for s in args.scales.split(",")], args.repeat))
+    text = json.dumps(result, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
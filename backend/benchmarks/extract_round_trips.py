@@ -0,0 +1,136 @@
+"""
+Benchmark DOM extraction: one awaited call per field vs. one batched evaluation.
+
+Run from backend/:
+    python -m benchmarks.extract_round_trips --output extract_round_trips.json
+
+For each browser source, loads its listing page once and extracts the source's
+FIELDS from every card two ways: the old per-element pattern (query_selector
+plus inner_text/get_attribute per field, each an IPC round trip) and
+extract_cards (a single eval_on_selector_all, what the scrapers did before
+they moved to snapshots). It also times what the scrapers now do: one
+page.content() call, then select_cards on the HTML. Reports cards, round trips and wall time for each, and checks the first
+two return the same values.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scrapers import Koto, meridian, playalife, wolfe_scraper  # noqa: E402
+from scrapers.browser import browser_manager  # noqa: E402
+from scrapers.extract import Field, select_cards  # noqa: E402
+from scrapers.fetch import PhaseTimer, load_listing_page  # noqa: E402
+
+SOURCES = {
+    "meridian": (meridian, meridian.LISTING_URL, [meridian.CARD_SELECTOR]),
+    "playalife": (playalife, playalife.LISTING_URL, [playalife.CARD_SELECTOR]),
+    "wolfe": (wolfe_scraper, wolfe_scraper.LISTING_URLS[0], [wolfe_scraper.LISTING_SELECTOR]),
+    "koto": (Koto, Koto.LISTING_URL, Koto.CARD_SELECTORS),
+}
+
+# Reads every field of every card in one page.eval_on_selector_all call.
+_EXTRACT_JS = """
+(cards, fields) => cards.map(card => {
+    const out = {};
+    for (const [name, [selector, attr]] of Object.entries(fields)) {
+        const el = selector ? card.querySelector(selector) : card;
+        out[name] = !el ? null : attr ? el.getAttribute(attr) : el.innerText;
+    }
+    return out;
+})
+"""
+
+
+async def extract_cards(page, card_selector: str, fields: dict[str, Field]) -> list[dict]:
+    """One {field name: str | None} dict per card, in a single browser round trip."""
+    return await page.eval_on_selector_all(
+        card_selector, _EXTRACT_JS, {name: [f.selector, f.attr] for name, f in fields.items()}
+    )
+
+
+async def per_element(page, card_selector: str, fields) -> tuple[list[dict], int]:
+    """The old extraction pattern, counting every awaited browser call."""
+    handles = await page.query_selector_all(card_selector)
+    round_trips = 1
+    cards = []
+    for handle in handles:
+        card = {}
+        for name, field in fields.items():
+            el = handle
+            if field.selector:
+                el = await handle.query_selector(field.selector)
+                round_trips += 1
+            if el is None:
+                card[name] = None
+                continue
+            card[name] = await (el.get_attribute(field.attr) if field.attr else el.inner_text())
+            round_trips += 1
+        cards.append(card)
+    return cards, round_trips
+
+
+async def measure(name: str) -> dict:
+    module, url, candidates = SOURCES[name]
+    async with browser_manager.page() as page:
+        await load_listing_page(page, url, module.FETCH_POLICY, PhaseTimer(name))
+        # Shape fields only feed the selector cache fingerprint; skip them here.
+        fields = {n: f for n, f in module.FIELDS.items() if not f.shape}
+        card_selector = candidates[0]
+        for selector in candidates:
+            if await page.query_selector(selector):
+                card_selector = selector
+                break
+
+        start = time.perf_counter()
+        legacy, legacy_trips = await per_element(page, card_selector, fields)
+        legacy_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        batched = await extract_cards(page, card_selector, fields)
+        batched_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        select_cards(await page.content(), card_selector, fields)
+        snapshot_seconds = time.perf_counter() - start
+
+    return {
+        "card_selector": card_selector,
+        "cards": len(batched),
+        "fields": len(fields),
+        "per_element": {"round_trips": legacy_trips, "seconds": round(legacy_seconds, 4)},
+        "batched": {"round_trips": 1, "seconds": round(batched_seconds, 4)},
+        "snapshot": {"round_trips": 1, "seconds": round(snapshot_seconds, 4)},
+        "same_values": legacy == batched,
+    }
+
+
+async def main(names: list[str]) -> dict:
+    report = {}
+    try:
+        for name in names:
+            try:
+                report[name] = await measure(name)
+            except Exception as e:
+                report[name] = {"error": f"{type(e).__name__}: {e}"}
+    finally:
+        await browser_manager.stop()
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("sources", nargs="*", default=list(SOURCES), choices=list(SOURCES))
+    parser.add_argument("--output", help="write the JSON report here as well as stdout")
+    args = parser.parse_args()
+    result = asyncio.run(main(args.sources))
+    text = json.dumps(result, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
@@ -0,0 +1,91 @@
+"""
+Benchmark the two fetch tiers on Solis: browserless HTTP vs. headless Chromium.
+
+Run from backend/:
+    python -m benchmarks.fetch_tiers --runs 5 --output fetch_tiers.json
+
+For each tier, reports per-run wall time and the peak resident memory of this
+process plus any Playwright/Chromium children (sampled every 50 ms). The first
+browser run includes the Chromium launch; later runs reuse the warm browser.
+Uses a throwaway database so the real http_cache is not touched.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["DB_PATH"] = os.path.join(tempfile.mkdtemp(prefix="bench-"), "bench.db")
+
+from database import init_db  # noqa: E402
+from scrapers.browser import browser_manager, process_tree_rss_mb  # noqa: E402
+from scrapers.http_fetch import close_http_client  # noqa: E402
+from scrapers.solis import scrape_solis  # noqa: E402
+
+
+async def _sample_peak_rss(stop: asyncio.Event, peak: list):
+    while not stop.is_set():
+        peak[0] = max(peak[0], process_tree_rss_mb(include_root=True))
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=0.05)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def measure(tier: str) -> dict:
+    stop, peak = asyncio.Event(), [0.0]
+    sampler = asyncio.create_task(_sample_peak_rss(stop, peak))
+    start = time.perf_counter()
+    error = None
+    listings = 0
+    try:
+        result = await scrape_solis(tier=tier)
+        listings = len(result["listings"])
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await sampler
+    return {"seconds": round(elapsed, 3), "peak_rss_mb": round(peak[0], 1), "listings": listings, "error": error}
+
+
+def summarize(runs: list[dict]) -> dict:
+    ok = [r for r in runs if not r["error"]]
+    seconds = [r["seconds"] for r in ok]
+    return {
+        "runs": runs,
+        "successful_runs": len(ok),
+        "median_seconds": round(statistics.median(seconds), 3) if seconds else None,
+        "min_seconds": min(seconds) if seconds else None,
+        "peak_rss_mb": max((r["peak_rss_mb"] for r in runs), default=None),
+    }
+
+
+async def main(runs: int) -> dict:
+    await init_db()
+    report = {"source": "solis", "baseline_rss_mb": round(process_tree_rss_mb(include_root=True), 1)}
+    report["http"] = summarize([await measure("http") for _ in range(runs)])
+    await close_http_client()
+    report["browser"] = summarize([await measure("browser") for _ in range(runs)])
+    await browser_manager.stop()
+    if report["http"]["median_seconds"] and report["browser"]["median_seconds"]:
+        report["speedup"] = round(report["browser"]["median_seconds"] / report["http"]["median_seconds"], 1)
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--output", help="write the JSON report here as well as stdout")
+    args = parser.parse_args()
+    result = asyncio.run(main(args.runs))
+    text = json.dumps(result, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
@@ -0,0 +1,161 @@
+"""
+Time-to-first-byte and server memory of GET /listings: JSON vs. NDJSON streaming.
+
+Run from backend/:
+    python -m benchmarks.listings_stream --rows 10000,200000 --output listings_stream.json
+
+For each row count, seeds a throwaway database, then for each format starts a
+fresh uvicorn server in a subprocess (lifespan off, so no scheduler or
+browser) and fetches the full listing set over real TCP. Reports time to first
+byte, total time, bytes received, and the server's resident memory before the
+first request and at its peak during the requests (sampled every 10 ms). A
+new process per format keeps one format's retained memory out of the other's
+numbers. The first JSON request is a response-cache miss; later ones are hits.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+import httpx  # noqa: E402
+
+import database  # noqa: E402
+from benchmarks.bench_db import environment, listings_by_source  # noqa: E402
+from scrapers.browser import process_tree_rss_mb  # noqa: E402
+
+FORMATS = {
+    "json": ("/listings?format=json", {}),
+    "ndjson": ("/listings?format=ndjson", {}),
+}
+
+
+async def seed(db_path: str, rows: int):
+    database.DB_PATH = db_path
+    await database.init_db()
+    for source, listings in listings_by_source(rows).items():
+        await database.upsert_listings(listings, source)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def wait_until_up(client: httpx.AsyncClient, proc: subprocess.Popen, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"server exited with {proc.returncode}")
+        try:
+            (await client.get("/")).raise_for_status()
+            return
+        except httpx.TransportError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError("server did not start")
+
+
+async def _sample_peak_rss(pid: int, stop: asyncio.Event, peak: list):
+    while not stop.is_set():
+        peak[0] = max(peak[0], process_tree_rss_mb(pid, include_root=True))
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=0.01)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def fetch(client: httpx.AsyncClient, path: str, headers: dict) -> dict:
+    start = time.perf_counter()
+    ttfb = None
+    size = 0
+    async with client.stream("GET", path, headers=headers) as response:
+        response.raise_for_status()
+        async for chunk in response.aiter_raw():
+            if ttfb is None:
+                ttfb = time.perf_counter() - start
+            size += len(chunk)
+    return {"ttfb_ms": round(ttfb * 1000, 2), "total_ms": round((time.perf_counter() - start) * 1000, 2), "bytes": size}
+
+
+async def bench_format(db_path: str, fmt: str, repeat: int) -> dict:
+    path, headers = FORMATS[fmt]
+    port = free_port()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.listings_stream", "--serve", str(port)],
+        cwd=BACKEND, env={**os.environ, "DB_PATH": db_path},
+    )
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=300) as client:
+            await wait_until_up(client, proc)
+            baseline = process_tree_rss_mb(proc.pid, include_root=True)
+            stop, peak = asyncio.Event(), [baseline]
+            sampler = asyncio.create_task(_sample_peak_rss(proc.pid, stop, peak))
+            runs = [await fetch(client, path, headers) for _ in range(repeat)]
+            stop.set()
+            await sampler
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+    return {
+        "first": runs[0],
+        "median_ttfb_ms": round(statistics.median(r["ttfb_ms"] for r in runs), 2),
+        "median_total_ms": round(statistics.median(r["total_ms"] for r in runs), 2),
+        "bytes": runs[0]["bytes"],
+        "rss_baseline_mb": round(baseline, 1),
+        "rss_peak_mb": round(peak[0], 1),
+        "rss_growth_mb": round(peak[0] - baseline, 1),
+    }
+
+
+async def main(row_counts: list[int], repeat: int) -> dict:
+    report = {"environment": environment(), "repeat": repeat, "rows": {}}
+    for rows in row_counts:
+        workdir = tempfile.mkdtemp(prefix=f"bench-stream-{rows}-")
+        try:
+            db_path = os.path.join(workdir, "listings.db")
+            print(f"[bench] seeding {rows:,} listings...", file=sys.stderr)
+            await seed(db_path, rows)
+            report["rows"][str(rows)] = {fmt: await bench_format(db_path, fmt, repeat) for fmt in FORMATS}
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return report
+
+
+async def serve(port: int):
+    """Server half: the API without its lifespan, on the DB named by DB_PATH."""
+    import uvicorn
+
+    from main import app
+
+    await database.open_pool()
+    config = uvicorn.Config(app, host="127.0.0.1", port=port, lifespan="off", log_level="warning")
+    await uvicorn.Server(config).serve()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", default="10000,200000", help="comma-separated listing counts")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="write the JSON report here as well as stdout")
+    parser.add_argument("--serve", type=int, metavar="PORT", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.serve:
+        asyncio.run(serve(args.serve))
+        sys.exit(0)
+    result = asyncio.run(main([int(r) for r in args.rows.split(",")], args.repeat))
+    text = json.dumps(result, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
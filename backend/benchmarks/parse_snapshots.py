@@ -0,0 +1,71 @@
+"""
+Benchmark (and sanity-check) each source's parse stage on stored HTML snapshots.
+
+Run from backend/ after at least one scrape has written snapshots:
+    python -m benchmarks.parse_snapshots --repeat 20 --output parse_snapshots.json
+
+No browser or network is needed: the parse functions only take HTML, so this
+is also the quickest way to check a parser fix against real pages. Pass
+--show to print the parsed listings of the newest snapshot per source.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scrapers import Koto, meridian, playalife, solis, wolfe_scraper  # noqa: E402
+from scrapers.pipeline import list_snapshots, load_snapshot  # noqa: E402
+
+PARSERS = {
+    "meridian": meridian.parse_listings,
+    "playalife": playalife.parse_listings,
+    "wolfe": wolfe_scraper.parse_listings,
+    "koto": Koto.parse_listings,
+    "solis": solis.parse_solis_html,
+}
+
+
+def measure(name: str, repeat: int, show: bool) -> dict:
+    snapshots = list_snapshots(name)
+    if not snapshots:
+        return {"error": "no snapshots"}
+    path = snapshots[-1]
+    page_html = load_snapshot(path)
+    parse = PARSERS[name]
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        listings = parse(page_html)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    result = {
+        "snapshot": path,
+        "html_bytes": len(page_html.encode()),
+        "listings": len(listings),
+        "median_ms": round(statistics.median(timings), 3),
+        "min_ms": round(min(timings), 3),
+    }
+    if show:
+        result["parsed"] = listings
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("sources", nargs="*", default=list(PARSERS), choices=list(PARSERS))
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--show", action="store_true")
+    parser.add_argument("--output", help="write the JSON report here as well as stdout")
+    args = parser.parse_args()
+    report = {name: measure(name, args.repeat, args.show) for name in args.sources}
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
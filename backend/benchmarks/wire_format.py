@@ -0,0 +1,140 @@
+"""
+Payload size and CPU cost of the /listings wire formats.
+
+Run from backend/:
+    python -m benchmarks.wire_format --rows 10000,100000 --output wire_format.json
+
+Seeds a throwaway database per row count and builds the full /listings body
+each way, in process:
+
+  rows/json           get_all_listings() dicts + stdlib json (the default format)
+  rows/orjson         the same dicts encoded with orjson
+  columnar/json       get_listing_rows() tuples + to_columnar + stdlib json
+  columnar/orjson     the same, encoded with orjson (format=columnar with orjson installed)
+  rows/fastapi        dicts through FastAPI's jsonable_encoder, then json (for reference)
+
+For each it reports the median wall and CPU (process) milliseconds of the DB
+read, the build and the encode, plus the body size raw and gzipped. The
+orjson variants are skipped when orjson is not installed.
+"""
+
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+
+import database  # noqa: E402
+from benchmarks.bench_db import environment, listings_by_source  # noqa: E402
+from serialization import orjson, to_columnar  # noqa: E402
+
+
+def std_json(payload) -> bytes:
+    return json.dumps(payload, separators=(",", ":")).encode()
+
+
+async def fetch_dicts():
+    return await database.get_all_listings()
+
+
+async def fetch_tuples():
+    return await database.get_listing_rows()
+
+
+VARIANTS = {
+    "rows/json": (fetch_dicts, lambda rows: rows, std_json),
+    "rows/orjson": (fetch_dicts, lambda rows: rows, orjson.dumps if orjson else None),
+    "columnar/json": (fetch_tuples, lambda rows: to_columnar(database.LISTING_COLUMNS, rows), std_json),
+    "columnar/orjson": (
+        fetch_tuples, lambda rows: to_columnar(database.LISTING_COLUMNS, rows), orjson.dumps if orjson else None,
+    ),
+    "rows/fastapi": (fetch_dicts, jsonable_encoder, std_json),
+}
+
+
+def _clock():
+    return time.perf_counter(), time.process_time()
+
+
+def _since(start) -> tuple[float, float]:
+    wall, cpu = _clock()
+    return (wall - start[0]) * 1000, (cpu - start[1]) * 1000
+
+
+async def measure(fetch, build, encode, repeat: int) -> dict:
+    phases = {"fetch": [], "build": [], "encode": []}
+    body = b""
+    for _ in range(repeat):
+        start = _clock()
+        rows = await fetch()
+        phases["fetch"].append(_since(start))
+        start = _clock()
+        listings = build(rows)
+        phases["build"].append(_since(start))
+        start = _clock()
+        body = encode({"listings": listings})
+        phases["encode"].append(_since(start))
+    result = {}
+    for phase, samples in phases.items():
+        result[f"{phase}_wall_ms"] = round(statistics.median(s[0] for s in samples), 2)
+        result[f"{phase}_cpu_ms"] = round(statistics.median(s[1] for s in samples), 2)
+    result["total_cpu_ms"] = round(sum(result[f"{p}_cpu_ms"] for p in phases), 2)
+    result["bytes"] = len(body)
+    result["gzip_bytes"] = len(gzip.compress(body, compresslevel=6))
+    return result
+
+
+async def bench_rows(rows: int, repeat: int) -> dict:
+    workdir = tempfile.mkdtemp(prefix=f"bench-wire-{rows}-")
+    database.DB_PATH = os.path.join(workdir, "listings.db")
+    await database.init_db()
+    await database.open_pool()
+    try:
+        for source, listings in listings_by_source(rows).items():
+            await database.upsert_listings(listings, source)
+        report = {}
+        for name, (fetch, build, encode) in VARIANTS.items():
+            if encode is None:
+                report[name] = {"skipped": "orjson is not installed"}
+                continue
+            report[name] = await measure(fetch, build, encode, repeat)
+        baseline = report["rows/json"]
+        for name, result in report.items():
+            if "bytes" in result:
+                result["size_vs_rows_json"] = round(result["bytes"] / baseline["bytes"], 3)
+                result["cpu_vs_rows_json"] = round(result["total_cpu_ms"] / baseline["total_cpu_ms"], 3)
+        return report
+    finally:
+        await database.close_pool()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+async def main(row_counts: list[int], repeat: int) -> dict:
+    report = {"environment": environment(), "orjson": orjson.__version__ if orjson else None, "repeat": repeat, "rows": {}}
+    for rows in row_counts:
+        print(f"[bench] {rows:,} listings...", file=sys.stderr)
+        report["rows"][str(rows)] = await bench_rows(rows, repeat)
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", default="10000,100000", help="comma-separated listing counts")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write the JSON report here as well as stdout")
+    args = parser.parse_args()
+    result = asyncio.run(main([int(r) for r in args.rows.split(",")], args.repeat))
+    text = json.dumps(result, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
@@ -1,16 +1,139 @@
 """
 SQLite database operations for storing scraped listings and sublease posts.
-Uses aiosqlite for async access with WAL mode for concurrent reads.
+Uses aiosqlite for async access with WAL mode for concurrent reads. Connections
+come from a long-lived pool (see db_pool.py) opened by the FastAPI lifespan.
+Public query functions are wrapped in metrics.observe_db for GET /metrics.
 """
 
+import base64
+import hashlib
+import json
 import os
-from datetime import datetime, timezone
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
 
 import aiosqlite
 
+from db_pool import ConnectionPool, _open_connection
+from metrics import observe_db
+
 DB_PATH = os.getenv("DB_PATH", os.path.join(os.path.dirname(__file__), "data", "listings.db"))
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "4"))
+
+_pool: ConnectionPool | None = None
+
+# Bumped whenever listing data changes; response caches key on it.
+_data_generation = 0
+
+
+def get_data_generation() -> int:
+    """Return the in-process listings data generation counter."""
+    return _data_generation
+
+
+def _bump_generation():
+    global _data_generation
+    _data_generation += 1
+
+
+async def open_pool():
+    """Open the shared connection pool. Called from the FastAPI lifespan."""
+    global _pool
+    if _pool is None or _pool.closed:
+        _pool = ConnectionPool(DB_PATH, readers=DB_POOL_SIZE)
+        await _pool.open()
+
+
+async def close_pool():
+    """Close the shared connection pool."""
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+
+
+def get_pool_stats() -> dict | None:
+    """Return pool size and wait-time stats, or None if the pool is not open."""
+    return _pool.stats() if _pool is not None else None
+
+
+@asynccontextmanager
+async def _read():
+    """Borrow a reader connection, or open a one-off one outside the app (scripts)."""
+    if _pool is not None and not _pool.closed:
+        async with _pool.reader() as db:
+            yield db
+    else:
+        db = await _open_connection(DB_PATH, readonly=True)
+        try:
+            yield db
+        finally:
+            await db.close()
+
+
+@asynccontextmanager
+async def _write():
+    """Borrow the writer connection, or open a one-off one outside the app (scripts)."""
+    if _pool is not None and not _pool.closed:
+        async with _pool.writer() as db:
+            yield db
+    else:
+        db = await _open_connection(DB_PATH, readonly=False)
+        try:
+            yield db
+        finally:
+            await db.close()
+
+
+# Composite indexes matching the /listings filters and sort keys. They are
+# partial indexes over active rows only, so reads skip retired listings without
+# touching them. Nullable sort columns are indexed as (col IS NULL, col, id) so
+# "nulls last" ordering and keyset seeks can both be served from the index; the
+# descending sorts keep nulls last too, so they need their own DESC index.
+LISTING_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_live_updated ON listings(updated_at, id) WHERE active = 1",
+    "CREATE INDEX IF NOT EXISTS idx_live_source_updated ON listings(source, updated_at, id) WHERE active = 1",
+    "CREATE INDEX IF NOT EXISTS idx_live_price ON listings(price IS NULL, price, id) WHERE active = 1",
+    "CREATE INDEX IF NOT EXISTS idx_live_price_desc ON listings(price IS NULL, price DESC, id DESC) WHERE active = 1",
+    "CREATE INDEX IF NOT EXISTS idx_live_source_price ON listings(source, price IS NULL, price, id) WHERE active = 1",
+    "CREATE INDEX IF NOT EXISTS idx_live_category_price ON listings(category, price IS NULL, price, id) WHERE active = 1",
+    "CREATE INDEX IF NOT EXISTS idx_live_bedrooms ON listings(bedrooms IS NULL, bedrooms, id) WHERE active = 1",
+    "CREATE INDEX IF NOT EXISTS idx_live_bedrooms_desc ON listings(bedrooms IS NULL, bedrooms DESC, id DESC) WHERE active = 1",
+    "CREATE INDEX IF NOT EXISTS idx_listings_revision ON listings(revision)",
+    "CREATE INDEX IF NOT EXISTS idx_retired_last_seen ON listings(last_seen_at) WHERE active = 0",
+]
+
+# Indexes replaced by the ones above. idx_live_beds_baths was never used: the
+# bedrooms filters let NULLs through, and it did not match the bedrooms sorts.
+STALE_INDEXES = [
+    "idx_live_beds_baths",
+    "idx_listings_updated",
+    "idx_listings_source_updated",
+    "idx_listings_price",
+    "idx_listings_source_price",
+    "idx_listings_category_price",
+    "idx_listings_beds_baths",
+]
+
 
+async def _next_revision(db) -> int:
+    """Advance and return the listings revision counter (inside the caller's transaction)."""
+    await db.execute("UPDATE counters SET value = value + 1 WHERE name = 'listings_revision'")
+    cursor = await db.execute("SELECT value FROM counters WHERE name = 'listings_revision'")
+    (revision,) = await cursor.fetchone()
+    return revision
 
+
+async def _ensure_columns(db, table: str, columns: dict[str, str]):
+    """Add columns missing from a table created by an older schema."""
+    cursor = await db.execute(f"PRAGMA table_info({table})")
+    existing = {row[1] for row in await cursor.fetchall()}
+    for name, decl in columns.items():
+        if name not in existing:
+            await db.execute(f"ALTER TABLE {table} ADD COLUMN {name} {decl}")
+
+
+@observe_db
 async def init_db():
     """Create all tables if they don't exist."""
     os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
@@ -32,9 +155,65 @@ async def init_db():
                 listing_link TEXT,
                 scraped_at TEXT NOT NULL,
                 updated_at TEXT NOT NULL,
+                content_hash TEXT,
+                revision INTEGER NOT NULL DEFAULT 0,
+                active INTEGER NOT NULL DEFAULT 1,
+                last_seen_at TEXT,
                 UNIQUE(address, source)
             )
         """)
+        await _ensure_columns(db, "listings", {
+            "content_hash": "TEXT",
+            "revision": "INTEGER NOT NULL DEFAULT 0",
+            "active": "INTEGER NOT NULL DEFAULT 1",
+            "last_seen_at": "TEXT",
+            "lat": "REAL",
+            "lng": "REAL",
+            "scraped_fields": "TEXT",
+        })
+        for name in STALE_INDEXES:
+            await db.execute(f"DROP INDEX IF EXISTS {name}")
+
+        # Monotonic revision counter for the /listings/changes feed. Every write
+        # to listings stamps rows with a new value; deletes leave tombstones.
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS counters (
+                name TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            )
+        """)
+        await db.execute("INSERT OR IGNORE INTO counters (name, value) VALUES ('listings_revision', 0)")
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS listing_tombstones (
+                address TEXT NOT NULL,
+                source TEXT NOT NULL,
+                revision INTEGER NOT NULL,
+                deleted_at TEXT NOT NULL,
+                PRIMARY KEY (address, source)
+            )
+        """)
+        await db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_tombstones_revision ON listing_tombstones(revision)"
+        )
+        await db.execute("""
+            CREATE TRIGGER IF NOT EXISTS listings_tombstone AFTER DELETE ON listings
+            BEGIN
+                UPDATE counters SET value = value + 1 WHERE name = 'listings_revision';
+                INSERT OR REPLACE INTO listing_tombstones (address, source, revision, deleted_at)
+                VALUES (
+                    OLD.address, OLD.source,
+                    (SELECT value FROM counters WHERE name = 'listings_revision'),
+                    strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')
+                );
+            END
+        """)
+        # Rows written before revisions existed join the feed at revision 1+.
+        cursor = await db.execute("SELECT 1 FROM listings WHERE revision = 0 LIMIT 1")
+        if await cursor.fetchone():
+            revision = await _next_revision(db)
+            await db.execute("UPDATE listings SET revision = ? WHERE revision = 0", (revision,))
+        for statement in LISTING_INDEXES:
+            await db.execute(statement)
 
         await db.execute("""
             CREATE TABLE IF NOT EXISTS sublease_posts (
@@ -72,58 +251,340 @@ async def init_db():
             )
         """)
 
+        # Next-run bookkeeping for the per-source scheduler, so a restart does
+        # not trigger an immediate full re-scrape.
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS scrape_schedule (
+                source TEXT PRIMARY KEY,
+                interval_hours REAL NOT NULL,
+                next_run_at TEXT NOT NULL,
+                last_run_at TEXT,
+                last_status TEXT,
+                consecutive_failures INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+
+        # Validators and last body per URL for the scrapers' conditional GETs.
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS http_cache (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                body TEXT NOT NULL,
+                fetched_at TEXT NOT NULL
+            )
+        """)
+
+        # Geocoder results by normalized address (geocoding.normalize_address),
+        # including misses (lat/lng NULL) so they are not retried every run.
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS geocode_cache (
+                address_key TEXT PRIMARY KEY,
+                lat REAL,
+                lng REAL,
+                provider TEXT NOT NULL,
+                geocoded_at TEXT NOT NULL
+            )
+        """)
+        # Spatial index over listing coordinates for /listings/within, kept in
+        # step with listings.lat/lng by triggers.
+        await db.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS listings_rtree
+            USING rtree(id, min_lat, max_lat, min_lng, max_lng)
+        """)
+        await db.execute("""
+            CREATE TRIGGER IF NOT EXISTS listings_rtree_insert AFTER INSERT ON listings
+            WHEN NEW.lat IS NOT NULL AND NEW.lng IS NOT NULL
+            BEGIN
+                INSERT INTO listings_rtree (id, min_lat, max_lat, min_lng, max_lng)
+                VALUES (NEW.id, NEW.lat, NEW.lat, NEW.lng, NEW.lng);
+            END
+        """)
+        await db.execute("""
+            CREATE TRIGGER IF NOT EXISTS listings_rtree_coords AFTER UPDATE OF lat, lng ON listings
+            BEGIN
+                DELETE FROM listings_rtree WHERE id = OLD.id;
+                INSERT INTO listings_rtree (id, min_lat, max_lat, min_lng, max_lng)
+                SELECT NEW.id, NEW.lat, NEW.lat, NEW.lng, NEW.lng
+                WHERE NEW.lat IS NOT NULL AND NEW.lng IS NOT NULL;
+            END
+        """)
+        await db.execute("""
+            CREATE TRIGGER IF NOT EXISTS listings_rtree_delete AFTER DELETE ON listings
+            BEGIN
+                DELETE FROM listings_rtree WHERE id = OLD.id;
+            END
+        """)
+
+        # One row per source per scheduler run: phase timings, outcome and the
+        # peak process-tree memory while it ran. See scheduler.scrape_source_to_db.
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS scrape_runs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                run_id TEXT,
+                source TEXT NOT NULL,
+                started_at TEXT NOT NULL,
+                finished_at TEXT NOT NULL,
+                duration_seconds REAL NOT NULL,
+                launch_seconds REAL,
+                navigate_seconds REAL,
+                extract_seconds REAL,
+                upsert_seconds REAL,
+                phases TEXT,
+                status TEXT NOT NULL,
+                listing_count INTEGER,
+                error_type TEXT,
+                error_message TEXT,
+                peak_rss_mb REAL
+            )
+        """)
+        await db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_scrape_runs_source ON scrape_runs(source, started_at)"
+        )
+
+        # Hash of each source's listing region as of its last stored scrape, so an
+        # unchanged page can skip parsing and upserting (scheduler.py).
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS page_hashes (
+                source TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                checked_at TEXT NOT NULL,
+                changed_at TEXT NOT NULL,
+                checks INTEGER NOT NULL DEFAULT 0,
+                skips INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+
+        # The card selector that last worked for a source whose markup we have to
+        # probe for (Koto), with a fingerprint of the card structure it matched.
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS selector_cache (
+                source TEXT PRIMARY KEY,
+                selector TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                card_count INTEGER NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0,
+                misses INTEGER NOT NULL DEFAULT 0,
+                updated_at TEXT NOT NULL
+            )
+        """)
+
+        # Per-source listing counts and timestamps, maintained by upsert_listings
+        # in the same transaction as the listing writes.
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS source_stats (
+                source TEXT PRIMARY KEY,
+                listing_count INTEGER NOT NULL DEFAULT 0,
+                last_updated TEXT,
+                last_success_at TEXT
+            )
+        """)
+        # Reconcile once at startup so databases from before this table (or
+        # edited by hand) start with correct counts.
+        await db.execute("""
+            INSERT INTO source_stats (source, listing_count, last_updated)
+            SELECT source, COUNT(*), MAX(updated_at) FROM listings WHERE active = 1 GROUP BY source
+            ON CONFLICT(source) DO UPDATE SET
+                listing_count = excluded.listing_count,
+                last_updated = excluded.last_updated
+        """)
+        await db.execute("""
+            UPDATE source_stats SET listing_count = 0
+            WHERE source NOT IN (SELECT DISTINCT source FROM listings WHERE active = 1)
+        """)
+
         await db.commit()
 
 
-async def upsert_listings(listings: list[dict], source: str):
-    """Insert or update listings for a given source."""
+def _listing_row(item: dict) -> tuple:
+    """Normalize a scraped listing into (address, price, ..., listing_link)."""
+    return (
+        item.get("address", ""),
+        item.get("price"),
+        item.get("bedrooms"),
+        item.get("bathrooms"),
+        item.get("category", "Residential"),
+        item.get("square_feet"),
+        item.get("move_in_date") or item.get("date_available"),
+        item.get("listing_link") or item.get("url"),
+    )
+
+
+def _content_hash(row: tuple) -> str:
+    """Hash the scraped fields of a listing row so unchanged rows can be skipped."""
+    return hashlib.sha1(json.dumps(row, separators=(",", ":")).encode()).hexdigest()
+
+
+def _scraped_fields(item: dict, source: str) -> str:
+    """The listing exactly as its scraper returned it, for the /scrape endpoints."""
+    return json.dumps({**item, "source": item.get("source") or source}, separators=(",", ":"))
+
+
+@observe_db
+async def upsert_listings(listings: list[dict], source: str, retire_missing: bool = False) -> dict:
+    """
+    Insert or update listings for a given source in a single transaction.
+    Rows whose scraped fields are unchanged are left alone, so updated_at only
+    moves when a listing actually changed. Each row also keeps the scraper's
+    own dict (scraped_fields); when only that differs, e.g. a scraper-specific
+    field like contact_info, it is rewritten without a new revision.
+
+    With retire_missing, active rows of this source that are absent from
+    `listings` are marked inactive; their last_seen_at becomes the source's
+    previous successful run (a stored scrape or an unchanged-page check,
+    whichever is later), the last time they were actually seen.
+
+    An empty scrape usually means the scraper broke, so it writes nothing: no
+    retirements, no source_stats success and no generation bump.
+
+    Returns inserted/updated/unchanged/retired counts.
+    """
+    if not listings:
+        return {"inserted": 0, "updated": 0, "unchanged": 0, "retired": 0}
     now = datetime.now(timezone.utc).isoformat()
-    async with aiosqlite.connect(DB_PATH) as db:
-        for item in listings:
-            link = item.get("listing_link") or item.get("url")
-            await db.execute(
+    # Later duplicates of the same address win, matching the old per-row upsert.
+    rows, fields = {}, {}
+    for item in listings:
+        row = _listing_row(item)
+        rows[row[0]] = row
+        fields[row[0]] = _scraped_fields(item, source)
+
+    async with _write() as db:
+        cursor = await db.execute(
+            "SELECT address, content_hash, active, scraped_fields FROM listings WHERE source = ?", (source,)
+        )
+        existing = {address: (content_hash, active, raw) for address, content_hash, active, raw in await cursor.fetchall()}
+        cursor = await db.execute(
+            """
+            SELECT MAX(
+                COALESCE((SELECT last_success_at FROM source_stats WHERE source = ?), ''),
+                COALESCE((SELECT checked_at FROM page_hashes WHERE source = ?), '')
+            )
+            """,
+            (source, source),
+        )
+        (previous,) = await cursor.fetchone()
+        previous_success = previous or now
+
+        inserted, updated, refreshed = [], [], []
+        unchanged = reactivated = 0
+        for address, row in rows.items():
+            content_hash = _content_hash(row)
+            if address not in existing:
+                inserted.append((row, content_hash))
+            elif not existing[address][1]:
+                reactivated += 1
+                updated.append((row, content_hash))
+            elif existing[address][0] != content_hash:
+                updated.append((row, content_hash))
+            else:
+                unchanged += 1
+                if existing[address][2] != fields[address]:
+                    refreshed.append(address)
+
+        retired = []
+        if retire_missing:
+            retired = [a for a, (_, active, _) in existing.items() if active and a not in rows]
+
+        if inserted or updated or retired:
+            revision = await _next_revision(db)
+        if inserted:
+            await db.executemany(
                 """
                 INSERT INTO listings (address, source, price, bedrooms, bathrooms,
                                       category, square_feet, move_in_date, listing_link,
-                                      scraped_at, updated_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ON CONFLICT(address, source) DO UPDATE SET
-                    price = excluded.price,
-                    bedrooms = excluded.bedrooms,
-                    bathrooms = excluded.bathrooms,
-                    category = excluded.category,
-                    square_feet = excluded.square_feet,
-                    move_in_date = excluded.move_in_date,
-                    listing_link = excluded.listing_link,
-                    updated_at = excluded.updated_at
+                                      content_hash, revision, scraped_at, updated_at, last_seen_at,
+                                      scraped_fields)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 """,
-                (
-                    item.get("address", ""),
-                    source,
-                    item.get("price"),
-                    item.get("bedrooms"),
-                    item.get("bathrooms"),
-                    item.get("category", "Residential"),
-                    item.get("square_feet"),
-                    item.get("move_in_date") or item.get("date_available"),
-                    link,
-                    now,
-                    now,
-                ),
+                [(row[0], source, *row[1:], h, revision, now, now, now, fields[row[0]]) for row, h in inserted],
+            )
+            # A re-listed unit is a change, not a removal.
+            await db.executemany(
+                "DELETE FROM listing_tombstones WHERE address = ? AND source = ?",
+                [(row[0], source) for row, _ in inserted],
             )
+        if updated:
+            await db.executemany(
+                """
+                UPDATE listings SET
+                    price = ?, bedrooms = ?, bathrooms = ?, category = ?,
+                    square_feet = ?, move_in_date = ?, listing_link = ?,
+                    content_hash = ?, revision = ?, updated_at = ?,
+                    active = 1, last_seen_at = ?, scraped_fields = ?
+                WHERE address = ? AND source = ?
+                """,
+                [(*row[1:], h, revision, now, now, fields[row[0]], row[0], source) for row, h in updated],
+            )
+        if refreshed:
+            await db.executemany(
+                "UPDATE listings SET scraped_fields = ? WHERE address = ? AND source = ?",
+                [(fields[address], address, source) for address in refreshed],
+            )
+        if retired:
+            await db.executemany(
+                """
+                UPDATE listings SET active = 0, revision = ?, last_seen_at = ?
+                WHERE address = ? AND source = ?
+                """,
+                [(revision, previous_success, address, source) for address in retired],
+            )
+        await db.execute(
+            """
+            INSERT INTO source_stats (source, listing_count, last_updated, last_success_at)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(source) DO UPDATE SET
+                listing_count = listing_count + excluded.listing_count,
+                last_updated = COALESCE(excluded.last_updated, last_updated),
+                last_success_at = excluded.last_success_at
+            """,
+            (
+                source,
+                len(inserted) + reactivated - len(retired),
+                now if inserted or updated or retired else None,
+                now,
+            ),
+        )
+        await db.commit()
+
+    # source_stats changed even if no listing did, and it is part of the payload.
+    _bump_generation()
+    return {
+        "inserted": len(inserted),
+        "updated": len(updated),
+        "unchanged": unchanged,
+        "retired": len(retired),
+    }
+
+
+@observe_db
+async def purge_inactive_listings(retention_days: float) -> int:
+    """
+    Delete listings that have been inactive for longer than retention_days.
+    The delete trigger leaves tombstones for the change feed. Returns the count.
+    """
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=retention_days)).isoformat()
+    async with _write() as db:
+        cursor = await db.execute(
+            "DELETE FROM listings WHERE active = 0 AND last_seen_at < ?", (cutoff,)
+        )
         await db.commit()
+    if cursor.rowcount > 0:
+        _bump_generation()
+    return cursor.rowcount
 
 
+@observe_db
 async def get_all_listings() -> list[dict]:
     """Return all listings as dicts. Aliases listing_link → url for frontend compat."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
+    async with _read() as db:
         cursor = await db.execute(
             """
             SELECT address, source, price, bedrooms, bathrooms,
                    category, square_feet, move_in_date,
                    listing_link AS url, scraped_at, updated_at
             FROM listings
+            WHERE active = 1
             ORDER BY updated_at DESC
             """
         )
@@ -131,22 +592,357 @@ async def get_all_listings() -> list[dict]:
         return [dict(row) for row in rows]
 
 
+@observe_db
+async def get_scraped_listings(sources: list[str] | None = None) -> dict[str, list[dict]]:
+    """
+    source → its active listings in the per-listing shape the scrapers return
+    (listing_link, plus any scraper-specific fields), for the /scrape endpoints.
+    Rows stored before scraped_fields existed are rebuilt from their columns.
+    """
+    query = """
+        SELECT source, scraped_fields, listing_link, address, price, bedrooms, bathrooms,
+               category, square_feet, move_in_date
+        FROM listings
+        WHERE active = 1
+    """
+    params: list = []
+    if sources is not None:
+        query += f" AND source IN ({', '.join('?' * len(sources))})"
+        params = list(sources)
+    async with _read() as db:
+        cursor = await db.execute(query + " ORDER BY source, id", params)
+        rows = await cursor.fetchall()
+    listings: dict[str, list[dict]] = {}
+    for row in rows:
+        if row["scraped_fields"]:
+            item = json.loads(row["scraped_fields"])
+        else:
+            item = {
+                key: row[key]
+                for key in ("listing_link", "address", "price", "bedrooms", "bathrooms", "category", "source")
+            }
+            for key in ("square_feet", "move_in_date"):
+                if row[key] is not None:
+                    item[key] = row[key]
+        listings.setdefault(row["source"], []).append(item)
+    return listings
+
+
+LISTING_STREAM_BATCH = 500
+
+LISTING_COLUMNS = [
+    "address", "source", "price", "bedrooms", "bathrooms", "category",
+    "square_feet", "move_in_date", "url", "scraped_at", "updated_at",
+]
+
+
+@observe_db
+async def get_listing_rows() -> list[tuple]:
+    """get_all_listings as plain tuples in LISTING_COLUMNS order, without building a dict per row."""
+    async with _read() as db:
+        cursor = await db.execute(
+            """
+            SELECT address, source, price, bedrooms, bathrooms,
+                   category, square_feet, move_in_date,
+                   listing_link AS url, scraped_at, updated_at
+            FROM listings
+            WHERE active = 1
+            ORDER BY updated_at DESC
+            """
+        )
+        cursor.row_factory = None
+        return await cursor.fetchall()
+
+
+# sort key → (column, direction, nullable). Nullable columns sort nulls last.
+LISTING_SORTS = {
+    "newest": ("updated_at", "DESC", False),
+    "oldest": ("updated_at", "ASC", False),
+    "price_asc": ("price", "ASC", True),
+    "price_desc": ("price", "DESC", True),
+    "bedrooms_asc": ("bedrooms", "ASC", True),
+    "bedrooms_desc": ("bedrooms", "DESC", True),
+}
+
+
+# Python types a cursor's sort value may have, by sort column.
+_CURSOR_VALUE_TYPES = {"updated_at": (str,), "price": (int, float), "bedrooms": (int, float)}
+
+
+def _encode_cursor(sort: str, values: list) -> str:
+    return base64.urlsafe_b64encode(json.dumps([sort, *values]).encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str, sort: str) -> list:
+    """
+    The keyset position (is_null, value, id) in a cursor made for sort.
+    Raises ValueError if it is malformed, was made for another sort, or holds
+    values of the wrong type.
+    """
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(cursor + padding))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != 4:
+        raise ValueError("Invalid cursor")
+    cursor_sort, is_null, value, last_id = values
+    if cursor_sort != sort:
+        raise ValueError("Cursor does not match sort")
+    column, _, nullable = LISTING_SORTS[sort]
+    if not isinstance(is_null, bool) or not isinstance(last_id, int) or isinstance(last_id, bool):
+        raise ValueError("Invalid cursor")
+    if is_null:
+        valid = nullable and value is None
+    else:
+        valid = isinstance(value, _CURSOR_VALUE_TYPES[column]) and not isinstance(value, bool)
+    if not valid:
+        raise ValueError("Invalid cursor")
+    return [is_null, value, last_id]
+
+
+def _keyset_clause(column: str, direction: str, nullable: bool, cursor: list) -> tuple[str, list]:
+    """WHERE clause selecting rows strictly after the cursor (is_null, value, id)."""
+    is_null, value, last_id = cursor
+    op = ">" if direction == "ASC" else "<"
+    if not nullable:
+        return f"({column} {op} ? OR ({column} = ? AND id {op} ?))", [value, value, last_id]
+    if is_null:
+        return f"({column} IS NULL AND id {op} ?)", [last_id]
+    return (
+        f"({column} IS NULL OR {column} {op} ? OR ({column} = ? AND id {op} ?))",
+        [value, value, last_id],
+    )
+
+
+@observe_db
+async def query_listings(
+    filters: dict,
+    sort: str = "newest",
+    limit: int = 50,
+    cursor: str | None = None,
+    as_tuples: bool = False,
+) -> dict:
+    """
+    Return one keyset-paginated page of listings matching the filters.
+
+    Filters mirror src/utils/filterListings.js: price/bedrooms/bathrooms bounds
+    let listings with an unknown value through, category and source are lists.
+    With as_tuples the listings are plain tuples in LISTING_COLUMNS order, as
+    from get_listing_rows, for the columnar format.
+    Raises ValueError for an unknown sort key or a malformed cursor.
+    """
+    if sort not in LISTING_SORTS:
+        raise ValueError(f"Invalid sort. Must be one of: {', '.join(LISTING_SORTS)}")
+    column, direction, nullable = LISTING_SORTS[sort]
+
+    where, params = _filter_clauses(filters)
+    if cursor:
+        clause, clause_params = _keyset_clause(column, direction, nullable, _decode_cursor(cursor, sort))
+        where.append(clause)
+        params.extend(clause_params)
+
+    sql = f"""
+        SELECT address, source, price, bedrooms, bathrooms,
+               category, square_feet, move_in_date,
+               listing_link AS url, scraped_at, updated_at{"" if as_tuples else ", id"}
+        FROM listings
+        WHERE {" AND ".join(where)}
+        ORDER BY {_order_by(sort)}
+        LIMIT ?
+    """
+    async with _read() as db:
+        result = await db.execute(sql, [*params, limit + 1])
+        if as_tuples:
+            result.row_factory = None
+            rows = await result.fetchall()
+            next_cursor = None
+            if len(rows) > limit:
+                # Only the last row's id is needed, for the cursor; look it up
+                # by (address, source) rather than carrying it on every row.
+                rows = rows[:limit]
+                last = rows[-1]
+                found = await db.execute(
+                    "SELECT id FROM listings WHERE address = ? AND source = ?", (last[0], last[1])
+                )
+                (last_id,) = await found.fetchone()
+                value = last[LISTING_COLUMNS.index(column)]
+                next_cursor = _encode_cursor(sort, [value is None, value, last_id])
+            return {"listings": rows, "next_cursor": next_cursor}
+        rows = [dict(row) for row in await result.fetchall()]
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = _encode_cursor(sort, [last[column] is None, last[column], last["id"]])
+    for row in rows:
+        del row["id"]
+    return {"listings": rows, "next_cursor": next_cursor}
+
+
+def _order_by(sort: str) -> str:
+    column, direction, nullable = LISTING_SORTS[sort]
+    order = f"{column} {direction}, id {direction}"
+    return f"{column} IS NULL, {order}" if nullable else order
+
+
+def _filter_clauses(filters: dict) -> tuple[list[str], list]:
+    """WHERE terms and parameters for active listings matching query_listings-style filters."""
+    where, params = ["active = 1"], []
+    bounds = [
+        ("price_min", "price", ">="),
+        ("price_max", "price", "<="),
+        ("bedrooms_min", "bedrooms", ">="),
+        ("bedrooms_max", "bedrooms", "<="),
+        ("bathrooms_min", "bathrooms", ">="),
+    ]
+    for key, col, op in bounds:
+        if filters.get(key) is not None:
+            where.append(f"({col} IS NULL OR {col} {op} ?)")
+            params.append(filters[key])
+    for key, col in (("category", "category"), ("source", "source")):
+        values = filters.get(key)
+        if values:
+            where.append(f"{col} IN ({', '.join('?' for _ in values)})")
+            params.extend(values)
+    return where, params
+
+
+async def stream_listings(
+    filters: dict | None = None,
+    sort: str = "newest",
+    limit: int | None = None,
+    batch_size: int = LISTING_STREAM_BATCH,
+):
+    """
+    Yield matching listings (same fields as get_all_listings) in batches of
+    at most batch_size dicts, so only one batch is in memory at a time. Each
+    batch is its own keyset query on a reader that is returned to the pool
+    before the batch is yielded, so a slow consumer never holds a connection.
+    Rows written mid-stream may or may not be included, but none repeats.
+    Raises ValueError for an unknown sort key.
+    """
+    if sort not in LISTING_SORTS:
+        raise ValueError(f"Invalid sort. Must be one of: {', '.join(LISTING_SORTS)}")
+    column, direction, nullable = LISTING_SORTS[sort]
+    remaining = limit
+    after = None  # keyset position (is_null, value, id) of the last row sent
+    while remaining is None or remaining > 0:
+        size = batch_size if remaining is None else min(batch_size, remaining)
+        where, params = _filter_clauses(filters or {})
+        if after is not None:
+            clause, clause_params = _keyset_clause(column, direction, nullable, after)
+            where.append(clause)
+            params.extend(clause_params)
+        sql = f"""
+            SELECT id, address, source, price, bedrooms, bathrooms,
+                   category, square_feet, move_in_date,
+                   listing_link AS url, scraped_at, updated_at
+            FROM listings
+            WHERE {" AND ".join(where)}
+            ORDER BY {_order_by(sort)}
+            LIMIT ?
+        """
+        async with _read() as db:
+            cursor = await db.execute(sql, [*params, size])
+            rows = [dict(row) for row in await cursor.fetchall()]
+        if not rows:
+            return
+        last = rows[-1]
+        after = [last[column] is None, last[column], last["id"]]
+        for row in rows:
+            del row["id"]
+        yield rows
+        if len(rows) < size:
+            return
+        if remaining is not None:
+            remaining -= len(rows)
+
+
+@observe_db
 async def get_scrape_metadata() -> dict:
-    """Return total listing count and most recent update timestamp."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        cursor = await db.execute("SELECT COUNT(*) FROM listings")
-        (total,) = await cursor.fetchone()
-        cursor = await db.execute("SELECT MAX(updated_at) FROM listings")
-        (last_updated,) = await cursor.fetchone()
-        return {"total_listings": total, "last_updated": last_updated}
+    """
+    Return total listing count, most recent update timestamp and a per-source
+    breakdown. Reads the small source_stats table instead of scanning listings.
+    """
+    async with _read() as db:
+        cursor = await db.execute(
+            """
+            SELECT source, listing_count, last_updated, last_success_at
+            FROM source_stats
+            ORDER BY source
+            """
+        )
+        rows = await cursor.fetchall()
+        cursor = await db.execute("SELECT value FROM counters WHERE name = 'listings_revision'")
+        (revision,) = await cursor.fetchone()
+    sources = {
+        row["source"]: {
+            "count": row["listing_count"],
+            "last_updated": row["last_updated"],
+            "last_success_at": row["last_success_at"],
+        }
+        for row in rows
+    }
+    updated = [s["last_updated"] for s in sources.values() if s["last_updated"]]
+    return {
+        "total_listings": sum(s["count"] for s in sources.values()),
+        "last_updated": max(updated) if updated else None,
+        "sources": sources,
+        "revision": revision,
+    }
+
+
+@observe_db
+async def get_listing_changes(since: int) -> dict:
+    """
+    Return listings added or changed after revision `since`, tombstones for
+    listings removed after it, and the current revision high-water mark.
+    A given (address, source) appears in at most one of the two lists.
+    """
+    async with _read() as db:
+        # Read the high-water mark first: anything written after it is picked
+        # up by the next call instead of being skipped.
+        cursor = await db.execute("SELECT value FROM counters WHERE name = 'listings_revision'")
+        (revision,) = await cursor.fetchone()
+        cursor = await db.execute(
+            """
+            SELECT address, source, price, bedrooms, bathrooms,
+                   category, square_feet, move_in_date,
+                   listing_link AS url, scraped_at, updated_at, revision
+            FROM listings
+            WHERE revision > ? AND revision <= ? AND active = 1
+            ORDER BY revision
+            """,
+            (since, revision),
+        )
+        changed = [dict(row) for row in await cursor.fetchall()]
+        # Retired rows and purged rows (tombstones) both count as removals.
+        cursor = await db.execute(
+            """
+            SELECT address, source, revision, last_seen_at AS deleted_at
+            FROM listings
+            WHERE revision > ? AND revision <= ? AND active = 0
+            UNION ALL
+            SELECT address, source, revision, deleted_at
+            FROM listing_tombstones
+            WHERE revision > ? AND revision <= ?
+            ORDER BY revision
+            """,
+            (since, revision, since, revision),
+        )
+        removed = [dict(row) for row in await cursor.fetchall()]
+    return {"changed": changed, "removed": removed, "revision": revision}
 
 
 # ── Sublease posts ────────────────────────────────────────────────────────────
 
+@observe_db
 async def create_sublease_post(post: dict) -> dict:
     """Insert a new sublease post and return it with its generated id."""
     now = datetime.now(timezone.utc).isoformat()
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with _write() as db:
         cursor = await db.execute(
             """
             INSERT INTO sublease_posts (title, location, rent, dates, description,
@@ -168,10 +964,10 @@ async def create_sublease_post(post: dict) -> dict:
         return {**post, "id": cursor.lastrowid, "created_at": now}
 
 
+@observe_db
 async def get_sublease_posts() -> list[dict]:
     """Return all sublease posts, newest first."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
+    async with _read() as db:
         cursor = await db.execute(
             """
             SELECT id, title, location, rent, dates, description,
@@ -184,10 +980,10 @@ async def get_sublease_posts() -> list[dict]:
         return [dict(row) for row in rows]
 
 
+@observe_db
 async def delete_sublease_post(post_id: int, author_email: str) -> bool:
     """Delete a sublease post. Returns True if deleted, False if not found or not owned."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        await db.execute("PRAGMA foreign_keys = ON")
+    async with _write() as db:
         cursor = await db.execute(
             "DELETE FROM sublease_posts WHERE id = ? AND author_email = ?",
             (post_id, author_email),
@@ -198,11 +994,11 @@ async def delete_sublease_post(post_id: int, author_email: str) -> bool:
 
 # ── Sublease comments ─────────────────────────────────────────────────────────
 
+@observe_db
 async def create_comment(post_id: int, comment: dict) -> dict:
     """Insert a new comment on a sublease post."""
     now = datetime.now(timezone.utc).isoformat()
-    async with aiosqlite.connect(DB_PATH) as db:
-        await db.execute("PRAGMA foreign_keys = ON")
+    async with _write() as db:
         cursor = await db.execute(
             """
             INSERT INTO sublease_comments (post_id, text, author_name, author_email, created_at)
@@ -221,10 +1017,10 @@ async def create_comment(post_id: int, comment: dict) -> dict:
         }
 
 
+@observe_db
 async def get_comments_for_post(post_id: int) -> list[dict]:
     """Return all comments for a given sublease post, oldest first."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
+    async with _read() as db:
         cursor = await db.execute(
             """
             SELECT id, post_id, text, author_name, author_email, created_at
@@ -238,9 +1034,10 @@ async def get_comments_for_post(post_id: int) -> list[dict]:
         return [dict(row) for row in rows]
 
 
+@observe_db
 async def delete_comment(comment_id: int, author_email: str) -> bool:
     """Delete a comment. Returns True if deleted, False if not found or not owned."""
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with _write() as db:
         cursor = await db.execute(
             "DELETE FROM sublease_comments WHERE id = ? AND author_email = ?",
             (comment_id, author_email),
@@ -251,11 +1048,11 @@ async def delete_comment(comment_id: int, author_email: str) -> bool:
 
 # ── Users ─────────────────────────────────────────────────────────────────────
 
+@observe_db
 async def upsert_user(email: str, google_sub: str) -> dict:
     """Insert a new user or return the existing one. Does not overwrite role."""
     now = datetime.now(timezone.utc).isoformat()
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
+    async with _write() as db:
         await db.execute(
             """
             INSERT INTO users (email, google_sub, role, created_at)
@@ -273,10 +1070,10 @@ async def upsert_user(email: str, google_sub: str) -> dict:
         return dict(row)
 
 
+@observe_db
 async def get_user_by_sub(google_sub: str) -> dict | None:
     """Return a user by their Google sub, or None if not found."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
+    async with _read() as db:
         cursor = await db.execute(
             "SELECT id, email, google_sub, role, created_at FROM users WHERE google_sub = ?",
             (google_sub,),
@@ -285,10 +1082,10 @@ async def get_user_by_sub(google_sub: str) -> dict | None:
         return dict(row) if row else None
 
 
+@observe_db
 async def get_all_users() -> list[dict]:
     """Return all users ordered by created_at."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
+    async with _read() as db:
         cursor = await db.execute(
             "SELECT id, email, google_sub, role, created_at FROM users ORDER BY created_at ASC"
         )
@@ -296,10 +1093,10 @@ async def get_all_users() -> list[dict]:
         return [dict(row) for row in rows]
 
 
+@observe_db
 async def update_user_role(user_id: int, role: str) -> dict | None:
     """Update a user's role. Returns the updated user or None if not found."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
+    async with _write() as db:
         await db.execute(
             "UPDATE users SET role = ? WHERE id = ?",
             (role, user_id),
@@ -310,4 +1107,360 @@ async def update_user_role(user_id: int, role: str) -> dict | None:
             (user_id,),
         )
         row = await cursor.fetchone()
-        return dict(row) if row else None
\ No newline at end of file
+        return dict(row) if row else None
+
+
+# ── Scrape schedule ───────────────────────────────────────────────────────────
+
+@observe_db
+async def get_scrape_schedule() -> list[dict]:
+    """Return every source's schedule entry, soonest next run first."""
+    async with _read() as db:
+        cursor = await db.execute(
+            """
+            SELECT source, interval_hours, next_run_at, last_run_at,
+                   last_status, consecutive_failures
+            FROM scrape_schedule
+            ORDER BY next_run_at ASC
+            """
+        )
+        rows = await cursor.fetchall()
+        return [dict(row) for row in rows]
+
+
+@observe_db
+async def save_scrape_schedule(entry: dict):
+    """Insert or replace one source's schedule entry."""
+    async with _write() as db:
+        await db.execute(
+            """
+            INSERT INTO scrape_schedule (source, interval_hours, next_run_at, last_run_at,
+                                         last_status, consecutive_failures)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(source) DO UPDATE SET
+                interval_hours = excluded.interval_hours,
+                next_run_at = excluded.next_run_at,
+                last_run_at = excluded.last_run_at,
+                last_status = excluded.last_status,
+                consecutive_failures = excluded.consecutive_failures
+            """,
+            (
+                entry["source"],
+                entry["interval_hours"],
+                entry["next_run_at"],
+                entry.get("last_run_at"),
+                entry.get("last_status"),
+                entry.get("consecutive_failures", 0),
+            ),
+        )
+        await db.commit()
+
+
+# ── HTTP cache ────────────────────────────────────────────────────────────────
+
+@observe_db
+async def get_http_cache_entry(url: str) -> dict | None:
+    """Return the stored validators and body for a URL, or None."""
+    async with _read() as db:
+        cursor = await db.execute(
+            "SELECT url, etag, last_modified, body, fetched_at FROM http_cache WHERE url = ?",
+            (url,),
+        )
+        row = await cursor.fetchone()
+        return dict(row) if row else None
+
+
+@observe_db
+async def save_http_cache_entry(url: str, etag: str | None, last_modified: str | None, body: str):
+    """Store the validators and body of a successful response."""
+    now = datetime.now(timezone.utc).isoformat()
+    async with _write() as db:
+        await db.execute(
+            """
+            INSERT INTO http_cache (url, etag, last_modified, body, fetched_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(url) DO UPDATE SET
+                etag = excluded.etag,
+                last_modified = excluded.last_modified,
+                body = excluded.body,
+                fetched_at = excluded.fetched_at
+            """,
+            (url, etag, last_modified, body, now),
+        )
+        await db.commit()
+
+
+# ── Selector cache ────────────────────────────────────────────────────────────
+
+@observe_db
+async def get_selector_cache(source: str) -> dict | None:
+    """Return the cached card selector entry for a source, or None."""
+    async with _read() as db:
+        cursor = await db.execute(
+            """
+            SELECT source, selector, fingerprint, card_count, hits, misses, updated_at
+            FROM selector_cache WHERE source = ?
+            """,
+            (source,),
+        )
+        row = await cursor.fetchone()
+        return dict(row) if row else None
+
+
+@observe_db
+async def record_selector_hit(source: str, card_count: int):
+    """Count a run that reused the cached selector."""
+    now = datetime.now(timezone.utc).isoformat()
+    async with _write() as db:
+        await db.execute(
+            "UPDATE selector_cache SET hits = hits + 1, card_count = ?, updated_at = ? WHERE source = ?",
+            (card_count, now, source),
+        )
+        await db.commit()
+
+
+@observe_db
+async def save_selector_cache(source: str, selector: str, fingerprint: str, card_count: int):
+    """Store the selector a full probe settled on, counting the run as a miss."""
+    now = datetime.now(timezone.utc).isoformat()
+    async with _write() as db:
+        await db.execute(
+            """
+            INSERT INTO selector_cache (source, selector, fingerprint, card_count, misses, updated_at)
+            VALUES (?, ?, ?, ?, 1, ?)
+            ON CONFLICT(source) DO UPDATE SET
+                selector = excluded.selector,
+                fingerprint = excluded.fingerprint,
+                card_count = excluded.card_count,
+                misses = selector_cache.misses + 1,
+                updated_at = excluded.updated_at
+            """,
+            (source, selector, fingerprint, card_count, now),
+        )
+        await db.commit()
+
+
+# ── Page hashes ───────────────────────────────────────────────────────────────
+
+@observe_db
+async def get_page_hashes() -> dict[str, dict]:
+    """source → {content_hash, checked_at, changed_at, checks, skips}."""
+    async with _read() as db:
+        cursor = await db.execute(
+            "SELECT source, content_hash, checked_at, changed_at, checks, skips FROM page_hashes"
+        )
+        return {row["source"]: dict(row) for row in await cursor.fetchall()}
+
+
+@observe_db
+async def record_page_check(source: str, content_hash: str, skipped: bool) -> dict:
+    """
+    Record one scrape of a source's page. skipped=True means the hash matched
+    and only checked_at moves; otherwise the new hash is stored as changed now.
+    A skip also counts as a successful run in source_stats: the page was read
+    and still lists what is stored, so retire_missing must not date a later
+    removal back to the last run that changed something. Returns the updated row.
+    """
+    now = datetime.now(timezone.utc).isoformat()
+    async with _write() as db:
+        await db.execute(
+            """
+            INSERT INTO page_hashes (source, content_hash, checked_at, changed_at, checks, skips)
+            VALUES (?, ?, ?, ?, 1, ?)
+            ON CONFLICT(source) DO UPDATE SET
+                content_hash = excluded.content_hash,
+                checked_at = excluded.checked_at,
+                changed_at = CASE WHEN ? THEN page_hashes.changed_at ELSE excluded.changed_at END,
+                checks = page_hashes.checks + 1,
+                skips = page_hashes.skips + excluded.skips
+            """,
+            (source, content_hash, now, now, int(skipped), int(skipped)),
+        )
+        if skipped:
+            await db.execute(
+                """
+                INSERT INTO source_stats (source, last_success_at) VALUES (?, ?)
+                ON CONFLICT(source) DO UPDATE SET last_success_at = excluded.last_success_at
+                """,
+                (source, now),
+            )
+        await db.commit()
+        cursor = await db.execute(
+            "SELECT source, content_hash, checked_at, changed_at, checks, skips FROM page_hashes WHERE source = ?",
+            (source,),
+        )
+        row = dict(await cursor.fetchone())
+    if skipped:
+        # source_stats is part of the /listings payload (per_source).
+        _bump_generation()
+    return row
+
+
+# ── Scrape runs ───────────────────────────────────────────────────────────────
+
+SCRAPE_RUN_COLUMNS = (
+    "run_id", "source", "started_at", "finished_at", "duration_seconds",
+    "launch_seconds", "navigate_seconds", "extract_seconds", "upsert_seconds",
+    "phases", "status", "listing_count", "error_type", "error_message", "peak_rss_mb",
+)
+
+
+@observe_db
+async def record_scrape_run(run: dict):
+    """Insert one scrape_runs row. phases (a dict) is stored as JSON."""
+    values = [run.get(c) for c in SCRAPE_RUN_COLUMNS]
+    values[SCRAPE_RUN_COLUMNS.index("phases")] = json.dumps(run["phases"]) if run.get("phases") else None
+    async with _write() as db:
+        await db.execute(
+            f"INSERT INTO scrape_runs ({', '.join(SCRAPE_RUN_COLUMNS)}) "
+            f"VALUES ({', '.join('?' for _ in SCRAPE_RUN_COLUMNS)})",
+            values,
+        )
+        await db.commit()
+
+
+@observe_db
+async def get_recent_scrape_runs(per_source: int) -> dict[str, list[dict]]:
+    """source → its latest per_source runs, newest first."""
+    async with _read() as db:
+        cursor = await db.execute(
+            f"""
+            SELECT id, {', '.join(SCRAPE_RUN_COLUMNS)} FROM (
+                SELECT *, ROW_NUMBER() OVER (PARTITION BY source ORDER BY started_at DESC) AS n
+                FROM scrape_runs
+            )
+            WHERE n <= ?
+            ORDER BY source, started_at DESC
+            """,
+            (per_source,),
+        )
+        runs: dict[str, list[dict]] = {}
+        for row in await cursor.fetchall():
+            run = dict(row)
+            run["phases"] = json.loads(run["phases"]) if run["phases"] else None
+            runs.setdefault(run["source"], []).append(run)
+        return runs
+
+
+@observe_db
+async def prune_scrape_runs(keep_per_source: int) -> int:
+    """Delete all but the newest keep_per_source runs of each source. Returns the count."""
+    async with _write() as db:
+        cursor = await db.execute(
+            """
+            DELETE FROM scrape_runs WHERE id IN (
+                SELECT id FROM (
+                    SELECT id, ROW_NUMBER() OVER (PARTITION BY source ORDER BY started_at DESC) AS n
+                    FROM scrape_runs
+                )
+                WHERE n > ?
+            )
+            """,
+            (keep_per_source,),
+        )
+        await db.commit()
+        return cursor.rowcount
+
+
+# ── Geocoding ────────────────────────────────────────────────────────────────
+
+@observe_db
+async def get_listings_missing_coords(source: str | None = None, limit: int = 500) -> list[dict]:
+    """Active listings (id, address) that have no coordinates yet, optionally for one source."""
+    where, params = "active = 1 AND lat IS NULL", []
+    if source:
+        where += " AND source = ?"
+        params.append(source)
+    async with _read() as db:
+        cursor = await db.execute(f"SELECT id, address FROM listings WHERE {where} LIMIT ?", (*params, limit))
+        return [dict(row) for row in await cursor.fetchall()]
+
+
+@observe_db
+async def get_geocode_cache(address_keys: list[str]) -> dict[str, dict]:
+    """address_key → {lat, lng, provider, geocoded_at} for the keys that are cached."""
+    cached = {}
+    async with _read() as db:
+        # Chunked to stay under SQLite's bound-parameter limit.
+        for i in range(0, len(address_keys), 500):
+            chunk = address_keys[i:i + 500]
+            cursor = await db.execute(
+                f"SELECT * FROM geocode_cache WHERE address_key IN ({', '.join('?' for _ in chunk)})", chunk
+            )
+            for row in await cursor.fetchall():
+                cached[row["address_key"]] = dict(row)
+    return cached
+
+
+@observe_db
+async def save_geocodes(results: dict[str, tuple[float, float] | None], provider: str):
+    """Cache geocoder results by address_key; None records a miss."""
+    now = datetime.now(timezone.utc).isoformat()
+    async with _write() as db:
+        await db.executemany(
+            "INSERT OR REPLACE INTO geocode_cache (address_key, lat, lng, provider, geocoded_at) VALUES (?, ?, ?, ?, ?)",
+            [
+                (key, point[0] if point else None, point[1] if point else None, provider, now)
+                for key, point in results.items()
+            ],
+        )
+        await db.commit()
+
+
+@observe_db
+async def set_listing_coords(coords: list[tuple[int, float, float]]):
+    """Store (listing id, lat, lng) triples; the R*Tree follows via trigger."""
+    async with _write() as db:
+        await db.executemany(
+            "UPDATE listings SET lat = ?, lng = ? WHERE id = ?", [(lat, lng, id_) for id_, lat, lng in coords]
+        )
+        await db.commit()
+
+
+@observe_db
+async def get_listings_within(
+    min_lat: float, min_lng: float, max_lat: float, max_lng: float, limit: int = 500
+) -> list[dict]:
+    """
+    Active listings whose coordinates fall inside the box, via the
+    listings_rtree index. The R*Tree stores 32-bit floats rounded outwards, so
+    it is queried for overlap and the exact bounds are checked on listings.
+    Ordered cheapest first (unknown prices last), so a truncated result is the
+    same set of listings however the box was panned.
+    """
+    async with _read() as db:
+        cursor = await db.execute(
+            """
+            SELECT l.address, l.source, l.price, l.bedrooms, l.bathrooms,
+                   l.category, l.square_feet, l.move_in_date,
+                   l.listing_link AS url, l.scraped_at, l.updated_at, l.lat, l.lng
+            FROM listings_rtree r
+            JOIN listings l ON l.id = r.id
+            WHERE r.max_lat >= ? AND r.min_lat <= ? AND r.max_lng >= ? AND r.min_lng <= ?
+              AND l.lat BETWEEN ? AND ? AND l.lng BETWEEN ? AND ?
+              AND l.active = 1
+            ORDER BY l.price IS NULL, l.price, l.id
+            LIMIT ?
+            """,
+            (min_lat, max_lat, min_lng, max_lng, min_lat, max_lat, min_lng, max_lng, limit),
+        )
+        return [dict(row) for row in await cursor.fetchall()]
+
+
+@observe_db
+async def get_unlocated_listings(limit: int = 500) -> list[dict]:
+    """Active listings without coordinates (same fields as get_all_listings), cheapest first."""
+    async with _read() as db:
+        cursor = await db.execute(
+            """
+            SELECT address, source, price, bedrooms, bathrooms,
+                   category, square_feet, move_in_date,
+                   listing_link AS url, scraped_at, updated_at
+            FROM listings
+            WHERE active = 1 AND lat IS NULL
+            ORDER BY price IS NULL, price, id
+            LIMIT ?
+            """,
+            (limit,),
+        )
+        return [dict(row) for row in await cursor.fetchall()]
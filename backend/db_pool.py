@@ -0,0 +1,121 @@
+"""
+Long-lived aiosqlite connection pool.
+
+Opening an aiosqlite connection starts a worker thread, reopens the file and
+re-runs PRAGMAs, so database.py borrows connections from this pool instead of
+connecting per call. Readers share a small set of connections; all writes go
+through one dedicated writer connection, which matches SQLite's single-writer
+model and avoids "database is locked" errors between our own connections.
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+import aiosqlite
+
+
+async def _open_connection(path: str, readonly: bool) -> aiosqlite.Connection:
+    db = await aiosqlite.connect(path)
+    db.row_factory = aiosqlite.Row
+    await db.execute("PRAGMA journal_mode=WAL")
+    await db.execute("PRAGMA foreign_keys = ON")
+    await db.execute("PRAGMA busy_timeout = 5000")
+    await db.execute("PRAGMA synchronous = NORMAL")
+    if readonly:
+        await db.execute("PRAGMA query_only = ON")
+    return db
+
+
+class ConnectionPool:
+    """A fixed set of reader connections plus one writer connection."""
+
+    def __init__(self, path: str, readers: int = 4):
+        self.path = path
+        self.size = max(1, readers)
+        self._readers: asyncio.Queue = asyncio.Queue()
+        self._all_readers: list[aiosqlite.Connection] = []
+        self._writer: aiosqlite.Connection | None = None
+        self._writer_lock = asyncio.Lock()
+        self._closed = True
+        self._stats = {
+            "read": {"acquired": 0, "waited": 0, "wait_total": 0.0, "wait_max": 0.0},
+            "write": {"acquired": 0, "waited": 0, "wait_total": 0.0, "wait_max": 0.0},
+        }
+
+    async def open(self):
+        """Open all connections. Safe to call once per pool."""
+        for _ in range(self.size):
+            db = await _open_connection(self.path, readonly=True)
+            self._all_readers.append(db)
+            self._readers.put_nowait(db)
+        self._writer = await _open_connection(self.path, readonly=False)
+        self._closed = False
+
+    async def close(self):
+        """Close every connection, waiting for borrowed ones to be returned."""
+        self._closed = True
+        async with self._writer_lock:
+            if self._writer is not None:
+                await self._writer.close()
+                self._writer = None
+        for _ in range(len(self._all_readers)):
+            db = await self._readers.get()
+            await db.close()
+        self._all_readers.clear()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def _record(self, kind: str, waited: float):
+        stats = self._stats[kind]
+        stats["acquired"] += 1
+        if waited > 0.001:
+            stats["waited"] += 1
+        stats["wait_total"] += waited
+        stats["wait_max"] = max(stats["wait_max"], waited)
+
+    @asynccontextmanager
+    async def reader(self):
+        """Borrow a read-only connection."""
+        start = time.perf_counter()
+        db = await self._readers.get()
+        self._record("read", time.perf_counter() - start)
+        try:
+            yield db
+        finally:
+            self._readers.put_nowait(db)
+
+    @asynccontextmanager
+    async def writer(self):
+        """Borrow the writer connection. Uncommitted work is rolled back on error."""
+        start = time.perf_counter()
+        async with self._writer_lock:
+            self._record("write", time.perf_counter() - start)
+            try:
+                yield self._writer
+            except BaseException:
+                await self._writer.rollback()
+                raise
+
+    def stats(self) -> dict:
+        """Pool size, current usage and acquire wait-time statistics."""
+
+        def summarize(kind: str) -> dict:
+            s = self._stats[kind]
+            return {
+                "acquired": s["acquired"],
+                "waited": s["waited"],
+                "wait_total_ms": round(s["wait_total"] * 1000, 3),
+                "wait_avg_ms": round(s["wait_total"] * 1000 / s["acquired"], 3) if s["acquired"] else 0.0,
+                "wait_max_ms": round(s["wait_max"] * 1000, 3),
+            }
+
+        return {
+            "readers": self.size,
+            "readers_in_use": self.size - self._readers.qsize() if not self._closed else 0,
+            "writer_in_use": self._writer_lock.locked(),
+            "read": summarize("read"),
+            "write": summarize("write"),
+        }
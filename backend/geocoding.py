@@ -0,0 +1,212 @@
+"""
+Server-side geocoding of listing addresses.
+
+Listings get lat/lng once, at ingest: after each source is scraped the
+scheduler calls geocode_missing(source), which resolves active listings without
+coordinates. Lookups go through the geocode_cache table first, keyed by
+normalize_address, so an address is sent to the provider at most once (misses
+are cached too and retried after GEOCODE_RETRY_DAYS).
+
+The provider is pluggable (a Geocoder subclass) and chosen with GEOCODER:
+  google   Google Geocoding API, needs GOOGLE_GEOCODING_API_KEY
+  offline  deterministic stand-in that places each address at a stable point
+           inside Isla Vista; no network, for development and tests
+  none     no server-side geocoding
+The default is google when GOOGLE_GEOCODING_API_KEY is set, otherwise none.
+Listings left without coordinates (all of them under none) are served by
+GET /listings/unlocated, and the map geocodes those in the browser.
+"""
+
+import asyncio
+import hashlib
+from abc import ABC, abstractmethod
+import os
+import re
+from datetime import datetime, timedelta, timezone
+
+import httpx
+
+from database import get_geocode_cache, get_listings_missing_coords, save_geocodes, set_listing_coords
+
+GOOGLE_GEOCODING_API_KEY = os.getenv("GOOGLE_GEOCODING_API_KEY", "")
+GEOCODER = os.getenv("GEOCODER", "google" if GOOGLE_GEOCODING_API_KEY else "none")
+GEOCODE_CONCURRENCY = int(os.getenv("GEOCODE_CONCURRENCY", "4"))
+GEOCODE_BATCH = int(os.getenv("GEOCODE_BATCH", "500"))  # listings per geocode_missing call
+GEOCODE_RETRY_DAYS = float(os.getenv("GEOCODE_RETRY_DAYS", "7"))
+
+# (south, west, north, east) of Isla Vista, for the offline provider.
+ISLA_VISTA_BOUNDS = (34.4080, -119.8740, 34.4175, -119.8500)
+LOCALITY_HINTS = ("isla vista", "goleta", "santa barbara")
+
+_ABBREVIATIONS = {
+    "street": "st", "road": "rd", "drive": "dr", "avenue": "ave", "lane": "ln",
+    "court": "ct", "place": "pl", "boulevard": "blvd", "apartment": "apt",
+    "unit": "#", "number": "#",
+}
+
+
+def normalize_address(address: str) -> str:
+    """
+    Cache key for an address: lowercased, punctuation dropped, whitespace
+    collapsed and common street words abbreviated, so "6510 Del Playa Drive,
+    Unit A" and "6510 del playa dr #a" share one geocode_cache row.
+    """
+    text = re.sub(r"[^\w\s#]", " ", address.lower())
+    words = [_ABBREVIATIONS.get(word, word) for word in text.split()]
+    return re.sub(r"#\s+", "#", " ".join(words))
+
+
+def with_locality(address: str) -> str:
+    """The address as sent to a provider: with ", Isla Vista, CA" unless it names a town."""
+    lowered = address.lower()
+    return address if any(hint in lowered for hint in LOCALITY_HINTS) else f"{address}, Isla Vista, CA"
+
+
+class Geocoder(ABC):
+    """
+    Resolves one address to (lat, lng), or None when it cannot be found.
+    Providers must implement geocode; one that doesn't cannot be instantiated.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    async def geocode(self, address: str) -> tuple[float, float] | None:
+        ...
+
+    async def close(self):
+        pass
+
+
+class OfflineGeocoder(Geocoder):
+    """
+    Places each address at a point inside ISLA_VISTA_BOUNDS derived from a hash
+    of its normalized form. Stable across runs, needs no network or key; the
+    points are not real locations.
+    """
+
+    name = "offline"
+
+    async def geocode(self, address: str) -> tuple[float, float] | None:
+        digest = hashlib.sha1(normalize_address(address).encode()).digest()
+        south, west, north, east = ISLA_VISTA_BOUNDS
+        fy = int.from_bytes(digest[:4], "big") / 0xFFFFFFFF
+        fx = int.from_bytes(digest[4:8], "big") / 0xFFFFFFFF
+        return round(south + fy * (north - south), 6), round(west + fx * (east - west), 6)
+
+
+class GoogleGeocoder(Geocoder):
+    """Google Geocoding API. Raises httpx.HTTPError on transport or quota errors."""
+
+    name = "google"
+    URL = "https://maps.googleapis.com/maps/api/geocode/json"
+
+    def __init__(self, api_key: str):
+        self.api_key = api_key
+        self._client = httpx.AsyncClient(timeout=10)
+
+    async def geocode(self, address: str) -> tuple[float, float] | None:
+        response = await self._client.get(self.URL, params={"address": with_locality(address), "key": self.api_key})
+        response.raise_for_status()
+        data = response.json()
+        if data.get("status") == "ZERO_RESULTS":
+            return None
+        if data.get("status") != "OK":
+            raise httpx.HTTPError(f"Geocoding API status {data.get('status')}: {data.get('error_message', '')}")
+        location = data["results"][0]["geometry"]["location"]
+        return location["lat"], location["lng"]
+
+    async def close(self):
+        await self._client.aclose()
+
+
+def make_geocoder(kind: str = GEOCODER) -> Geocoder | None:
+    if kind == "offline":
+        return OfflineGeocoder()
+    if kind == "google":
+        if not GOOGLE_GEOCODING_API_KEY:
+            print("[geocode] GEOCODER=google but GOOGLE_GEOCODING_API_KEY is not set; geocoding disabled")
+            return None
+        return GoogleGeocoder(GOOGLE_GEOCODING_API_KEY)
+    return None
+
+
+_geocoder: Geocoder | None = None
+_geocoder_made = False
+
+
+def get_geocoder() -> Geocoder | None:
+    global _geocoder, _geocoder_made
+    if not _geocoder_made:
+        _geocoder = make_geocoder()
+        _geocoder_made = True
+    return _geocoder
+
+
+async def close_geocoder():
+    """Close the provider's HTTP client. Called from the FastAPI lifespan."""
+    global _geocoder, _geocoder_made
+    if _geocoder is not None:
+        await _geocoder.close()
+    _geocoder, _geocoder_made = None, False
+
+
+def _expired(entry: dict) -> bool:
+    """Cached misses are retried after GEOCODE_RETRY_DAYS; hits never expire."""
+    if entry["lat"] is not None:
+        return False
+    age = datetime.now(timezone.utc) - datetime.fromisoformat(entry["geocoded_at"])
+    return age > timedelta(days=GEOCODE_RETRY_DAYS)
+
+
+async def geocode_missing(source: str | None = None, geocoder: Geocoder | None = None) -> dict:
+    """
+    Give coordinates to up to GEOCODE_BATCH active listings (of source, or all)
+    that lack them: from geocode_cache where possible, else from the provider.
+    Returns counts of listings located from the cache, by the provider, and
+    left without coordinates.
+    """
+    geocoder = geocoder or get_geocoder()
+    counts = {"cached": 0, "geocoded": 0, "unresolved": 0}
+    pending = await get_listings_missing_coords(source, GEOCODE_BATCH)
+    if not pending:
+        return counts
+
+    keys = {row["id"]: normalize_address(row["address"]) for row in pending}
+    cache = await get_geocode_cache(sorted(set(keys.values())))
+    lookups = {}  # address_key → an original address to send to the provider
+    for row in pending:
+        entry = cache.get(keys[row["id"]])
+        if (entry is None or _expired(entry)) and geocoder is not None:
+            lookups.setdefault(keys[row["id"]], row["address"])
+
+    resolved: dict[str, tuple[float, float] | None] = {}
+    if lookups:
+        semaphore = asyncio.Semaphore(max(1, GEOCODE_CONCURRENCY))
+
+        async def lookup(key, address):
+            async with semaphore:
+                try:
+                    resolved[key] = await geocoder.geocode(address)
+                except Exception as e:
+                    print(f"[geocode] {geocoder.name}: {address!r} failed: {e}")
+
+        await asyncio.gather(*(lookup(key, address) for key, address in lookups.items()))
+        if resolved:
+            await save_geocodes(resolved, geocoder.name)
+
+    coords = []
+    for row in pending:
+        key = keys[row["id"]]
+        if key in resolved:
+            point = resolved[key]
+            counts["geocoded" if point else "unresolved"] += 1
+        else:
+            entry = cache.get(key)
+            point = (entry["lat"], entry["lng"]) if entry and entry["lat"] is not None else None
+            counts["cached" if point else "unresolved"] += 1
+        if point:
+            coords.append((row["id"], point[0], point[1]))
+    if coords:
+        await set_listing_coords(coords)
+    return counts
@@ -0,0 +1,156 @@
+"""
+In-memory tracking of scrape jobs, for asynchronous refreshes.
+
+A ScrapeJob is one run over a set of sources, started by POST /listings/refresh
+or by the scheduler. Jobs are single-flight: while a job is running, a request
+for the same sources (or a subset) joins it instead of starting another, so
+repeated clicks and the background loop never stack up browser runs. Each
+source's progress is kept on the job and pushed to subscribers, which back the
+Server-Sent Events stream, along with the inserted / updated / unchanged /
+retired counts of its upsert. Only the last JOB_HISTORY jobs are remembered, and
+nothing survives a restart (scrape_runs in the DB is the durable record).
+"""
+
+import asyncio
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+JOB_HISTORY = 20
+FINISHED_STATES = ("ok", "unchanged", "empty", "failed")
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class ScrapeJob:
+    def __init__(self, sources: list[str], trigger: str):
+        self.id = uuid.uuid4().hex
+        self.trigger = trigger
+        self.sources = list(sources)
+        self.status = "running"
+        self.created_at = _now()
+        self.finished_at = None
+        self.error = None
+        self.joined = 0
+        self.progress = {
+            name: {"state": "pending", "started_at": None, "finished_at": None, "shared": False, "counts": None}
+            for name in sources
+        }
+        self.task: asyncio.Task | None = None
+        self._done = asyncio.Event()
+        self._subscribers: list[asyncio.Queue] = []
+
+    @property
+    def running(self) -> bool:
+        return not self._done.is_set()
+
+    def update(self, source: str, state: str, shared: bool = False, counts: dict | None = None):
+        """
+        Move a source to queued / running / ok / unchanged / empty / failed. shared
+        marks a source whose scrape was already in flight for another job; counts
+        are the upsert's inserted / updated / unchanged / retired listings.
+        """
+        entry = self.progress[source]
+        entry["state"] = state
+        entry["shared"] = entry["shared"] or shared
+        if counts is not None:
+            entry["counts"] = dict(counts)
+        if state == "running" and entry["started_at"] is None:
+            entry["started_at"] = _now()
+        elif state in FINISHED_STATES:
+            entry["finished_at"] = _now()
+        self._publish()
+
+    def finish(self, error: Exception | None = None):
+        """
+        Mark the job "done", or "failed" if it stopped with error. Failed
+        sources don't fail the job; they show in its progress.
+        """
+        if not self.running:
+            return
+        self.status = "failed" if error else "done"
+        self.error = str(error) if error else None
+        self.finished_at = _now()
+        self._done.set()
+        self._publish()
+
+    async def wait(self):
+        await self._done.wait()
+
+    def snapshot(self) -> dict:
+        done = sum(p["state"] in FINISHED_STATES for p in self.progress.values())
+        totals = {"inserted": 0, "updated": 0, "unchanged": 0, "retired": 0}
+        for entry in self.progress.values():
+            for key, value in (entry["counts"] or {}).items():
+                totals[key] = totals.get(key, 0) + value
+        return {
+            "job_id": self.id,
+            "trigger": self.trigger,
+            "status": self.status,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "joined": self.joined,
+            "completed": done,
+            "total": len(self.sources),
+            "sources": {name: dict(entry) for name, entry in self.progress.items()},
+            "counts": totals,
+            "error": self.error,
+        }
+
+    def _publish(self):
+        snapshot = self.snapshot()
+        for queue in self._subscribers:
+            queue.put_nowait(snapshot)
+
+    async def events(self):
+        """Yield a snapshot now and after every change, ending once the job finishes."""
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.append(queue)
+        try:
+            snapshot = self.snapshot()
+            while True:
+                yield snapshot
+                if snapshot["status"] != "running":
+                    return
+                snapshot = await queue.get()
+        finally:
+            self._subscribers.remove(queue)
+
+
+class JobRegistry:
+    """The running jobs plus the most recent finished ones, by id."""
+
+    def __init__(self, history: int = JOB_HISTORY):
+        self.history = history
+        self._jobs: OrderedDict[str, ScrapeJob] = OrderedDict()
+
+    def begin(self, sources: list[str], trigger: str) -> tuple[ScrapeJob, bool]:
+        """
+        Return (job, joined): the running job that already covers sources, or
+        a new job. The caller must run a new job and call its finish().
+        """
+        for job in reversed(self._jobs.values()):
+            if job.running and set(sources) <= set(job.sources):
+                job.joined += 1
+                return job, True
+        job = ScrapeJob(sources, trigger)
+        self._jobs[job.id] = job
+        finished = [j.id for j in self._jobs.values() if not j.running]
+        for job_id in finished[: max(0, len(finished) - self.history)]:
+            del self._jobs[job_id]
+        return job, False
+
+    def get(self, job_id: str) -> ScrapeJob | None:
+        return self._jobs.get(job_id)
+
+    def running(self) -> list[ScrapeJob]:
+        return [job for job in self._jobs.values() if job.running]
+
+    def recent(self) -> list[ScrapeJob]:
+        """Newest first."""
+        return list(reversed(self._jobs.values()))
+
+
+scrape_jobs = JobRegistry()
@@ -4,29 +4,44 @@ Provides endpoints for scraping rental listings from various sources.
 """
 import asyncio
 import base64
+import hashlib
 import json
 import os
 from contextlib import asynccontextmanager
-from datetime import datetime, timezone
-from fastapi import Depends, FastAPI, HTTPException, Header
+from datetime import datetime
+from fastapi import Depends, FastAPI, HTTPException, Header, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
-from scrapers.meridian import scrape_meridian
-from scrapers.solis import scrape_solis
-from scrapers.Koto import scrape_koto
-from scrapers.playalife import scrape_playalife
-from scrapers.wolfe_scraper import scrape_wolfe
+from scrapers.browser import browser_manager
+from scrapers.http_fetch import close_http_client
+from scrapers.pipeline import shutdown_parse_pool
+from geocoding import close_geocoder
 
 from database import (
-    init_db, get_all_listings, get_scrape_metadata,
+    init_db, open_pool, close_pool, get_pool_stats,
+    get_all_listings, get_listing_rows, get_scraped_listings, get_scrape_metadata,
+    query_listings, stream_listings,
+    get_data_generation, get_listings_within, get_unlocated_listings, LISTING_COLUMNS, LISTING_SORTS,
+    get_listing_changes,
     create_sublease_post, get_sublease_posts, delete_sublease_post,
     create_comment, get_comments_for_post, delete_comment,
     upsert_user, get_user_by_sub, get_all_users, update_user_role,
 )
-from scheduler import scrape_loop, run_all_scrapers_to_db
+from scheduler import (
+    SCRAPE_ALL_MAX_AGE_SECONDS, SUCCESS_STATUSES, scrape_loop, scrape_source,
+    start_scrape_job, stop_scrape_jobs,
+    get_schedule_status, get_scraper_status, get_source_freshness,
+)
+from jobs import scrape_jobs
+from response_cache import ResponseCache, etag_matches
+from scrape_cache import ScrapeResultCache
+from serialization import to_columnar
+import metrics
 
 VALID_ROLES = {"user", "admin"}
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
 
 
 def decode_jwt_payload(token: str) -> dict:
@@ -65,19 +80,33 @@ class RoleUpdateRequest(BaseModel):
     role: str
 
 _scrape_task = None
+_lag_task = None
+_listings_cache = ResponseCache()
+_scrape_cache = ScrapeResultCache()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    global _scrape_task
+    global _scrape_task, _lag_task
     await init_db()
+    await open_pool()
+    await browser_manager.start()
     _scrape_task = asyncio.create_task(scrape_loop())
+    _lag_task = asyncio.create_task(metrics.watch_loop_lag())
     yield
-    _scrape_task.cancel()
-    try:
-        await _scrape_task
-    except asyncio.CancelledError:
-        pass
+    for task in (_scrape_task, _lag_task):
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    await stop_scrape_jobs()
+    await _scrape_cache.close()
+    await close_geocoder()
+    await browser_manager.stop()
+    await close_http_client()
+    await asyncio.to_thread(shutdown_parse_pool)
+    await close_pool()
 
 
 app = FastAPI(
@@ -98,7 +127,9 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Cache"],
 )
+app.add_middleware(metrics.MetricsMiddleware)
 
 
 @app.get("/")
@@ -107,38 +138,71 @@ async def root():
     return {"status": "ok", "message": "Housing Manager API"}
 
 
+@app.get("/db/pool")
+async def db_pool_endpoint():
+    """Return database connection pool size and wait-time stats."""
+    stats = get_pool_stats()
+    if stats is None:
+        raise HTTPException(status_code=503, detail="Database pool is not open")
+    return stats
+
+
+async def _scrape_to_db(source: str) -> dict:
+    """
+    Scrape source through the scheduler, so the request shares its ScrapeBudget
+    and joins a scrape of the source already in flight, and the listings are
+    stored. An unchanged page is answered with the stored listings. A failed
+    or empty run raises, so the result cache never keeps it.
+    """
+    outcome = await scrape_source(source)
+    if outcome["status"] not in SUCCESS_STATUSES:
+        raise RuntimeError(outcome["error"])
+    result = outcome["result"]
+    if outcome["status"] == "unchanged":
+        stored = await get_scraped_listings([source])
+        result = {**result, "listings": stored.get(source, [])}
+    return result
+
+
+async def _cached_scrape(source: str, response: Response, force: bool) -> dict:
+    """
+    Serve a live scrape through the per-source result cache: concurrent
+    requests share one scrape, and force=true bypasses a cached result.
+    """
+    result, outcome = await _scrape_cache.get(source, lambda: _scrape_to_db(source), force=force)
+    response.headers["X-Cache"] = outcome
+    return result
+
+
 @app.get("/scrape/meridian")
-async def scrape_meridian_endpoint():
+async def scrape_meridian_endpoint(response: Response, force: bool = False):
     """
     Scrape rental listings from Meridian Group Real Estate.
     Returns listings with price, bedrooms, bathrooms, address, and category.
     """
     try:
-        result = await scrape_meridian()
-        return result
+        return await _cached_scrape("meridian", response, force)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Scraping failed: {str(e)}")
 
 
 @app.get("/scrape/playalife")
-async def scrape_playalife_endpoint():
+async def scrape_playalife_endpoint(response: Response, force: bool = False):
     try:
-        result = await scrape_playalife()
-        return result
+        return await _cached_scrape("playalife", response, force)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Scraping failed: {str(e)}")
 
 
 @app.get("/scrape/koto")
-async def scrape_koto_endpoint():
+async def scrape_koto_endpoint(response: Response, force: bool = False):
     """
     Scrape rental listings from Koto Group.
     Returns listings with price, bedrooms, bathrooms, address, and category.
     """
     try:
-        result = await scrape_koto()
-        # Always return the result - if it has an error field, frontend will display it
-        return result
+        # A scrape error (including an empty scrape's "error" field) becomes the detail below.
+        return await _cached_scrape("koto", response, force)
     except Exception as e:
         error_msg = str(e)
         error_type = type(e).__name__
@@ -156,103 +220,333 @@ async def scrape_koto_endpoint():
 
 
 @app.get("/scrape/wolfe")
-async def scrape_wolfe_endpoint():
+async def scrape_wolfe_endpoint(response: Response, force: bool = False):
     """
     Scrape rental listings from Wolfe & Associates (Isla Vista).
     Returns listings with price, bedrooms, bathrooms, address, availability, and contact info.
     """
     try:
-        result = await scrape_wolfe()
-        return result
+        return await _cached_scrape("wolfe", response, force)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Scraping failed: {str(e)}")
 
 
 @app.get("/scrape/solis")
-async def scrape_solis_endpoint():
+async def scrape_solis_endpoint(response: Response, force: bool = False):
     """
     Scrape rental listings from Solis Isla Vista.
     Returns listings with price, bedrooms, bathrooms, address, square footage, and move-in date.
     """
     try:
-        result = await scrape_solis()
-        return result
+        return await _cached_scrape("solis", response, force)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Scraping failed: {str(e)}")
 
 
 @app.get("/scrape/all")
-async def scrape_all_endpoint():
+async def scrape_all_endpoint(max_age: float = Query(SCRAPE_ALL_MAX_AGE_SECONDS, ge=0)):
     """
-    Scrape rental listings from all property management companies in parallel.
-    Returns combined listings with source field on each. Failed scrapers are skipped.
+    Listings from every source, re-scraping only the stale ones. A source whose
+    last successful scrape is at most max_age seconds old is answered from the
+    database. The rest are scraped through the scheduler's single-flight jobs,
+    so concurrent callers share the work and the scrape budget bounds how many
+    browsers run at once. Listings keep the per-listing shape the scrapers
+    return (listing_link and any source-specific fields), in source order. The
+    response lists which sources were fresh, re-scraped or failed; a failed
+    source contributes its last stored listings. max_age=0 re-scrapes everything.
     """
-    scrapers = [
-        ("meridian", scrape_meridian),
-        ("playalife", scrape_playalife),
-        ("koto", scrape_koto),
-        ("solis", scrape_solis),
-        ("wolfe", scrape_wolfe),
+    try:
+        freshness = await get_source_freshness()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database read failed: {str(e)}")
+    stale = [
+        name for name, f in freshness.items()
+        if f["age_seconds"] is None or f["age_seconds"] > max_age
     ]
+    job = joined = None
+    if stale:
+        job, joined = start_scrape_job(stale, trigger="api")
+        await job.wait()
+    progress = job.snapshot()["sources"] if job else {}
+    failed = [name for name in stale if progress.get(name, {}).get("state") not in ("ok", "unchanged")]
 
-    async def run_one(name, fn):
-        try:
-            return await fn()
-        except Exception as e:
-            print(f"Scraper {name} failed: {e}")
-            return {"listings": [], "scraped_at": None, "source": name}
-
-    results = await asyncio.gather(*[run_one(name, fn) for name, fn in scrapers])
-    all_listings = []
-    latest_at = None
-    for data in results:
-        listings = data.get("listings") or []
-        for listing in listings:
-            if "source" not in listing:
-                listing["source"] = data.get("source", "unknown")
-            all_listings.append(listing)
-        scraped_at = data.get("scraped_at")
-        if scraped_at and (latest_at is None or scraped_at > latest_at):
-            latest_at = scraped_at
-    if latest_at is None:
-        latest_at = datetime.now(timezone.utc).isoformat() + "Z"
+    try:
+        if stale:
+            freshness = await get_source_freshness()
+        by_source = await get_scraped_listings(list(freshness))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database read failed: {str(e)}")
+    scraped = [f["last_success_at"] for f in freshness.values() if f["last_success_at"]]
     return {
-        "listings": all_listings,
-        "scraped_at": latest_at,
-        "sources": [name for name, _ in scrapers],
+        "listings": [listing for name in freshness for listing in by_source.get(name, [])],
+        "scraped_at": max(scraped, key=datetime.fromisoformat) if scraped else None,
+        "sources": list(freshness),
+        "fresh": [name for name in freshness if name not in stale],
+        "rescraped": [name for name in stale if name not in failed],
+        "failed": failed,
+        "max_age": max_age,
+        "job_id": job.id if job else None,
+        "joined": joined,
+        "freshness": freshness,
     }
 
 
 @app.get("/listings")
-async def listings_endpoint():
-    """Return all listings from the database (pre-scraped)."""
+async def listings_endpoint(
+    request: Request,
+    price_min: int | None = None,
+    price_max: int | None = None,
+    bedrooms_min: int | None = None,
+    bedrooms_max: int | None = None,
+    bathrooms_min: float | None = None,
+    category: list[str] | None = Query(default=None),
+    source: list[str] | None = Query(default=None),
+    sort: str | None = None,
+    limit: int | None = Query(default=None, ge=1, le=500),
+    cursor: str | None = None,
+    format: str | None = None,
+    accept: str | None = Header(default=None),
+    if_none_match: str | None = Header(default=None),
+):
+    """
+    Return listings from the database (pre-scraped).
+
+    With no query parameters the full table is returned as before. Any filter,
+    sort, limit or cursor switches to a filtered, keyset-paginated page; pass
+    the returned next_cursor back as cursor to fetch the following page.
+
+    Encoded responses are cached until the listings data next changes and
+    carry a strong ETag; a matching If-None-Match gets 304 Not Modified.
+    The format can follow the Accept header, so responses send Vary: Accept.
+
+    format=ndjson (or Accept: application/x-ndjson) streams the matching
+    listings instead, one JSON object per line; see _stream_ndjson.
+    format=columnar returns "listings" in the columnar form described in
+    serialization.py, with the rest of the response unchanged.
+    """
+    filters = {
+        "price_min": price_min,
+        "price_max": price_max,
+        "bedrooms_min": bedrooms_min,
+        "bedrooms_max": bedrooms_max,
+        "bathrooms_min": bathrooms_min,
+        "category": category,
+        "source": source,
+    }
+    if format not in (None, "json", "ndjson", "columnar"):
+        raise HTTPException(status_code=400, detail="Invalid format. Must be one of: json, ndjson, columnar")
+    columnar = format == "columnar"
+    if format == "ndjson" or (format is None and NDJSON_MEDIA_TYPE in (accept or "")):
+        return await _stream_ndjson(request, filters, sort, limit, cursor, if_none_match)
+
+    generation = get_data_generation()
+    key = tuple(sorted(request.query_params.multi_items()))
+    cached = _listings_cache.get(generation, key)
+    if cached is None:
+        paginated = any(v is not None for v in filters.values()) or any(
+            v is not None for v in (sort, limit, cursor)
+        )
+        try:
+            meta = await get_scrape_metadata()
+            if paginated:
+                page = await query_listings(
+                    filters, sort=sort or "newest", limit=limit or 50, cursor=cursor, as_tuples=columnar
+                )
+                listings = page["listings"]
+                if columnar:
+                    listings = to_columnar(LISTING_COLUMNS, listings)
+                payload = {
+                    "listings": listings,
+                    "next_cursor": page["next_cursor"],
+                    "last_updated": meta["last_updated"],
+                    "total": meta["total_listings"],
+                    "per_source": meta["sources"],
+                    "revision": meta["revision"],
+                }
+            else:
+                if columnar:
+                    listings = to_columnar(LISTING_COLUMNS, await get_listing_rows())
+                else:
+                    listings = await get_all_listings()
+                payload = {
+                    "listings": listings,
+                    "last_updated": meta["last_updated"],
+                    "total": meta["total_listings"],
+                    "sources": [name for name, s in meta["sources"].items() if s["count"]],
+                    "per_source": meta["sources"],
+                    "revision": meta["revision"],
+                }
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Database read failed: {str(e)}")
+        cached = _listings_cache.put(generation, key, payload)
+
+    headers = {"ETag": cached.etag, "Cache-Control": "no-cache", "Vary": "Accept"}
+    if cached.matches(if_none_match):
+        return Response(status_code=304, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
+
+
+async def _stream_ndjson(request: Request, filters: dict, sort, limit, cursor, if_none_match):
+    """
+    Stream listings as NDJSON, a keyset batch at a time (stream_listings), so
+    memory stays bounded, the first rows go out before the last are read and
+    no pooled connection is held while the client downloads. Streams are not
+    cached. The ETag is strong, like the JSON path's: the body is a function of
+    the listings revision and the query, which is what it is built from, so an
+    unchanged table still answers If-None-Match with 304.
+    """
+    if cursor is not None:
+        raise HTTPException(status_code=400, detail="cursor is not supported with format=ndjson")
+    sort = sort or "newest"
+    if sort not in LISTING_SORTS:
+        raise HTTPException(status_code=400, detail=f"Invalid sort. Must be one of: {', '.join(LISTING_SORTS)}")
     try:
-        listings = await get_all_listings()
         meta = await get_scrape_metadata()
-        sources = list({l["source"] for l in listings})
-        return {
-            "listings": listings,
-            "last_updated": meta["last_updated"],
-            "total": meta["total_listings"],
-            "sources": sources,
-        }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database read failed: {str(e)}")
+    query = json.dumps(sorted(request.query_params.multi_items()))
+    etag = f'"ndjson-{meta["revision"]}-{hashlib.sha256(query.encode()).hexdigest()[:16]}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "no-cache",
+        "Vary": "Accept",
+        "X-Last-Updated": meta["last_updated"] or "",
+    }
+    if etag_matches(etag, if_none_match):
+        return Response(status_code=304, headers=headers)
 
+    async def body():
+        try:
+            async for batch in stream_listings(filters, sort=sort, limit=limit):
+                yield "".join(json.dumps(row, separators=(",", ":")) + "\n" for row in batch).encode()
+        except Exception as e:
+            # Headers are already sent; all we can do is end the stream early.
+            print(f"[listings] NDJSON stream failed: {e}")
 
-@app.post("/listings/refresh")
-async def refresh_listings_endpoint():
-    """Manually trigger a full re-scrape and update the database."""
+    return StreamingResponse(body(), media_type=NDJSON_MEDIA_TYPE, headers=headers)
+
+
+@app.get("/listings/within")
+async def listings_within_endpoint(
+    bbox: str = Query(..., description="min_lng,min_lat,max_lng,max_lat"),
+    limit: int = Query(default=500, ge=1, le=5000),
+):
+    """
+    Listings with coordinates inside a bounding box, for the map viewport.
+    bbox is west,south,east,north in degrees (the GeoJSON order). Listings
+    not geocoded yet are never included.
+    """
     try:
-        await run_all_scrapers_to_db()
-        meta = await get_scrape_metadata()
-        return {
-            "status": "ok",
-            "total": meta["total_listings"],
-            "last_updated": meta["last_updated"],
-        }
+        min_lng, min_lat, max_lng, max_lat = (float(v) for v in bbox.split(","))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="bbox must be min_lng,min_lat,max_lng,max_lat")
+    if min_lat > max_lat or min_lng > max_lng:
+        raise HTTPException(status_code=400, detail="bbox minimums must not exceed its maximums")
+    try:
+        listings = await get_listings_within(min_lat, min_lng, max_lat, max_lng, limit + 1)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Refresh failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Database read failed: {str(e)}")
+    return {
+        "listings": listings[:limit],
+        "count": min(len(listings), limit),
+        "truncated": len(listings) > limit,
+        "bbox": [min_lng, min_lat, max_lng, max_lat],
+    }
+
+
+@app.get("/listings/unlocated")
+async def unlocated_listings_endpoint(limit: int = Query(default=500, ge=1, le=5000)):
+    """
+    Listings the server has no coordinates for, cheapest first. With no
+    GEOCODER configured that is every listing, and the map geocodes them in
+    the browser instead.
+    """
+    try:
+        listings = await get_unlocated_listings(limit + 1)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database read failed: {str(e)}")
+    return {
+        "listings": listings[:limit],
+        "count": min(len(listings), limit),
+        "truncated": len(listings) > limit,
+    }
+
+
+@app.get("/listings/changes")
+async def listing_changes_endpoint(since: int = Query(default=0, ge=0)):
+    """
+    Return only the listings added, changed or removed after revision `since`.
+    Clients keep the returned revision and pass it as `since` on the next sync;
+    /listings also reports the revision its snapshot corresponds to.
+    """
+    try:
+        return await get_listing_changes(since)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database read failed: {str(e)}")
+
+
+@app.post("/listings/refresh", status_code=202)
+async def refresh_listings_endpoint():
+    """
+    Start a full re-scrape in the background and return its job immediately.
+    If a run covering every source is already in flight, that job is returned
+    instead ("joined": true). Follow it at /listings/refresh/{job_id}.
+    """
+    job, joined = start_scrape_job(trigger="manual")
+    return {
+        **job.snapshot(),
+        "joined": joined,
+        "status_url": f"/listings/refresh/{job.id}",
+        "events_url": f"/listings/refresh/{job.id}/events",
+    }
+
+
+@app.get("/listings/refresh")
+async def refresh_jobs_endpoint():
+    """Running and recently finished scrape jobs, newest first."""
+    return {"jobs": [job.snapshot() for job in scrape_jobs.recent()]}
+
+
+def _get_job(job_id: str):
+    job = scrape_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@app.get("/listings/refresh/{job_id}")
+async def refresh_job_status(job_id: str):
+    """A scrape job's status and per-source progress and upsert counts."""
+    job = _get_job(job_id)
+    snapshot = job.snapshot()
+    if not job.running:
+        meta = await get_scrape_metadata()
+        snapshot.update(
+            total_listings=meta["total_listings"],
+            last_updated=meta["last_updated"],
+            per_source=meta["sources"],
+        )
+    return snapshot
+
+
+@app.get("/listings/refresh/{job_id}/events")
+async def refresh_job_events(job_id: str):
+    """
+    Server-Sent Events stream of a scrape job: a "progress" event with the
+    job snapshot on every change, and a final "done" event when it finishes.
+    """
+    job = _get_job(job_id)
+
+    async def stream():
+        async for snapshot in job.events():
+            event = "progress" if snapshot["status"] == "running" else "done"
+            yield f"event: {event}\ndata: {json.dumps(snapshot)}\n\n"
+
+    return StreamingResponse(
+        stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"}
+    )
 
 
 #  Sublease post endpoints 
@@ -410,6 +704,94 @@ async def admin_update_role(
 
 #  Scrapers list 
 
+@app.get("/scrapers/schedule")
+async def scraper_schedule():
+    """Upcoming and overdue scrape runs per source, soonest first."""
+    try:
+        return {"schedule": await get_schedule_status()}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database read failed: {str(e)}")
+
+
+@app.get("/scrapers/status")
+async def scraper_status(recent: int = Query(10, ge=1, le=100), window: int = Query(100, ge=1, le=1000)):
+    """Per-source success rate, duration percentiles, last error and recent runs."""
+    try:
+        return {"sources": await get_scraper_status(recent, window)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database read failed: {str(e)}")
+
+
+_pool_gauges = {
+    "readers": metrics.Gauge("db_pool_readers", "Reader connections in the pool."),
+    "readers_in_use": metrics.Gauge("db_pool_readers_in_use", "Reader connections currently borrowed."),
+    "writer_in_use": metrics.Gauge("db_pool_writer_in_use", "1 while the writer connection is borrowed."),
+}
+_pool_acquired = metrics.Counter("db_pool_acquired_total", "Connections handed out.", ("kind",))
+_pool_waited = metrics.Counter("db_pool_waited_total", "Acquires that had to wait.", ("kind",))
+_pool_wait_seconds = metrics.Counter("db_pool_wait_seconds_total", "Time spent waiting to acquire.", ("kind",))
+_browser_gauges = {
+    "running": metrics.Gauge("browser_running", "1 while the shared Chromium process is up."),
+    "active_contexts": metrics.Gauge("browser_active_contexts", "Browser contexts currently open."),
+}
+_browser_counters = {
+    "launch_count": metrics.Counter("browser_launches_total", "Chromium launches."),
+    "recycle_count": metrics.Counter("browser_recycles_total", "Chromium recycles."),
+}
+_browser_rss = metrics.Gauge("browser_process_tree_rss_bytes", "Resident memory of the Playwright and Chromium processes.")
+_cache_hits = metrics.Counter("listings_cache_hits_total", "Listings response cache hits.")
+_cache_misses = metrics.Counter("listings_cache_misses_total", "Listings response cache misses.")
+_scheduler_running = metrics.Gauge("scheduler_running", "1 while the background scrape loop is alive.")
+_scrape_due_seconds = metrics.Gauge("scrape_next_run_seconds", "Seconds until the source is due (0 when overdue).", ("source",))
+_scrape_failures = metrics.Gauge("scrape_consecutive_failures", "Consecutive failed runs of the source.", ("source",))
+_scrape_last_ok = metrics.Gauge("scrape_last_run_ok", "1 if the source's last run succeeded, 0 if it failed.", ("source",))
+
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Prometheus text-format metrics: request and DB latency, pool, browser, scheduler and loop lag."""
+    pool = get_pool_stats()
+    if pool is not None:
+        for key, gauge in _pool_gauges.items():
+            gauge.set(int(pool[key]))
+        for kind in ("read", "write"):
+            _pool_acquired.set_total(pool[kind]["acquired"], kind)
+            _pool_waited.set_total(pool[kind]["waited"], kind)
+            _pool_wait_seconds.set_total(pool[kind]["wait_total_ms"] / 1000, kind)
+
+    browser = await browser_manager.stats()
+    for key, gauge in _browser_gauges.items():
+        gauge.set(int(browser[key]))
+    for key, counter in _browser_counters.items():
+        counter.set_total(browser[key])
+    _browser_rss.set(int(browser["browser_rss_mb"] * 1024 * 1024))
+    _cache_hits.set_total(_listings_cache.hits)
+    _cache_misses.set_total(_listings_cache.misses)
+
+    _scheduler_running.set(int(_scrape_task is not None and not _scrape_task.done()))
+    try:
+        for entry in await get_schedule_status():
+            _scrape_due_seconds.set(entry["seconds_until_due"], entry["source"])
+            _scrape_failures.set(entry["consecutive_failures"], entry["source"])
+            if entry["last_status"]:
+                _scrape_last_ok.set(int(entry["last_status"] == "ok"), entry["source"])
+    except Exception as e:
+        print(f"[metrics] Could not read the scrape schedule: {e}")
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
+@app.get("/scrapers/cache")
+async def scrape_cache_stats():
+    """Per-source /scrape/{source} cache TTL and hit / miss / coalesced / forced / error counts."""
+    return _scrape_cache.stats()
+
+
+@app.get("/scrapers/browser")
+async def browser_stats():
+    """Report shared browser launches, contexts handed out and recycle events."""
+    return await browser_manager.stats()
+
+
 @app.get("/scrapers")
 async def list_scrapers():
     """List available scrapers."""
@@ -0,0 +1,236 @@
+"""
+Prometheus text-format metrics, standard library only.
+
+Counters, gauges and histograms live in a module-level registry and are
+rendered by render() for GET /metrics. What is measured:
+
+- HTTP request latency per route template, method and status (MetricsMiddleware)
+- call count, errors and latency of each database.py function (@observe_db)
+- scrape runs and their durations per source (scheduler.scrape_source_to_db)
+- event-loop lag, sampled by watch_loop_lag()
+
+Point-in-time values (pool usage, browser state, schedule) are set as gauges
+by the /metrics endpoint just before rendering. Running totals kept by other
+objects (pool acquires, browser launches, cache hits) are copied into counters
+with Counter.set_total at the same time, so rate() works on them.
+"""
+
+import asyncio
+import functools
+import math
+import time
+
+# Seconds. Covers sub-millisecond SQLite reads up to multi-second requests.
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+# Seconds. Whole-source scrapes.
+SCRAPE_BUCKETS = (1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+LOOP_LAG_INTERVAL_SECONDS = 0.5
+
+_registry: list = []
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values: dict[tuple, object] = {}
+        _registry.append(self)
+
+    def _key(self, labelvalues: tuple) -> tuple:
+        if len(labelvalues) != len(self.labels):
+            raise ValueError(f"{self.name} expects labels {self.labels}, got {labelvalues}")
+        return tuple(str(v) for v in labelvalues)
+
+    def clear(self):
+        self._values.clear()
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for key, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_labels(self.labels, key)} {_number(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labelvalues, amount: float = 1):
+        key = self._key(labelvalues)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def set_total(self, value: float, *labelvalues):
+        """Mirror a running total counted elsewhere. It only goes down if that source restarts."""
+        self._values[self._key(labelvalues)] = value
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value: float, *labelvalues):
+        self._values[self._key(labelvalues)] = value
+
+    def inc(self, *labelvalues, amount: float = 1):
+        key = self._key(labelvalues)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, *labelvalues) -> float:
+        return self._values.get(self._key(labelvalues), 0)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value: float, *labelvalues):
+        key = self._key(labelvalues)
+        series = self._values.get(key)
+        if series is None:
+            series = self._values[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series["counts"][i] += 1
+                break
+        series["sum"] += value
+        series["count"] += 1
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for key, series in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, series["counts"]):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labels, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, key)} {_number(round(series['sum'], 6))}")
+            lines.append(f"{self.name}_count{_labels(self.labels, key)} {series['count']}")
+        return lines
+
+
+def render() -> str:
+    """Every registered metric in Prometheus text exposition format 0.0.4."""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+http_request_seconds = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template.", ("method", "route", "status")
+)
+http_requests_in_progress = Gauge("http_requests_in_progress", "HTTP requests currently being handled.")
+db_call_seconds = Histogram("db_call_duration_seconds", "Latency of database.py functions.", ("function",))
+db_call_errors = Counter("db_call_errors_total", "database.py calls that raised.", ("function",))
+scrape_runs = Counter("scrape_runs_total", "Scheduler scrape runs by outcome.", ("source", "status"))
+scrape_seconds = Histogram(
+    "scrape_duration_seconds", "Wall time of scheduler scrape runs.", ("source",), buckets=SCRAPE_BUCKETS
+)
+scrapes_in_progress = Gauge("scrapes_in_progress", "Sources currently being scraped by the scheduler.")
+loop_lag_seconds = Gauge("event_loop_lag_seconds", "Most recent event-loop scheduling delay.")
+loop_lag_max_seconds = Gauge("event_loop_lag_max_seconds", "Largest event-loop delay since startup.")
+
+
+def observe_db(fn):
+    """Decorator for async database.py functions: time every call and count failures."""
+    name = fn.__name__
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await fn(*args, **kwargs)
+        except Exception:
+            db_call_errors.inc(name)
+            raise
+        finally:
+            db_call_seconds.observe(time.perf_counter() - start, name)
+
+    return wrapper
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording http_request_duration_seconds. Requests are
+    labelled with the matched route's path template (/subleases/{post_id}, not
+    the raw path) so label cardinality stays bounded; unmatched paths share one
+    label. Streaming responses are timed until their last chunk is sent.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        http_requests_in_progress.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_requests_in_progress.inc(amount=-1)
+            http_request_seconds.observe(
+                time.perf_counter() - start, scope["method"], _route_template(scope), status
+            )
+
+
+def _route_template(scope) -> str:
+    route = scope.get("route")
+    if route is None:
+        # Older Starlette versions don't record the matched route in the scope.
+        from starlette.routing import Match
+
+        app = scope.get("app")
+        for candidate in getattr(getattr(app, "router", None), "routes", []):
+            if candidate.matches(scope)[0] == Match.FULL:
+                route = candidate
+                break
+    return getattr(route, "path", None) or "unmatched"
+
+
+async def watch_loop_lag(interval: float = LOOP_LAG_INTERVAL_SECONDS):
+    """
+    Forever: sleep interval and record how much later than asked the loop woke
+    us. Sustained lag means something is blocking the event loop.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        lag = max(0.0, loop.time() - start - interval)
+        loop_lag_seconds.set(round(lag, 6))
+        loop_lag_max_seconds.set(max(loop_lag_max_seconds.get(), round(lag, 6)))
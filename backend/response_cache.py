@@ -0,0 +1,71 @@
+"""
+In-process cache of pre-serialized JSON responses.
+
+Entries are tagged with the data generation they were built from (see
+database.get_data_generation). When the generation moves on, every entry is
+dropped, so a cached body is never served after the underlying rows changed.
+"""
+
+import hashlib
+from collections import OrderedDict
+
+from serialization import dumps
+
+
+def etag_matches(etag: str, if_none_match: str | None) -> bool:
+    """True if an If-None-Match header value names etag (or is *)."""
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
+class CachedResponse:
+    def __init__(self, body: bytes):
+        self.body = body
+        self.etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+    def matches(self, if_none_match: str | None) -> bool:
+        """True if an If-None-Match header value names this entry's ETag."""
+        return etag_matches(self.etag, if_none_match)
+
+
+class ResponseCache:
+    """LRU map of request key → CachedResponse for a single data generation."""
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self.generation = None
+        self._entries: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, generation: int, key) -> CachedResponse | None:
+        if generation != self.generation:
+            self._entries.clear()
+            self.generation = generation
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, generation: int, key, payload) -> CachedResponse:
+        """Encode payload once and store it, unless the data moved on meanwhile."""
+        entry = CachedResponse(dumps(payload))
+        if generation == self.generation:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def stats(self) -> dict:
+        return {
+            "generation": self.generation,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
@@ -1,20 +1,66 @@
 """
-Background scheduler that scrapes all sources on an interval and stores results in the DB.
-Scrapers run sequentially to avoid OOM from multiple Playwright browsers.
+Background scheduler that scrapes each source on its own interval and stores results in the DB.
+
+Every source has an interval (SCRAPE_INTERVAL_HOURS, overridable per source with
+e.g. SCRAPE_INTERVAL_HOURS_KOTO), a random jitter so sources drift apart, and
+exponential backoff after consecutive failures. Next-run times live in the
+scrape_schedule table, so a restart only scrapes sources that are actually due.
+
+Each scraper is given the hash of its page's listing region from the previous
+stored run. If the page still hashes the same, the scraper skips parsing and we
+skip upsert_listings; only the page_hashes check counters move.
+
+A scrape that returns no listings is recorded as "empty" and handled like a
+failure: nothing is stored, the source is not considered fresh and it backs off.
+
+Scrapers run concurrently under a ScrapeBudget (max concurrent browser contexts,
+total cost weight and an optional RSS ceiling) so a refresh takes roughly as long
+as the slowest source instead of the sum, without risking OOM.
+
+After a successful run, listings without coordinates are geocoded
+(geocoding.geocode_missing).
+
+Every attempt is recorded in scrape_runs (phase timings, listing count, error,
+peak RSS); get_scraper_status summarizes the recent ones per source.
+
+Runs are tracked as ScrapeJobs (jobs.py) and are single-flight: a refresh or
+scheduler run whose sources are already being scraped joins the running job,
+and a source is never scraped by two jobs at once. All jobs share one budget.
 """
 
 import asyncio
 import os
-from datetime import datetime, timezone
+import random
+import time
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
 
-from database import upsert_listings
+import metrics
+from geocoding import geocode_missing
+from jobs import ScrapeJob, scrape_jobs
+from database import (
+    get_page_hashes, get_recent_scrape_runs, get_scrape_metadata, get_scrape_schedule, prune_scrape_runs,
+    purge_inactive_listings, record_page_check, record_scrape_run, save_scrape_schedule,
+    upsert_listings,
+)
 from scrapers.meridian import scrape_meridian
 from scrapers.solis import scrape_solis
 from scrapers.Koto import scrape_koto
 from scrapers.playalife import scrape_playalife
 from scrapers.wolfe_scraper import scrape_wolfe
+from scrapers.browser import PeakRssSampler, process_tree_rss_mb
 
 SCRAPE_INTERVAL_HOURS = float(os.getenv("SCRAPE_INTERVAL_HOURS", "12"))
+LISTING_RETENTION_DAYS = float(os.getenv("LISTING_RETENTION_DAYS", "30"))
+SCRAPE_MAX_CONCURRENCY = int(os.getenv("SCRAPE_MAX_CONCURRENCY", "2"))
+SCRAPE_MAX_COST = float(os.getenv("SCRAPE_MAX_COST", "4"))
+SCRAPE_MAX_RSS_MB = float(os.getenv("SCRAPE_MAX_RSS_MB", "0"))  # 0 disables the ceiling
+SCRAPE_JITTER = float(os.getenv("SCRAPE_JITTER", "0.1"))  # ± fraction of the interval
+SCRAPE_BACKOFF_MINUTES = float(os.getenv("SCRAPE_BACKOFF_MINUTES", "15"))
+SCRAPE_ALL_MAX_AGE_SECONDS = float(os.getenv("SCRAPE_ALL_MAX_AGE_SECONDS", "3600"))
+SCRAPE_RUNS_KEEP = int(os.getenv("SCRAPE_RUNS_KEEP", "1000"))  # per source
+SCRAPE_POLL_SECONDS = 60
 
 SCRAPERS = [
     ("meridian", scrape_meridian),
@@ -24,27 +70,451 @@ SCRAPERS = [
     ("wolfe", scrape_wolfe),
 ]
 
+# Relative cost (memory and wall time) of each source. Expensive sources start
+# first so they overlap with the cheap ones instead of running alone at the end.
+SCRAPER_COSTS = {
+    "koto": 3,
+    "wolfe": 2,
+    "meridian": 1,
+    "playalife": 1,
+    "solis": 1,
+}
+
 
-async def run_all_scrapers_to_db():
-    """Run each scraper sequentially and upsert results into the DB."""
-    print(f"[scheduler] Starting scrape run at {datetime.now(timezone.utc).isoformat()}")
-    for name, fn in SCRAPERS:
+class EmptyScrapeError(Exception):
+    """A scraper finished without error but found no listings."""
+
+
+class ScrapeBudget:
+    """
+    Admits scrapes while the number running, their summed cost and the process
+    RSS stay under the configured limits. A scrape is always admitted when
+    nothing else is running, so an oversized source cannot deadlock the run.
+    """
+
+    def __init__(self, max_concurrency: int, max_cost: float, max_rss_mb: float = 0):
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_cost = max_cost
+        self.max_rss_mb = max_rss_mb
+        self.running = 0
+        self.cost = 0.0
+        self._cond = asyncio.Condition()
+
+    def _fits(self, cost: float, rss_mb: float) -> bool:
+        if self.running == 0:
+            return True
+        if self.running >= self.max_concurrency or self.cost + cost > self.max_cost:
+            return False
+        if self.max_rss_mb and rss_mb > self.max_rss_mb:
+            return False
+        return True
+
+    async def _rss_mb(self) -> float:
+        if not self.max_rss_mb or self.running == 0:
+            return 0.0
+        return await asyncio.to_thread(process_tree_rss_mb, None, True)
+
+    @asynccontextmanager
+    async def slot(self, cost: float):
+        async with self._cond:
+            while not self._fits(cost, await self._rss_mb()):
+                # RSS can drop without anyone releasing a slot, so re-check periodically.
+                try:
+                    await asyncio.wait_for(self._cond.wait(), timeout=1.0)
+                except asyncio.TimeoutError:
+                    pass
+            self.running += 1
+            self.cost += cost
         try:
-            print(f"[scheduler] Scraping {name}...")
-            result = await fn()
+            yield
+        finally:
+            async with self._cond:
+                self.running -= 1
+                self.cost -= cost
+                self._cond.notify_all()
+
+
+def source_interval_hours(name: str) -> float:
+    """A source's scrape interval: SCRAPE_INTERVAL_HOURS_<NAME> or the global default."""
+    return float(os.getenv(f"SCRAPE_INTERVAL_HOURS_{name.upper()}", SCRAPE_INTERVAL_HOURS))
+
+
+def next_run_delay(name: str, consecutive_failures: int) -> timedelta:
+    """
+    Jittered interval after a success; after failures, exponential backoff from
+    SCRAPE_BACKOFF_MINUTES, never longer than the normal interval.
+    """
+    interval = source_interval_hours(name) * 3600
+    if consecutive_failures == 0:
+        seconds = interval * (1 + random.uniform(-SCRAPE_JITTER, SCRAPE_JITTER))
+    else:
+        backoff = SCRAPE_BACKOFF_MINUTES * 60 * 2 ** (consecutive_failures - 1)
+        seconds = min(backoff, interval) * (1 + random.uniform(0, SCRAPE_JITTER))
+    return timedelta(seconds=seconds)
+
+
+async def _reschedule(name: str, status: str, previous_failures: int):
+    now = datetime.now(timezone.utc)
+    success = status in SUCCESS_STATUSES
+    failures = 0 if success else previous_failures + 1
+    await save_scrape_schedule({
+        "source": name,
+        "interval_hours": source_interval_hours(name),
+        "next_run_at": (now + next_run_delay(name, failures)).isoformat(),
+        "last_run_at": now.isoformat(),
+        "last_status": "ok" if success else status,
+        "consecutive_failures": failures,
+    })
+
+
+# Run statuses that count as a success: listings stored, or the page confirmed unchanged.
+SUCCESS_STATUSES = ("ok", "unchanged")
+
+# scrape_runs columns and the PhaseTimer laps charged to each.
+RUN_PHASES = {
+    "launch_seconds": ("launch",),
+    "navigate_seconds": ("navigate", "ready"),
+    "extract_seconds": ("capture", "hash", "parse"),
+}
+
+
+def _run_row(name: str, run_id: str | None, started_at: datetime, duration: float, result: dict | None) -> dict:
+    timings = dict((result or {}).get("timings") or {})
+    if result and result.get("fetch_tier"):
+        timings["fetch_tier"] = result["fetch_tier"]
+    row = {
+        "run_id": run_id,
+        "source": name,
+        "started_at": started_at.isoformat(),
+        "finished_at": datetime.now(timezone.utc).isoformat(),
+        "duration_seconds": round(duration, 3),
+        "phases": timings or None,
+    }
+    for column, laps in RUN_PHASES.items():
+        row[column] = round(sum(timings.get(lap, 0.0) for lap in laps), 3) if timings else None
+    return row
+
+
+async def scrape_source_to_db(name: str, fn, run_id: str | None = None) -> dict:
+    """
+    Scrape one source, upsert its listings as soon as it finishes and reschedule
+    it. The attempt is recorded in scrape_runs under run_id, successful or not.
+    Returns {"status": "ok" / "unchanged" / "empty" / "failed", "counts": the
+    upsert's inserted / updated / unchanged / retired, or None without one,
+    "result": what the scraper returned, "error": why it failed, or None}.
+    """
+    entry = next((e for e in await get_scrape_schedule() if e["source"] == name), None)
+    started_at = datetime.now(timezone.utc)
+    start = time.perf_counter()
+    result = None
+    counts = None
+    upsert_seconds = None
+    error = None
+    sampler = PeakRssSampler()
+    metrics.scrapes_in_progress.inc()
+    try:
+        print(f"[scheduler] Scraping {name}...")
+        previous = (await get_page_hashes()).get(name)
+        async with sampler:
+            result = await fn(unchanged_hash=previous["content_hash"] if previous else None)
+        if result.get("unchanged"):
+            check = await record_page_check(name, result["content_hash"], skipped=True)
+            print(
+                f"[scheduler] {name}: page unchanged since {check['changed_at']}; "
+                f"skipped parse and upsert ({check['skips']}/{check['checks']} runs skipped)"
+            )
+        else:
             listings = result.get("listings") or []
-            await upsert_listings(listings, name)
-            print(f"[scheduler] {name}: upserted {len(listings)} listings")
+            if not listings:
+                raise EmptyScrapeError(result.get("error") or "scraper returned no listings")
+            upsert_start = time.perf_counter()
+            counts = await upsert_listings(listings, name, retire_missing=True)
+            upsert_seconds = round(time.perf_counter() - upsert_start, 3)
+            # Only remember the hash once its listings are stored.
+            if result.get("content_hash"):
+                await record_page_check(name, result["content_hash"], skipped=False)
+            print(
+                f"[scheduler] {name}: {len(listings)} listings "
+                f"({counts['inserted']} inserted, {counts['updated']} updated, "
+                f"{counts['unchanged']} unchanged, {counts['retired']} retired)"
+            )
+    except Exception as e:
+        print(f"[scheduler] {name} failed: {e}")
+        error = e
+    finally:
+        metrics.scrapes_in_progress.inc(amount=-1)
+    if isinstance(error, EmptyScrapeError):
+        status = "empty"
+    else:
+        status = "failed" if error else "unchanged" if result.get("unchanged") else "ok"
+    if status in SUCCESS_STATUSES:
+        try:
+            geocoded = await geocode_missing(name)
+            if geocoded["cached"] or geocoded["geocoded"]:
+                print(
+                    f"[scheduler] {name}: located {geocoded['cached']} listings from the geocode cache, "
+                    f"{geocoded['geocoded']} by the geocoder; {geocoded['unresolved']} without coordinates"
+                )
         except Exception as e:
-            print(f"[scheduler] {name} failed: {e}")
-    print(f"[scheduler] Scrape run complete at {datetime.now(timezone.utc).isoformat()}")
+            print(f"[scheduler] Geocoding {name} failed: {e}")
+    metrics.scrape_runs.inc(name, status)
+    metrics.scrape_seconds.observe(time.perf_counter() - start, name)
+    try:
+        await _reschedule(name, status, entry["consecutive_failures"] if entry else 0)
+    except Exception as e:
+        print(f"[scheduler] Could not reschedule {name}: {e}")
+
+    try:
+        run = _run_row(name, run_id, started_at, time.perf_counter() - start, result)
+        run.update({
+            "upsert_seconds": upsert_seconds,
+            "status": status,
+            # Unchanged runs parse nothing; 0 would read like an empty scrape.
+            "listing_count": None if status in ("failed", "unchanged") else len(result.get("listings") or []),
+            "error_type": type(error).__name__ if error else None,
+            "error_message": str(error)[:500] if error else None,
+            "peak_rss_mb": round(sampler.peak_mb, 1),
+        })
+        await record_scrape_run(run)
+    except Exception as e:
+        print(f"[scheduler] Could not record scrape run for {name}: {e}")
+    return {"status": status, "counts": counts, "result": result, "error": str(error) if error else None}
+
+
+_budget: ScrapeBudget | None = None
+_inflight: dict[str, asyncio.Task] = {}  # source → its running scrape
+
+
+def _get_budget() -> ScrapeBudget:
+    global _budget
+    if _budget is None:
+        _budget = ScrapeBudget(SCRAPE_MAX_CONCURRENCY, SCRAPE_MAX_COST, SCRAPE_MAX_RSS_MB)
+    return _budget
+
+
+async def _scrape_in_slot(name: str, fn, run_id: str, job: ScrapeJob | None) -> dict:
+    if job:
+        job.update(name, "queued")
+    async with _get_budget().slot(SCRAPER_COSTS.get(name, 1)):
+        if job:
+            job.update(name, "running")
+        return await scrape_source_to_db(name, fn, run_id)
+
+
+def _scrape_task(name: str, fn, run_id: str, job: ScrapeJob | None) -> tuple[asyncio.Task, bool]:
+    """(task, shared): the scrape of name already in flight, or a new one started in a budget slot."""
+    task = _inflight.get(name)
+    if task is not None:
+        return task, True
+    task = _inflight[name] = asyncio.create_task(_scrape_in_slot(name, fn, run_id, job))
+    task.add_done_callback(lambda _: _inflight.pop(name, None))
+    return task, False
+
+
+async def scrape_source(name: str) -> dict:
+    """
+    Scrape one source into the DB under the shared ScrapeBudget, joining its
+    scrape if one is already in flight, and return scrape_source_to_db's
+    outcome. Backs the per-source /scrape/{source} endpoints.
+    """
+    task, _ = _scrape_task(name, dict(SCRAPERS)[name], uuid.uuid4().hex, None)
+    # Shielded for the same reason as in run_scrapers_to_db.
+    return await asyncio.shield(task)
+
+
+async def run_scrapers_to_db(names: list[str] | None = None, job: ScrapeJob | None = None) -> dict[str, str]:
+    """
+    Run the given sources (default: all) concurrently under the shared
+    ScrapeBudget, most expensive first, upserting each as it completes. A source
+    that is already being scraped is awaited rather than started again. Progress
+    and upsert counts go to job if given. Returns name → "ok" / "unchanged" /
+    "empty" / "failed".
+    """
+    scrapers = [(n, fn) for n, fn in SCRAPERS if names is None or n in names]
+    scrapers.sort(key=lambda s: SCRAPER_COSTS.get(s[0], 1), reverse=True)
+    run_id = uuid.uuid4().hex
+
+    async def run(name, fn):
+        task, shared = _scrape_task(name, fn, run_id, job)
+        if shared and job:
+            job.update(name, "running", shared=True)
+        # Shielded: the scrape may be shared, so one waiter's cancellation must not stop it.
+        outcome = await asyncio.shield(task)
+        if job:
+            job.update(name, outcome["status"], counts=outcome["counts"])
+        return outcome["status"]
+
+    results = await asyncio.gather(*(run(name, fn) for name, fn in scrapers))
+    return {name: status for (name, _), status in zip(scrapers, results)}
+
+
+async def _run_job(job: ScrapeJob):
+    """Scrape the job's sources into the DB, then purge long-retired listings."""
+    print(f"[scheduler] Starting scrape job {job.id} ({job.trigger}) at {datetime.now(timezone.utc).isoformat()}")
+    try:
+        await run_scrapers_to_db(job.sources, job)
+    except Exception as e:
+        print(f"[scheduler] Scrape job {job.id} failed: {e}")
+        job.finish(e)
+        return
+    try:
+        purged = await purge_inactive_listings(LISTING_RETENTION_DAYS)
+        if purged:
+            print(f"[scheduler] Purged {purged} listings inactive for over {LISTING_RETENTION_DAYS:g} days")
+    except Exception as e:
+        print(f"[scheduler] Purge failed: {e}")
+    try:
+        await prune_scrape_runs(SCRAPE_RUNS_KEEP)
+    except Exception as e:
+        print(f"[scheduler] Pruning scrape runs failed: {e}")
+    job.finish()
+    counts = job.snapshot()["counts"]
+    print(
+        f"[scheduler] Scrape job {job.id} {job.status} at {job.finished_at} "
+        f"({counts['inserted']} inserted, {counts['updated']} updated, "
+        f"{counts['unchanged']} unchanged, {counts['retired']} retired)"
+    )
+
+
+def start_scrape_job(names: list[str] | None = None, trigger: str = "manual") -> tuple[ScrapeJob, bool]:
+    """
+    Start scraping the given sources (default: all) in the background and
+    return (job, joined) without waiting. joined is True when a running job
+    already covered these sources and was returned instead of a new one.
+    """
+    sources = [n for n, _ in SCRAPERS if names is None or n in names]
+    job, joined = scrape_jobs.begin(sources, trigger)
+    if joined:
+        print(f"[scheduler] {trigger} scrape of {', '.join(sources)} joined running job {job.id}")
+    else:
+        job.task = asyncio.create_task(_run_job(job))
+    return job, joined
+
+
+async def run_all_scrapers_to_db(names: list[str] | None = None, trigger: str = "scheduler") -> ScrapeJob:
+    """Scrape the given sources (default: all) into the DB and wait for the job to finish."""
+    job, _ = start_scrape_job(names, trigger)
+    await job.wait()
+    return job
+
+
+async def stop_scrape_jobs():
+    """Cancel running jobs and scrapes. Called from the FastAPI lifespan."""
+    tasks = [job.task for job in scrape_jobs.running() if job.task] + list(_inflight.values())
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    for job in scrape_jobs.running():
+        job.finish(RuntimeError("cancelled at shutdown"))
+
+
+async def get_schedule_status() -> list[dict]:
+    """Every source's schedule, soonest first, with overdue flags. Unscheduled sources are due now."""
+    now = datetime.now(timezone.utc)
+    entries = {e["source"]: e for e in await get_scrape_schedule()}
+    pages = await get_page_hashes()
+    status = []
+    for name, _ in SCRAPERS:
+        entry = entries.get(name) or {
+            "source": name,
+            "next_run_at": now.isoformat(),
+            "last_run_at": None,
+            "last_status": None,
+            "consecutive_failures": 0,
+        }
+        seconds = (datetime.fromisoformat(entry["next_run_at"]) - now).total_seconds()
+        status.append({
+            **entry,
+            "interval_hours": source_interval_hours(name),
+            "seconds_until_due": round(max(seconds, 0)),
+            "overdue": seconds <= 0,
+            "page_checked_at": pages[name]["checked_at"] if name in pages else None,
+            "page_changed_at": pages[name]["changed_at"] if name in pages else None,
+            "unchanged_skips": pages[name]["skips"] if name in pages else 0,
+            "page_checks": pages[name]["checks"] if name in pages else 0,
+        })
+    status.sort(key=lambda e: e["next_run_at"])
+    return status
+
+
+async def get_source_freshness() -> dict[str, dict]:
+    """
+    source → {last_success_at, age_seconds} for every source. A run counts as
+    successful if it stored listings or confirmed the page unchanged. Sources
+    that never succeeded have age_seconds None.
+    """
+    now = datetime.now(timezone.utc)
+    stats = (await get_scrape_metadata())["sources"]
+    pages = await get_page_hashes()
+    freshness = {}
+    for name, _ in SCRAPERS:
+        times = [
+            t for t in (
+                stats.get(name, {}).get("last_success_at"),
+                pages.get(name, {}).get("checked_at"),
+            ) if t
+        ]
+        last = max(times, key=datetime.fromisoformat) if times else None
+        freshness[name] = {
+            "last_success_at": last,
+            "age_seconds": round((now - datetime.fromisoformat(last)).total_seconds(), 1) if last else None,
+        }
+    return freshness
+
+
+def _percentile(values: list[float], pct: float) -> float | None:
+    """Nearest-rank percentile of values (None when empty)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+async def get_scraper_status(recent: int = 10, window: int = 100) -> list[dict]:
+    """
+    Per-source health from scrape_runs: success rate and p50/p90/p99 duration
+    over the last `window` runs, the last run and error, and the `recent` newest runs.
+    """
+    runs = await get_recent_scrape_runs(max(recent, window))
+    status = []
+    for name, _ in SCRAPERS:
+        source_runs = runs.get(name, [])
+        windowed = source_runs[:window]
+        succeeded = [r for r in windowed if r["status"] in SUCCESS_STATUSES]
+        durations = [r["duration_seconds"] for r in succeeded]
+        last_error = next((r for r in source_runs if r["status"] not in SUCCESS_STATUSES), None)
+        status.append({
+            "source": name,
+            "runs": len(windowed),
+            "success_rate": round(len(succeeded) / len(windowed), 3) if windowed else None,
+            "duration_p50": _percentile(durations, 50),
+            "duration_p90": _percentile(durations, 90),
+            "duration_p99": _percentile(durations, 99),
+            "peak_rss_mb_max": max((r["peak_rss_mb"] or 0 for r in windowed), default=None),
+            "last_run": source_runs[0] if source_runs else None,
+            "last_error": {
+                "at": last_error["started_at"],
+                "type": last_error["error_type"],
+                "message": last_error["error_message"],
+            } if last_error else None,
+            "recent_runs": source_runs[:recent],
+        })
+    return status
 
 
 async def scrape_loop():
-    """Infinite loop: scrape all sources, then sleep for the configured interval."""
+    """Infinite loop: scrape whichever sources are due, then sleep until the next one is."""
     while True:
+        wait = SCRAPE_POLL_SECONDS
         try:
-            await run_all_scrapers_to_db()
+            status = await get_schedule_status()
+            due = [e["source"] for e in status if e["overdue"]]
+            if due:
+                await run_all_scrapers_to_db(due)
+                status = await get_schedule_status()
+            if status:
+                wait = min(wait, max(1, min(e["seconds_until_due"] for e in status)))
         except Exception as e:
             print(f"[scheduler] Unexpected error in scrape loop: {e}")
-        await asyncio.sleep(SCRAPE_INTERVAL_HOURS * 3600)
+        await asyncio.sleep(wait)
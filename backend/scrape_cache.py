@@ -0,0 +1,93 @@
+"""
+TTL cache with request coalescing for the per-source /scrape/{source} endpoints.
+
+A scrape result is kept for SCRAPE_CACHE_TTL_SECONDS. While a source is being
+scraped, identical requests await that same scrape instead of launching their
+own browser ("coalesced"). A miss is scraped through scheduler.scrape_source
+(see main._scrape_to_db), so it also joins a scheduled scrape of the source
+and waits for a slot in the shared ScrapeBudget. force=True skips a cached result but still joins a
+scrape that is already in flight, since that one is fresh anyway. Failures are
+never cached. Per-source hit / miss / coalesced / forced / error counts are
+kept for tuning the TTL (GET /scrapers/cache, and /metrics).
+"""
+
+import asyncio
+import os
+import time
+
+import metrics
+
+SCRAPE_CACHE_TTL_SECONDS = float(os.getenv("SCRAPE_CACHE_TTL_SECONDS", "300"))
+
+OUTCOMES = ("hit", "miss", "coalesced", "forced", "error")
+
+_requests = metrics.Counter(
+    "scrape_cache_requests_total", "Per-source scrape endpoint requests by cache outcome.", ("source", "outcome")
+)
+
+
+class ScrapeResultCache:
+    def __init__(self, ttl_seconds: float = SCRAPE_CACHE_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._entries: dict[str, tuple[float, dict]] = {}  # source → (monotonic time, result)
+        self._inflight: dict[str, asyncio.Task] = {}
+        self._counts: dict[str, dict[str, int]] = {}
+
+    def _count(self, source: str, outcome: str):
+        counts = self._counts.setdefault(source, dict.fromkeys(OUTCOMES, 0))
+        counts[outcome] += 1
+        _requests.inc(source, outcome)
+
+    async def get(self, source: str, fn, force: bool = False) -> tuple[dict, str]:
+        """
+        Return (result, outcome) for source, where outcome is "hit", "miss",
+        "coalesced" or "forced". fn is the scraper coroutine function, called
+        only on a miss. Its exceptions propagate to every coalesced caller.
+        """
+        entry = self._entries.get(source)
+        if not force and entry and time.monotonic() - entry[0] < self.ttl_seconds:
+            self._count(source, "hit")
+            return entry[1], "hit"
+
+        task = self._inflight.get(source)
+        if task is not None:
+            outcome = "coalesced"
+        else:
+            outcome = "forced" if force else "miss"
+            task = self._inflight[source] = asyncio.create_task(self._fill(source, fn))
+            task.add_done_callback(lambda _: self._inflight.pop(source, None))
+        self._count(source, outcome)
+        # Shielded so a caller that disconnects doesn't cancel the scrape for the others.
+        return await asyncio.shield(task), outcome
+
+    async def _fill(self, source: str, fn) -> dict:
+        try:
+            result = await fn()
+        except Exception:
+            self._count(source, "error")
+            raise
+        self._entries[source] = (time.monotonic(), result)
+        return result
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        sources = {}
+        for source, counts in sorted(self._counts.items()):
+            served = counts["hit"] + counts["miss"] + counts["coalesced"] + counts["forced"]
+            entry = self._entries.get(source)
+            age = now - entry[0] if entry else None
+            sources[source] = {
+                **counts,
+                "hit_ratio": round((counts["hit"] + counts["coalesced"]) / served, 3) if served else None,
+                "cached_age_seconds": round(age, 1) if age is not None and age < self.ttl_seconds else None,
+                "in_flight": source in self._inflight,
+            }
+        return {"ttl_seconds": self.ttl_seconds, "sources": sources}
+
+    async def close(self):
+        """Cancel in-flight scrapes. Called from the FastAPI lifespan."""
+        tasks = list(self._inflight.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._entries.clear()
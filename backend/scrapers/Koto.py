@@ -1,132 +1,231 @@
 """
 Scraper for the Koto Group (https://www.kotogroup.com)
 """
-from playwright.async_api import async_playwright
 from datetime import datetime
-import asyncio
 import re
 
+from database import get_selector_cache, record_selector_hit, save_selector_cache
+from scrapers.browser import browser_manager
+from scrapers.extract import Field, parse_html, region_hash, select_cards, structure_fingerprint
+from scrapers.fetch import FetchPolicy, PhaseTimer, load_listing_page
+from scrapers.pipeline import parse_off_loop, save_snapshot, unchanged_result
 
-async def scrape_koto() -> dict:
+LISTING_URL = "https://www.kotogroup.com/vacancies"
+# The page structure is unpredictable, so readiness is any listing-like card or a
+# link to a 93117 unit (every listing we keep has one).
+FETCH_POLICY = FetchPolicy(
+    ready_selector="[data-listingid], .listing-item, .js-listing-card, a[href*='93117']",
+    ready_state="attached",
+    http_tier=False,
+)
+# Cards have no stable markup, so we read the whole card text plus the first
+# link and headings, and let the regexes below find the fields.
+FIELDS = {
+    "text": Field(),
+    "href": Field("a", attr="href"),
+    "h1": Field("h1"),
+    "h2": Field("h2"),
+    "h3": Field("h3"),
+    "h4": Field("h4"),
+    "shape": Field(shape=True),
+}
+# Candidate card containers, tried in order until one yields listing-like cards.
+CARD_SELECTORS = [
+    "[class*='property']",
+    "[class*='listing']",
+    "[class*='vacancy']",
+    "[class*='unit']",
+    "[class*='result']",
+    ".property-card",
+    ".listing-card",
+    ".card",
+    "article",
+    "[data-property]",
+    "[data-listing]",
+    "div[class*='Property']",
+    "div[class*='Listing']",
+    "div[class*='Result']"
+]
+# Last resort when no candidate matches: scan the first 200 divs.
+FALLBACK_SELECTOR = "div"
+# What the unchanged-page check hashes when no selector finds cards (scripts and
+# styles are stripped first). See hash_page.
+HASH_SELECTOR = "body"
+
+
+async def scrape_koto(unchanged_hash: str | None = None) -> dict:
     """
     Scrape rental listings from Koto Group.
     Returns a dict with listings array and timestamp.
     """
-    listings = []
+    timer = PhaseTimer("koto")
 
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        page = await browser.new_page()
+    async with browser_manager.page() as page:
+        timer.lap("launch")
+        await load_listing_page(page, LISTING_URL, FETCH_POLICY, timer)
+        page_html = await page.content()
+    await save_snapshot("koto", page_html)
+    timer.lap("capture")
 
-        await page.goto("https://www.kotogroup.com/vacancies")
-        
-        await page.wait_for_load_state("networkidle")
-        await asyncio.sleep(3)
+    cached = await get_selector_cache("koto")
+    content_hash = await parse_off_loop(hash_page, page_html, cached)
+    timer.lap("hash")
+    if content_hash == unchanged_hash:
+        return unchanged_result("koto", content_hash, timer)
 
-        listing_elements = []
-        
-        selectors_to_try = [
-            "[class*='property']",
-            "[class*='listing']",
-            "[class*='vacancy']",
-            "[class*='unit']",
-            "[class*='result']",
-            ".property-card",
-            ".listing-card",
-            ".card",
-            "article",
-            "[data-property]",
-            "[data-listing]",
-            "div[class*='Property']",
-            "div[class*='Listing']",
-            "div[class*='Result']"
-        ]
-        
-        for selector in selectors_to_try:
-            elements = await page.query_selector_all(selector)
-            if elements and len(elements) > 0:
-                print(f"Found {len(elements)} elements with selector: {selector}")
-                for elem in elements:
-                    try:
-                        text = await elem.inner_text()
-                        if (re.search(r'\d+\s+[A-Z]', text) or 
-                            re.search(r'\$\d+', text) or 
-                            re.search(r'(?:bedroom|bathroom|bed|bath)', text, re.IGNORECASE) or
-                            re.search(r'(?:sq\s*ft|square\s*feet)', text, re.IGNORECASE)):
-                            listing_elements.append(elem)
-                    except:
-                        continue
-                
-                if listing_elements:
-                    print(f"Found {len(listing_elements)} potential listings using selector: {selector}")
-                    break
-        
-        if not listing_elements:
+    result = await parse_off_loop(parse_page, page_html, cached)
+    if result["cache_hit"]:
+        print(f"[scrape] koto: selector cache hit {result['selector']!r} ({result['card_count']} cards)")
+        await record_selector_hit("koto", result["card_count"])
+    else:
+        print(f"[scrape] koto: selector cache miss ({result['miss_reason']}); probed all selectors")
+        if result["selector"]:
+            await save_selector_cache("koto", result["selector"], result["fingerprint"], result["card_count"])
+    timer.lap("parse")
+
+    timer.log()
+    return {
+        "listings": result["listings"],
+        "scraped_at": datetime.utcnow().isoformat() + "Z",
+        "source": "koto",
+        "timings": timer.as_dict(),
+        "content_hash": content_hash,
+    }
+
+
+def _looks_like_listing(text: str, selector: str) -> bool:
+    if selector == FALLBACK_SELECTOR:
+        return bool(
+            re.search(r'\d+\s+[A-Z][a-z]+\s+(?:Street|St|Avenue|Ave|Road|Rd|Drive|Dr|Lane|Ln|Boulevard|Blvd)', text) and
+            (re.search(r'\$\d+', text) or re.search(r'(?:bedroom|bathroom)', text, re.IGNORECASE))
+        )
+    return bool(
+        re.search(r'\d+\s+[A-Z]', text) or 
+        re.search(r'\$\d+', text) or 
+        re.search(r'(?:bedroom|bathroom|bed|bath)', text, re.IGNORECASE) or
+        re.search(r'(?:sq\s*ft|square\s*feet)', text, re.IGNORECASE)
+    )
+
+
+def probe_selector(tree, selector: str) -> list[dict]:
+    """The listing-like cards under one candidate selector (or the div fallback)."""
+    limit = 200 if selector == FALLBACK_SELECTOR else None
+    cards = select_cards(tree, selector, FIELDS, limit=limit)
+    matches = [card for card in cards if _looks_like_listing(card["text"] or "", selector)]
+    if selector == FALLBACK_SELECTOR:
+        matches = matches[:50]
+    if cards:
+        print(f"Found {len(cards)} elements with selector: {selector} ({len(matches)} potential listings)")
+    return matches
+
+
+def _plausible_count(count: int, cached_count: int) -> bool:
+    # Vacancies come and go, so any non-zero count is fine unless it balloons,
+    # which means the selector now also matches unrelated elements.
+    return 0 < count <= 4 * cached_count + 10
+
+
+def find_listing_cards(tree, cached: dict | None = None) -> dict:
+    """
+    Try the cached selector (a selector_cache row) first, and only probe every
+    candidate when it misses: no cards, an implausible count, or a card
+    structure that no longer matches the stored fingerprint. Returns the cards
+    plus what the caller needs to update the cache.
+    """
+    probed = {}
+    miss_reason = "nothing cached"
+    if cached:
+        cards = probed[cached["selector"]] = probe_selector(tree, cached["selector"])
+        fingerprint = structure_fingerprint(cards)
+        if _plausible_count(len(cards), cached["card_count"]) and fingerprint == cached["fingerprint"]:
+            return {"cards": cards, "selector": cached["selector"], "fingerprint": fingerprint, "cache_hit": True}
+        if cards and fingerprint != cached["fingerprint"]:
+            miss_reason = f"{cached['selector']!r}: card structure changed"
+        else:
+            miss_reason = f"{cached['selector']!r}: {len(cards)} cards"
+
+    for selector in CARD_SELECTORS + [FALLBACK_SELECTOR]:
+        if selector == FALLBACK_SELECTOR:
             print("No structured listings found, trying to find result containers...")
-            all_divs = await page.query_selector_all("div")
-            for div in all_divs[:200]:
-                try:
-                    text = await div.inner_text()
-                    if (re.search(r'\d+\s+[A-Z][a-z]+\s+(?:Street|St|Avenue|Ave|Road|Rd|Drive|Dr|Lane|Ln|Boulevard|Blvd)', text) and
-                        (re.search(r'\$\d+', text) or re.search(r'(?:bedroom|bathroom)', text, re.IGNORECASE))):
-                        listing_elements.append(div)
-                        if len(listing_elements) >= 50:
-                            break
-                except:
+        cards = probed[selector] if selector in probed else probe_selector(tree, selector)
+        if cards:
+            return {
+                "cards": cards,
+                "selector": selector,
+                "fingerprint": structure_fingerprint(cards),
+                "cache_hit": False,
+                "miss_reason": miss_reason,
+            }
+    return {"cards": [], "selector": None, "fingerprint": "", "cache_hit": False, "miss_reason": miss_reason}
+
+
+def hash_page(page_html: str, cached: dict | None = None) -> str:
+    """
+    region_hash of the listing cards, found with the cached selector (a
+    selector_cache row) or, when that matches nothing, by probing. Only when
+    probing finds no cards either, or only the div fallback, is the whole body
+    hashed. Runs in the parse pool.
+    """
+    tree = parse_html(page_html)
+    selector = cached["selector"] if cached else None
+    if not selector or tree.css_first(selector) is None:
+        selector = find_listing_cards(tree)["selector"]
+    if selector in (None, FALLBACK_SELECTOR):
+        selector = HASH_SELECTOR
+    return region_hash(tree, selector)
+
+
+def parse_page(page_html: str, cached: dict | None = None) -> dict:
+    """
+    Parse stage: find the listing cards in a rendered page (see
+    find_listing_cards), build and de-duplicate listings. Runs in the parse pool.
+    """
+    found = find_listing_cards(parse_html(page_html), cached)
+
+    listings = []
+    seen_urls = set()
+    seen_addresses = set()
+    
+    for card in found["cards"]:
+        listing = extract_listing_data(card)
+        if listing:
+            url = listing.get("listing_link")
+            if url:
+                if url in seen_urls:
                     continue
+                seen_urls.add(url)
+            else:
+                addr = listing.get("address", "").lower()
+                if addr in seen_addresses:
+                    continue
+                seen_addresses.add(addr)
             
-            if listing_elements:
-                print(f"Found {len(listing_elements)} potential listings from div search")
+            listings.append(listing)
 
-        seen_urls = set()
-        seen_addresses = set()
-        
-        for element in listing_elements:
-            try:
-                listing = await extract_listing_data(element)
-                if listing:
-                    url = listing.get("listing_link")
-                    if url:
-                        if url in seen_urls:
-                            continue
-                        seen_urls.add(url)
-                    else:
-                        addr = listing.get("address", "").lower()
-                        if addr in seen_addresses:
-                            continue
-                        seen_addresses.add(addr)
-                    
-                    listings.append(listing)
-            except Exception as e:
-                print(f"Error extracting listing: {e}")
-                continue
-
-        await browser.close()
+    found["card_count"] = len(found.pop("cards"))
+    found["listings"] = listings
+    return found
 
-    return {
-        "listings": listings,
-        "scraped_at": datetime.utcnow().isoformat() + "Z",
-        "source": "koto"
-    }
+
+def parse_listings(page_html: str) -> list[dict]:
+    """Listings from a stored snapshot, probing every selector."""
+    return parse_page(page_html)["listings"]
 
 
-async def extract_listing_data(element) -> dict | None:
-    """Extract data from a single listing element."""
+def extract_listing_data(card: dict) -> dict | None:
+    """Build a listing from one card's raw FIELDS values."""
     try:
-        text = await element.inner_text()
+        text = card["text"] or ""
         
         listing_link = None
-        link = await element.query_selector("a")
-        
-        if link:
-            href = await link.get_attribute("href")
-            if href and not href.startswith("#") and not href.startswith("javascript:"):
-                if href.startswith("http"):
-                    listing_link = href
-                elif href.startswith("/"):
-                    listing_link = f"https://www.kotogroup.com{href}"
-                else:
-                    listing_link = f"https://www.kotogroup.com/{href}"
+        href = card["href"]
+        if href and not href.startswith("#") and not href.startswith("javascript:"):
+            if href.startswith("http"):
+                listing_link = href
+            elif href.startswith("/"):
+                listing_link = f"https://www.kotogroup.com{href}"
+            else:
+                listing_link = f"https://www.kotogroup.com/{href}"
 
         if "93117" not in text and (not listing_link or "93117" not in listing_link):
             return None
@@ -172,9 +271,8 @@ async def extract_listing_data(element) -> dict | None:
         
         if not address:
             for tag in ['h1', 'h2', 'h3', 'h4']:
-                heading = await element.query_selector(tag)
-                if heading:
-                    heading_text = await heading.inner_text()
+                heading_text = card[tag]
+                if heading_text is not None:
                     if re.search(r'\d+\s+[A-Z]', heading_text):
                         address = heading_text.strip()
                         break
@@ -0,0 +1,254 @@
+"""
+Shared, long-lived Playwright browser for the scrapers.
+
+Launching Chromium is the most expensive part of a scrape, so instead of every
+scraper calling async_playwright() and chromium.launch() itself, the app owns a
+single BrowserManager (started and stopped by the FastAPI lifespan) that keeps
+one Chromium process warm and hands each scrape an isolated BrowserContext.
+
+The browser is recycled after BROWSER_MAX_USES contexts or once the Playwright
+process tree grows past BROWSER_MAX_RSS_MB, so a long-running server does not
+slowly leak renderer memory. Only the driver and Chromium count towards that
+(browser_rss_mb), not other children such as the parse pool's workers. A
+retired browser is closed as soon as its last in-flight context finishes.
+
+The memory readers walk /proc synchronously, so async code calls them through
+asyncio.to_thread.
+"""
+
+import asyncio
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+
+from playwright.async_api import async_playwright
+
+BROWSER_MAX_USES = int(os.getenv("BROWSER_MAX_USES", "50"))
+BROWSER_MAX_RSS_MB = float(os.getenv("BROWSER_MAX_RSS_MB", "1024"))
+
+
+def _proc_table() -> tuple[dict[int, list[int]], dict[int, int]]:
+    """(child pids by parent pid, RSS pages by pid) for every process; empty where /proc is unavailable."""
+    try:
+        pids = [int(p) for p in os.listdir("/proc") if p.isdigit()]
+    except OSError:
+        return {}, {}
+    children: dict[int, list[int]] = {}
+    rss_pages = {}
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                # The command name may contain spaces; fields after it are fixed.
+                fields = f.read().rsplit(")", 1)[1].split()
+            children.setdefault(int(fields[1]), []).append(pid)
+            rss_pages[pid] = int(fields[21])
+        except (OSError, IndexError, ValueError):
+            continue
+    return children, rss_pages
+
+
+def _subtree_mb(children: dict[int, list[int]], rss_pages: dict[int, int], roots: list[int]) -> float:
+    """Resident memory (MB) of roots and all their descendants."""
+    total = 0
+    stack = list(roots)
+    while stack:
+        pid = stack.pop()
+        total += rss_pages.get(pid, 0)
+        stack.extend(children.get(pid, []))
+    return total * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+def process_tree_rss_mb(root_pid: int | None = None, include_root: bool = False) -> float:
+    """
+    Resident memory (MB) of every descendant of root_pid (default: this process),
+    plus the root itself with include_root. That includes the browser and the
+    parse pool's workers. Linux only; returns 0.0 where /proc is unavailable.
+    """
+    root_pid = root_pid or os.getpid()
+    children, rss_pages = _proc_table()
+    roots = [root_pid] if include_root else children.get(root_pid, [])
+    return _subtree_mb(children, rss_pages, roots)
+
+
+def _is_playwright_driver(pid: int) -> bool:
+    try:
+        with open(f"/proc/{pid}/cmdline", "rb") as f:
+            return b"playwright" in f.read()
+    except OSError:
+        return False
+
+
+def browser_rss_mb(root_pid: int | None = None) -> float:
+    """
+    Resident memory (MB) of the Playwright driver and the Chromium processes it
+    spawned: the children of root_pid (default: this process) whose command
+    line names playwright, and their descendants. Other children, such as the
+    parse pool's workers, are not counted. Linux only; 0.0 without /proc.
+    """
+    root_pid = root_pid or os.getpid()
+    children, rss_pages = _proc_table()
+    drivers = [pid for pid in children.get(root_pid, []) if _is_playwright_driver(pid)]
+    return _subtree_mb(children, rss_pages, drivers)
+
+
+class PeakRssSampler:
+    """
+    Samples process_tree_rss_mb(include_root=True) in the background while
+    active and keeps the maximum. Used as `async with PeakRssSampler() as rss:`;
+    rss.peak_mb is final after the block exits.
+    """
+
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self.peak_mb = 0.0
+        self._task: asyncio.Task | None = None
+
+    async def sample(self):
+        rss_mb = await asyncio.to_thread(process_tree_rss_mb, None, True)
+        self.peak_mb = max(self.peak_mb, rss_mb)
+
+    async def _run(self):
+        while True:
+            await self.sample()
+            await asyncio.sleep(self.interval)
+
+    async def __aenter__(self):
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    async def __aexit__(self, *exc):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        await self.sample()
+
+
+class _LaunchedBrowser:
+    def __init__(self, browser):
+        self.browser = browser
+        self.uses = 0
+        self.active = 0
+        self.retiring = False
+        self.launched_at = time.monotonic()
+
+
+class BrowserManager:
+    """Owns one warm Chromium process and hands out isolated contexts."""
+
+    def __init__(self, max_uses: int = BROWSER_MAX_USES, max_rss_mb: float = BROWSER_MAX_RSS_MB):
+        self.max_uses = max_uses
+        self.max_rss_mb = max_rss_mb
+        self._playwright = None
+        self._current: _LaunchedBrowser | None = None
+        self._lock = asyncio.Lock()
+        self.launch_count = 0
+        self.context_count = 0
+        self.active_contexts = 0
+        self.recycle_count = 0
+        self.recycle_events: deque = deque(maxlen=20)
+
+    async def start(self):
+        """Start the Playwright driver. Chromium itself launches on first use."""
+        async with self._lock:
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+
+    async def stop(self):
+        """Close the browser and the Playwright driver."""
+        async with self._lock:
+            if self._current is not None:
+                await self._close(self._current)
+                self._current = None
+            if self._playwright is not None:
+                await self._playwright.stop()
+                self._playwright = None
+
+    async def _close(self, launched: _LaunchedBrowser):
+        try:
+            await launched.browser.close()
+        except Exception as e:
+            print(f"[browser] Error closing browser: {e}")
+
+    async def _retire(self, reason: str):
+        launched = self._current
+        self._current = None
+        launched.retiring = True
+        self.recycle_count += 1
+        self.recycle_events.append({
+            "at": datetime.now(timezone.utc).isoformat(),
+            "reason": reason,
+            "uses": launched.uses,
+            "age_seconds": round(time.monotonic() - launched.launched_at, 1),
+        })
+        print(f"[browser] Recycling browser ({reason}) after {launched.uses} uses")
+        if launched.active == 0:
+            await self._close(launched)
+
+    async def _acquire(self) -> _LaunchedBrowser:
+        async with self._lock:
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+            if self._current is not None:
+                if not self._current.browser.is_connected():
+                    await self._retire("disconnected")
+                elif self._current.uses >= self.max_uses:
+                    await self._retire("max_uses")
+                elif self.max_rss_mb and await asyncio.to_thread(browser_rss_mb) > self.max_rss_mb:
+                    await self._retire("rss")
+            if self._current is None:
+                browser = await self._playwright.chromium.launch(headless=True)
+                self._current = _LaunchedBrowser(browser)
+                self.launch_count += 1
+            self._current.uses += 1
+            self._current.active += 1
+            return self._current
+
+    async def _release(self, launched: _LaunchedBrowser):
+        async with self._lock:
+            launched.active -= 1
+            if launched.retiring and launched.active == 0:
+                await self._close(launched)
+
+    @asynccontextmanager
+    async def context(self, **kwargs):
+        """Yield a fresh BrowserContext on the shared browser; closed on exit."""
+        launched = await self._acquire()
+        self.context_count += 1
+        self.active_contexts += 1
+        try:
+            context = await launched.browser.new_context(**kwargs)
+            try:
+                yield context
+            finally:
+                await context.close()
+        finally:
+            self.active_contexts -= 1
+            await self._release(launched)
+
+    @asynccontextmanager
+    async def page(self, **kwargs):
+        """Yield a page in its own fresh context."""
+        async with self.context(**kwargs) as context:
+            yield await context.new_page()
+
+    async def stats(self) -> dict:
+        current = self._current
+        return {
+            "running": current is not None,
+            "launch_count": self.launch_count,
+            "context_count": self.context_count,
+            "active_contexts": self.active_contexts,
+            "current_browser_uses": current.uses if current else 0,
+            "max_uses": self.max_uses,
+            "max_rss_mb": self.max_rss_mb,
+            "browser_rss_mb": round(await asyncio.to_thread(browser_rss_mb), 1),
+            "recycle_count": self.recycle_count,
+            "recycle_events": list(self.recycle_events),
+        }
+
+
+browser_manager = BrowserManager()
@@ -0,0 +1,103 @@
+"""
+Declarative extraction of listing cards from an HTML snapshot.
+
+Every awaited query_selector / inner_text / get_attribute on an ElementHandle
+is an IPC round trip to the browser, and the scrapers used to make a dozen of
+them per card. Instead, each scraper declares its fields once as a dict of
+name -> Field, captures the page HTML once, and select_cards reads every field
+of every matching card with selectolax (lexbor). The scraper's own regex
+post-processing then runs on the returned plain strings. The parse stage needs
+no browser, so it runs in the parse process pool or offline (see
+scrapers/pipeline.py).
+"""
+
+import hashlib
+import re
+from collections import Counter
+from dataclasses import dataclass
+
+from selectolax.lexbor import LexborHTMLParser
+
+
+@dataclass(frozen=True)
+class Field:
+    """
+    One value to read from a card: the first descendant matching selector (or
+    the card itself when selector is None), as its innerText or, with attr, as
+    that attribute. Missing elements and attributes come back as None. With
+    shape, the value is the element's structure instead (tag, sorted classes and
+    child tags), for structure_fingerprint.
+    """
+
+    selector: str | None = None
+    attr: str | None = None
+    shape: bool = False
+
+
+# Text in these never shows up in innerText.
+_NON_RENDERED_TAGS = ["script", "style", "noscript", "template"]
+
+
+def parse_html(page_html: str) -> LexborHTMLParser:
+    """Parse a snapshot once, for several select_cards calls on the same page."""
+    tree = LexborHTMLParser(page_html)
+    tree.strip_tags(_NON_RENDERED_TAGS)
+    return tree
+
+
+def _shape(node) -> str:
+    classes = ".".join(sorted((node.attributes.get("class") or "").split()))
+    return f"{node.tag}.{classes}>" + ",".join(child.tag for child in node.iter())
+
+
+def _read_field(card, field: Field):
+    el = card
+    if field.selector:
+        # Unlike querySelector, lexbor's css() can match the node itself.
+        el = next((n for n in card.css(field.selector) if n != card), None)
+    if el is None:
+        return None
+    if field.shape:
+        return _shape(el)
+    if field.attr:
+        return el.attributes.get(field.attr)
+    return el.text(separator="\n", strip=True)
+
+
+def select_cards(page, card_selector: str, fields: dict[str, Field], limit: int | None = None) -> list[dict]:
+    """
+    Return one {field name: str | None} dict per element matching card_selector
+    (at most limit of them), in document order. page is the HTML text or a
+    parse_html tree. Text values approximate innerText (one line per text node).
+    """
+    tree = parse_html(page) if isinstance(page, str) else page
+    cards = tree.css(card_selector)
+    if limit is not None:
+        cards = cards[:limit]
+    return [{name: _read_field(card, field) for name, field in fields.items()} for card in cards]
+
+
+def structure_fingerprint(cards: list[dict], field: str = "shape") -> str:
+    """
+    Short hash of the most common card shape among cards (the values of a
+    shape Field). Stays stable while a site keeps its card markup, whatever the
+    card count or text, and changes when the markup is redesigned.
+    """
+    shapes = Counter(card[field] for card in cards if card.get(field))
+    if not shapes:
+        return ""
+    return hashlib.sha1(shapes.most_common(1)[0][0].encode()).hexdigest()[:16]
+
+
+def region_hash(page, selector: str) -> str:
+    """
+    sha1 of the listing region of a page (HTML text or a parse_html tree): the
+    HTML of every element matching selector, whitespace-collapsed, without
+    scripts and styles. Page chrome outside the region (nonces, analytics,
+    banners) does not change it.
+    """
+    tree = parse_html(page) if isinstance(page, str) else page
+    digest = hashlib.sha1()
+    for node in tree.css(selector):
+        digest.update(re.sub(r"\s+", " ", node.html or "").encode())
+    return digest.hexdigest()
@@ -0,0 +1,120 @@
+"""
+Per-source page loading policy for the browser scrapers.
+
+Instead of waiting for "networkidle" and then sleeping a fixed 2-3 seconds,
+each scraper declares a FetchPolicy: which request types to abort (images,
+fonts, media and third-party trackers are never read) and the CSS selector
+that signals its listings have rendered. load_listing_page applies the policy
+and records per-phase wall-clock timings in a PhaseTimer.
+"""
+
+import time
+from dataclasses import dataclass, field
+from urllib.parse import urlparse
+
+BLOCKED_RESOURCE_TYPES = ("image", "media", "font")
+
+TRACKER_DOMAINS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "facebook.net",
+    "facebook.com",
+    "hotjar.com",
+    "clarity.ms",
+    "newrelic.com",
+    "nr-data.net",
+)
+
+
+@dataclass
+class FetchPolicy:
+    """How to load a source's listing page and how to tell that it is ready."""
+
+    ready_selector: str
+    # "visible" for DOM-rendered cards, "attached" for data carried in attributes.
+    ready_state: str = "visible"
+    ready_timeout_ms: int = 15000
+    goto_timeout_ms: int = 60000
+    blocked_resource_types: tuple = BLOCKED_RESOURCE_TYPES
+    blocked_domains: tuple = TRACKER_DOMAINS
+    extra_headers: dict = field(default_factory=dict)
+    # True if the listing data is in the server-rendered HTML, so the source can
+    # try the browserless HTTP tier (scrapers/http_fetch.py) before Chromium.
+    http_tier: bool = False
+
+    def blocks(self, resource_type: str, url: str) -> bool:
+        if resource_type in self.blocked_resource_types:
+            return True
+        host = urlparse(url).hostname or ""
+        return any(host == d or host.endswith("." + d) for d in self.blocked_domains)
+
+
+class PhaseTimer:
+    """Records consecutive phase durations for one scrape ("lap" style)."""
+
+    def __init__(self, source: str):
+        self.source = source
+        self.phases: dict[str, float] = {}
+        self.blocked_requests = 0
+        self._started = self._last = time.perf_counter()
+
+    def lap(self, phase: str):
+        """Close the current phase: time since the previous lap is charged to it."""
+        now = time.perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + (now - self._last)
+        self._last = now
+
+    @property
+    def total(self) -> float:
+        return self._last - self._started
+
+    def as_dict(self) -> dict:
+        return {
+            **{name: round(seconds, 3) for name, seconds in self.phases.items()},
+            "total": round(self.total, 3),
+            "blocked_requests": self.blocked_requests,
+        }
+
+    def log(self):
+        parts = " ".join(f"{name}={seconds:.2f}s" for name, seconds in self.phases.items())
+        print(
+            f"[scrape] {self.source}: {parts} total={self.total:.2f}s "
+            f"(blocked {self.blocked_requests} requests)"
+        )
+
+
+async def load_listing_page(page, url: str, policy: FetchPolicy, timer: PhaseTimer, referer: str | None = None):
+    """
+    Navigate to url with the policy's request blocking, then wait for the
+    listing selector. Laps "navigate" and "ready" on the timer. If the selector
+    never shows up we fall back to a bounded networkidle wait rather than fail,
+    since the extraction step can still find something (or report nothing).
+    """
+
+    async def route(route):
+        request = route.request
+        if policy.blocks(request.resource_type, request.url):
+            timer.blocked_requests += 1
+            await route.abort()
+        else:
+            await route.continue_()
+
+    await page.route("**/*", route)
+    if policy.extra_headers:
+        await page.set_extra_http_headers(policy.extra_headers)
+
+    await page.goto(url, referer=referer, wait_until="domcontentloaded", timeout=policy.goto_timeout_ms)
+    timer.lap("navigate")
+
+    try:
+        await page.wait_for_selector(
+            policy.ready_selector, state=policy.ready_state, timeout=policy.ready_timeout_ms
+        )
+    except Exception as e:
+        print(f"[scrape] {timer.source}: ready selector {policy.ready_selector!r} not found ({e}); waiting for networkidle")
+        try:
+            await page.wait_for_load_state("networkidle", timeout=policy.ready_timeout_ms)
+        except Exception:
+            pass
+    timer.lap("ready")
@@ -0,0 +1,80 @@
+"""
+Browserless HTTP fetch tier for sources that render their data server-side.
+
+A plain async GET costs a fraction of a Chromium page load, so sources whose
+FetchPolicy sets http_tier=True are fetched here first and only fall back to
+the browser when the fast path yields nothing. Responses are revalidated with
+conditional GETs (If-None-Match / If-Modified-Since) against the validators
+and body stored in the http_cache table; a 304 reuses the stored body.
+"""
+
+import time
+from dataclasses import dataclass
+
+import httpx
+
+from database import get_http_cache_entry, save_http_cache_entry
+
+HTTP_TIMEOUT_SECONDS = 20
+USER_AGENT = (
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+)
+
+_client: httpx.AsyncClient | None = None
+
+
+@dataclass
+class HttpPage:
+    url: str
+    text: str
+    status: int
+    not_modified: bool
+    elapsed: float
+
+
+def _get_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=HTTP_TIMEOUT_SECONDS,
+            follow_redirects=True,
+            headers={"User-Agent": USER_AGENT},
+        )
+    return _client
+
+
+async def close_http_client():
+    """Close the shared HTTP client. Called from the FastAPI lifespan."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def fetch_page(url: str, referer: str | None = None) -> HttpPage:
+    """
+    GET url, revalidating against the cached copy when we have validators.
+    Raises httpx.HTTPError on network errors and non-2xx/304 responses.
+    """
+    start = time.perf_counter()
+    cached = await get_http_cache_entry(url)
+    headers = {}
+    if referer:
+        headers["Referer"] = referer
+    if cached:
+        if cached["etag"]:
+            headers["If-None-Match"] = cached["etag"]
+        if cached["last_modified"]:
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    response = await _get_client().get(url, headers=headers)
+    if response.status_code == 304 and cached:
+        return HttpPage(url, cached["body"], 304, True, time.perf_counter() - start)
+    response.raise_for_status()
+
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if etag or last_modified:
+        await save_http_cache_entry(url, etag, last_modified, response.text)
+    return HttpPage(url, response.text, response.status_code, False, time.perf_counter() - start)
@@ -1,71 +1,83 @@
 """
 Scraper for Meridian Group Real Estate (meridiangrouprem.com)
 """
-from playwright.async_api import async_playwright
 from datetime import datetime
-import asyncio
 import re
 
-async def scrape_meridian() -> dict:
+from scrapers.browser import browser_manager
+from scrapers.extract import Field, region_hash, select_cards
+from scrapers.fetch import FetchPolicy, PhaseTimer, load_listing_page
+from scrapers.pipeline import parse_off_loop, save_snapshot, unchanged_result
+
+LISTING_URL = "https://meridiangrouprem.com/available-rentals/"
+CARD_SELECTOR = ".prop-list"
+FETCH_POLICY = FetchPolicy(ready_selector=CARD_SELECTOR, http_tier=False)
+FIELDS = {
+    "href": Field("a[href]", attr="href"),
+    "address": Field(".prop-details h3"),
+    "location": Field(".prop-details > p"),
+    "price_text": Field(".two-item-wrap p:first-child"),
+    "beds_baths_text": Field(".two-item-wrap p:last-child"),
+}
+
+async def scrape_meridian(unchanged_hash: str | None = None) -> dict:
     """
     Scrape rental listings from Meridian Group Real Estate.
     Returns a dict with listings array and timestamp.
     """
-    listings = []
+    timer = PhaseTimer("meridian")
     
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        page = await browser.new_page()
-        
-        await page.goto("https://meridiangrouprem.com/available-rentals/")
-        
-        await page.wait_for_load_state("networkidle")
-        await asyncio.sleep(2)
-        
-        listing_elements = await page.query_selector_all(".prop-list")
-        
-        for element in listing_elements:
-            try:
-                listing = await extract_listing_data(element)
-                if listing:
-                    listings.append(listing)
-            except Exception as e:
-                print(f"Error extracting listing: {e}")
-                continue
-        
-        await browser.close()
+    async with browser_manager.page() as page:
+        timer.lap("launch")
+        await load_listing_page(page, LISTING_URL, FETCH_POLICY, timer)
+        page_html = await page.content()
+    await save_snapshot("meridian", page_html)
+    timer.lap("capture")
+    
+    content_hash = await parse_off_loop(region_hash, page_html, CARD_SELECTOR)
+    timer.lap("hash")
+    if content_hash == unchanged_hash:
+        return unchanged_result("meridian", content_hash, timer)
+    
+    listings = await parse_off_loop(parse_listings, page_html)
+    timer.lap("parse")
     
+    timer.log()
     return {
         "listings": listings,
         "scraped_at": datetime.utcnow().isoformat() + "Z",
-        "source": "meridian"
+        "source": "meridian",
+        "timings": timer.as_dict(),
+        "content_hash": content_hash,
     }
 
-async def extract_listing_data(element) -> dict | None:
-    """Extract data from a single listing element."""
+def parse_listings(page_html: str) -> list[dict]:
+    """Parse stage: listings from a rendered page (live or a stored snapshot)."""
+    listings = []
+    for card in select_cards(page_html, CARD_SELECTOR, FIELDS):
+        listing = extract_listing_data(card)
+        if listing:
+            listings.append(listing)
+    return listings
+
+def extract_listing_data(card: dict) -> dict | None:
+    """Build a listing from one card's raw FIELDS values."""
     try:
-        link_el = await element.query_selector("a[href]")
         listing_link = None
-        if link_el:
-            href = await link_el.get_attribute("href")
-            if href:
-                listing_link = href if href.startswith("http") else f"https://meridiangrouprem.com{href}"
-        
-        address_el = await element.query_selector(".prop-details h3")
-        address = await address_el.inner_text() if address_el else "Unknown"
+        href = card["href"]
+        if href:
+            listing_link = href if href.startswith("http") else f"https://meridiangrouprem.com{href}"
         
-        location_el = await element.query_selector(".prop-details > p")
-        location = await location_el.inner_text() if location_el else ""
+        address = card["address"] if card["address"] is not None else "Unknown"
+        location = card["location"] or ""
         
         full_address = f"{address.strip()}, {location.strip()}" if location else address.strip()
         
-        price_el = await element.query_selector(".two-item-wrap p:first-child")
-        price_text = await price_el.inner_text() if price_el else ""
+        price_text = card["price_text"] or ""
         price_match = re.search(r'[\d,]+', price_text)
         price = int(price_match.group().replace(',', '')) if price_match else None
         
-        beds_baths_el = await element.query_selector(".two-item-wrap p:last-child")
-        beds_baths_text = await beds_baths_el.inner_text() if beds_baths_el else ""
+        beds_baths_text = card["beds_baths_text"] or ""
         
         bedrooms = None
         if re.search(r'studio', beds_baths_text, re.IGNORECASE):
@@ -0,0 +1,113 @@
+"""
+Two-stage scrape pipeline: fetch (browser or HTTP) then parse.
+
+The fetch stage only captures the page HTML, which is written to a snapshot
+under SCRAPE_SNAPSHOT_DIR (the newest SCRAPE_SNAPSHOT_KEEP per source are
+kept). The parse stage is a plain function of that HTML, run in a process pool
+via parse_off_loop so selectolax and the regex post-processing never block the
+event loop. Because parse functions only take HTML, they can be rerun on stored
+snapshots to test a parser fix or benchmark it without re-scraping.
+
+Between the stages each scraper hashes the listing region of the page. When
+the caller passes the hash stored after the previous run (unchanged_hash) and
+it still matches, the scraper returns unchanged_result() without parsing, and
+the scheduler skips the upsert.
+"""
+
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+SNAPSHOT_DIR = os.getenv(
+    "SCRAPE_SNAPSHOT_DIR", os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "snapshots")
+)
+SNAPSHOT_KEEP = int(os.getenv("SCRAPE_SNAPSHOT_KEEP", "5"))
+PARSE_WORKERS = int(os.getenv("SCRAPE_PARSE_WORKERS", "2"))
+
+_executor: ProcessPoolExecutor | None = None
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # spawn, not fork: the parent runs aiosqlite and Playwright threads.
+        _executor = ProcessPoolExecutor(
+            max_workers=max(1, PARSE_WORKERS), mp_context=multiprocessing.get_context("spawn")
+        )
+    return _executor
+
+
+def shutdown_parse_pool():
+    """Stop the parse worker processes. Called from the FastAPI lifespan."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+        _executor = None
+
+
+async def parse_off_loop(fn, *args):
+    """
+    Run a parse function in the process pool. fn must be a module-level
+    function (it is pickled by name) and its arguments and result picklable.
+    With SCRAPE_PARSE_WORKERS=0 it runs in a thread instead.
+    """
+    if PARSE_WORKERS <= 0:
+        return await asyncio.to_thread(fn, *args)
+    return await asyncio.get_running_loop().run_in_executor(_get_executor(), fn, *args)
+
+
+def unchanged_result(source: str, content_hash: str, timer) -> dict:
+    """What a scraper returns when its page still hashes to unchanged_hash."""
+    timer.log()
+    return {
+        "listings": [],
+        "unchanged": True,
+        "content_hash": content_hash,
+        "scraped_at": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+        "source": source,
+        "timings": timer.as_dict(),
+    }
+
+
+# ── Snapshots ─────────────────────────────────────────────────────────────────
+
+def _source_dir(source: str) -> str:
+    return os.path.join(SNAPSHOT_DIR, source)
+
+
+def _write_snapshot(source: str, page_html: str) -> str:
+    directory = _source_dir(source)
+    os.makedirs(directory, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+    path = os.path.join(directory, f"{stamp}.html")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(page_html)
+    for old in sorted(os.listdir(directory))[:-SNAPSHOT_KEEP]:
+        os.remove(os.path.join(directory, old))
+    return path
+
+
+async def save_snapshot(source: str, page_html: str) -> str | None:
+    """Store a captured page; returns its path. Failures are logged, not raised."""
+    if SNAPSHOT_KEEP <= 0:
+        return None
+    try:
+        return await asyncio.to_thread(_write_snapshot, source, page_html)
+    except OSError as e:
+        print(f"[scrape] {source}: could not write snapshot ({e})")
+        return None
+
+
+def list_snapshots(source: str) -> list[str]:
+    """Snapshot paths for a source, oldest first."""
+    directory = _source_dir(source)
+    if not os.path.isdir(directory):
+        return []
+    return [os.path.join(directory, name) for name in sorted(os.listdir(directory))]
+
+
+def load_snapshot(path: str) -> str:
+    with open(path, encoding="utf-8") as f:
+        return f.read()
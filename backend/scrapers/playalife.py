@@ -1,71 +1,87 @@
 """
 Scraper for PlayaLife IV (playalifeiv.com)
 """
-from playwright.async_api import async_playwright
 from datetime import datetime
-import asyncio
 import re
 
-async def scrape_playalife() -> dict:
-    listings = []
+from scrapers.browser import browser_manager
+from scrapers.extract import Field, region_hash, select_cards
+from scrapers.fetch import FetchPolicy, PhaseTimer, load_listing_page
+from scrapers.pipeline import parse_off_loop, save_snapshot, unchanged_result
+
+LISTING_URL = "https://www.playalifeiv.com/vacancies"
+CARD_SELECTOR = ".listing-item"
+FETCH_POLICY = FetchPolicy(ready_selector=CARD_SELECTOR, http_tier=False)
+FIELDS = {
+    "address": Field(".photo a[aria-label]", attr="aria-label"),
+    "href": Field(".photo a[aria-label]", attr="href"),
+    "rent_text": Field("h3.rent"),
+    "beds_text": Field(".feature.beds"),
+    "baths_text": Field(".feature.baths"),
+    "slider_href": Field("a.slider-link", attr="href"),
+}
+
+async def scrape_playalife(unchanged_hash: str | None = None) -> dict:
+    timer = PhaseTimer("playalife")
     
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        page = await browser.new_page()
-        
-        await page.goto("https://www.playalifeiv.com/vacancies")
-        await page.wait_for_load_state("networkidle")
-        await asyncio.sleep(2)
-        
-        listing_elements = await page.query_selector_all(".listing-item")
-        
-        for element in listing_elements:
-            try:
-                listing = await extract_listing_data(element)
-                if listing:
-                    listings.append(listing)
-            except Exception as e:
-                print(f"Error extracting listing: {e}")
-        
-        await browser.close()
+    async with browser_manager.page() as page:
+        timer.lap("launch")
+        await load_listing_page(page, LISTING_URL, FETCH_POLICY, timer)
+        page_html = await page.content()
+    await save_snapshot("playalife", page_html)
+    timer.lap("capture")
+    
+    content_hash = await parse_off_loop(region_hash, page_html, CARD_SELECTOR)
+    timer.lap("hash")
+    if content_hash == unchanged_hash:
+        return unchanged_result("playalife", content_hash, timer)
+    
+    listings = await parse_off_loop(parse_listings, page_html)
+    timer.lap("parse")
     
+    timer.log()
     return {
         "listings": listings,
         "scraped_at": datetime.utcnow().isoformat() + "Z",
-        "source": "playalife"
+        "source": "playalife",
+        "timings": timer.as_dict(),
+        "content_hash": content_hash,
     }
 
-async def extract_listing_data(element) -> dict | None:
-    """Extract data from a single PlayaLife listing card."""
+def parse_listings(page_html: str) -> list[dict]:
+    """Listings from the rendered vacancies page, live or from a stored snapshot."""
+    listings = []
+    for card in select_cards(page_html, CARD_SELECTOR, FIELDS):
+        listing = extract_listing_data(card)
+        if listing:
+            listings.append(listing)
+    return listings
+
+def extract_listing_data(card: dict) -> dict | None:
+    """Build a listing from one PlayaLife card's raw FIELDS values."""
     try:
-        address_el = await element.query_selector(".photo a[aria-label]")
-        address = await address_el.get_attribute("aria-label") if address_el else None
+        address = card["address"]
         
         listing_link = None
-        if address_el:
-            href = await address_el.get_attribute("href")
-            if href:
-                listing_link = href if href.startswith("http") else f"https://www.playalifeiv.com{href}"
+        href = card["href"]
+        if href:
+            listing_link = href if href.startswith("http") else f"https://www.playalifeiv.com{href}"
         
-        rent_el = await element.query_selector("h3.rent")
-        rent_text = await rent_el.inner_text() if rent_el else ""
+        rent_text = card["rent_text"] or ""
         price_match = re.search(r'[\d,]+', rent_text)
         price = int(price_match.group().replace(",", "")) if price_match else None
         
-        beds_el = await element.query_selector(".feature.beds")
-        beds_text = await beds_el.inner_text() if beds_el else ""
+        beds_text = card["beds_text"] or ""
         beds_match = re.search(r'\d+', beds_text)
         bedrooms = int(beds_match.group()) if beds_match else None
         
-        baths_el = await element.query_selector(".feature.baths")
-        baths_text = await baths_el.inner_text() if baths_el else ""
+        baths_text = card["baths_text"] or ""
         baths_match = re.search(r'\d+(?:\.\d+)?', baths_text)
         bathrooms = float(baths_match.group()) if baths_match else None
 
         # Link
 
-        link_el = await element.query_selector("a.slider-link")
-        relative_url = await link_el.get_attribute("href") if link_el else None
+        relative_url = card["slider_href"]
 
         listing_url = (
             f"https://www.playalifeiv.com{relative_url}"
@@ -1,45 +1,116 @@
-from playwright.async_api import async_playwright
 from datetime import datetime, timezone
-import asyncio
+import hashlib
+import html
 import json
 import re
 
-async def scrape_solis() -> dict:
-    listings = []
+from scrapers.browser import browser_manager
+from scrapers.fetch import FetchPolicy, PhaseTimer, load_listing_page
+from scrapers.http_fetch import fetch_page
+from scrapers.pipeline import parse_off_loop, save_snapshot, unchanged_result
+
+LISTING_URL = "https://embed.leaseleads.co/9e5b6e85-dc8f-438c-b76e-a669428600ec/floor-plans"
+REFERER = "https://solisislavista.com/"
+# The floor plans are server-rendered into the data-page attribute, so the page
+# is ready as soon as that element is attached; nothing else needs to load.
+FETCH_POLICY = FetchPolicy(
+    ready_selector="[data-page]",
+    ready_state="attached",
+    blocked_resource_types=("image", "media", "font", "stylesheet"),
+    http_tier=True,
+)
+
+async def scrape_solis(tier: str | None = None, unchanged_hash: str | None = None) -> dict:
+    """
+    Scrape Solis floor plans. Tries the browserless HTTP tier first and falls
+    back to Chromium if it fails or finds nothing. Pass tier="http" or
+    tier="browser" to force one path (used by the fetch-tier benchmark).
+    """
+    timer = PhaseTimer("solis")
+    used_tier = None
+    content_hash = None
+
+    if tier != "browser" and FETCH_POLICY.http_tier:
+        try:
+            page = await fetch_page(LISTING_URL, referer=REFERER)
+            timer.lap("navigate")
+            if not page.not_modified:
+                await save_snapshot("solis", page.text)
+            timer.lap("capture")
+            content_hash = await parse_off_loop(floor_plans_hash, page.text)
+            timer.lap("hash")
+            if content_hash or tier == "http":
+                page_html = page.text
+                used_tier = "http"
+            else:
+                print("[scrape] solis: HTTP tier found no floor plans; falling back to browser")
+        except Exception as e:
+            if tier == "http":
+                raise
+            print(f"[scrape] solis: HTTP tier failed ({e}); falling back to browser")
 
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        page = await browser.new_page()
-
-        # Navigate directly to the Entrata embed URL.
-        # The listing data is server-side rendered as JSON in the page's data-page attribute,
-        # so we just parse that instead of scraping the DOM.
-        await page.goto(
-            "https://embed.leaseleads.co/9e5b6e85-dc8f-438c-b76e-a669428600ec/floor-plans",
-            referer="https://solisislavista.com/",
-        )
-        await page.wait_for_load_state("networkidle")
-
-        html = await page.content()
-        m = re.search(r'data-page="([^"]+)"', html)
-        if m:
-            raw = m.group(1).replace("&quot;", '"').replace("&amp;", "&")
-            data = json.loads(raw)
-            floor_plans = data.get("props", {}).get("floorPlans", [])
-            for fp in floor_plans:
-                listing = extract_solis_listing_data(fp)
-                if listing:
-                    listings.append(listing)
-
-        await browser.close()
+    if used_tier is None:
+        async with browser_manager.page() as page:
+            timer.lap("launch")
+            # Navigate directly to the Entrata embed URL.
+            await load_listing_page(page, LISTING_URL, FETCH_POLICY, timer, referer=REFERER)
+            page_html = await page.content()
+        await save_snapshot("solis", page_html)
+        timer.lap("capture")
+        content_hash = await parse_off_loop(floor_plans_hash, page_html)
+        timer.lap("hash")
+        used_tier = "browser"
 
+    if content_hash and content_hash == unchanged_hash:
+        return {**unchanged_result("solis", content_hash, timer), "fetch_tier": used_tier}
+
+    listings = await parse_off_loop(parse_solis_html, page_html)
+    timer.lap("parse")
+
+    timer.log()
     return {
         "listings": listings,
         "scraped_at": datetime.now(timezone.utc).isoformat() + "Z",
         "source": "solis",
+        "timings": timer.as_dict(),
+        "fetch_tier": used_tier,
+        "content_hash": content_hash,
     }
 
 
+def _floor_plans(page_html: str) -> list[dict]:
+    """
+    The listing data is server-side rendered as JSON in the page's data-page
+    attribute, so we just parse that instead of scraping the DOM.
+    """
+    m = re.search(r'data-page="([^"]+)"', page_html)
+    if not m:
+        return []
+    data = json.loads(html.unescape(m.group(1)))
+    return data.get("props", {}).get("floorPlans", [])
+
+
+def floor_plans_hash(page_html: str) -> str | None:
+    """
+    sha1 of just the floor plan JSON (the rest of data-page carries per-request
+    values), or None if the page has no floor plans.
+    """
+    floor_plans = _floor_plans(page_html)
+    if not floor_plans:
+        return None
+    return hashlib.sha1(json.dumps(floor_plans, sort_keys=True).encode()).hexdigest()
+
+
+def parse_solis_html(page_html: str) -> list[dict]:
+    """Listings from a Solis floor plans page (live or a stored snapshot)."""
+    listings = []
+    for fp in _floor_plans(page_html):
+        listing = extract_solis_listing_data(fp)
+        if listing:
+            listings.append(listing)
+    return listings
+
+
 def extract_solis_listing_data(fp: dict) -> dict | None:
     """Extract a listing from a single floor plan JSON object."""
     try:
@@ -1,106 +1,120 @@
 """
 Scraper for Wolfe & Associates (rlwa.com) - Isla Vista only
 """
-from playwright.async_api import async_playwright
 from datetime import datetime
-import asyncio
+import hashlib
 import re
 
+from scrapers.browser import browser_manager
+from scrapers.extract import Field, region_hash, select_cards
+from scrapers.fetch import FetchPolicy, PhaseTimer, load_listing_page
+from scrapers.pipeline import parse_off_loop, save_snapshot, unchanged_result
+
 LISTING_URLS = [
     "https://www.rlwa.com/isla-vista-listings",
 ]
+LISTING_SELECTOR = ".listing-item, .js-listing-card, [data-listingid]"
+FETCH_POLICY = FetchPolicy(ready_selector=LISTING_SELECTOR, http_tier=False)
+FIELDS = {
+    "href": Field("a[href*='/listings/detail/']", attr="href"),
+    "address": Field("h2.address"),
+    "rent_text": Field("h3.rent"),
+    # Beds, baths and the amenity summary all come from this one element.
+    "amenities": Field(".amenities"),
+    "available": Field("div.available"),
+    "apply_href": Field("a.apm-apply-now", attr="href"),
+    "tagline": Field(".tagline"),
+}
 
-async def scrape_wolfe() -> dict:
+async def scrape_wolfe(unchanged_hash: str | None = None) -> dict:
     listings = []
+    timer = PhaseTimer("wolfe")
+    pages = []
     
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        page = await browser.new_page()
-        
+    async with browser_manager.page() as page:
+        timer.lap("launch")
         for url in LISTING_URLS:
-            await page.goto(url, timeout=60000)
-            await page.wait_for_load_state("networkidle")
-            await asyncio.sleep(3)
-            
-            listing_elements = await page.query_selector_all(".listing-item, .js-listing-card, [data-listingid]")
-            
-            for element in listing_elements:
-                try:
-                    listing = await extract_listing_data(element)
-                    if listing:
-                        listings.append(listing)
-                except:
-                    continue
-        
-        await browser.close()
+            await load_listing_page(page, url, FETCH_POLICY, timer)
+            page_html = await page.content()
+            await save_snapshot("wolfe", page_html)
+            pages.append(page_html)
+            timer.lap("capture")
+    
+    digest = hashlib.sha1()
+    for page_html in pages:
+        digest.update((await parse_off_loop(region_hash, page_html, LISTING_SELECTOR)).encode())
+    content_hash = digest.hexdigest()
+    timer.lap("hash")
+    if content_hash == unchanged_hash:
+        return unchanged_result("wolfe", content_hash, timer)
+    
+    for page_html in pages:
+        listings.extend(await parse_off_loop(parse_listings, page_html))
+    timer.lap("parse")
     
+    timer.log()
     return {
         "listings": listings,
         "scraped_at": datetime.utcnow().isoformat() + "Z",
-        "source": "wolfe"
+        "source": "wolfe",
+        "timings": timer.as_dict(),
+        "content_hash": content_hash,
     }
 
-async def extract_listing_data(element) -> dict | None:
+def parse_listings(page_html: str) -> list[dict]:
+    """Listings from one rendered listings page. Runs in the parse pool."""
+    listings = []
+    for card in select_cards(page_html, LISTING_SELECTOR, FIELDS):
+        listing = extract_listing_data(card)
+        if listing:
+            listings.append(listing)
+    return listings
+
+def extract_listing_data(card: dict) -> dict | None:
     try:
-        link_el = await element.query_selector("a[href*='/listings/detail/']")
         listing_link = None
-        if link_el:
-            href = await link_el.get_attribute("href")
+        href = card["href"]
+        if href is not None:
             listing_link = f"https://www.rlwa.com{href}" if href.startswith("/") else href
         
-        address_el = await element.query_selector("h2.address")
-        address = (await address_el.inner_text()).strip() if address_el else None
+        address = card["address"].strip() if card["address"] is not None else None
         
-        price_el = await element.query_selector("h3.rent")
         rent_price = None
-        if price_el:
-            price_text = await price_el.inner_text()
+        price_text = card["rent_text"]
+        if price_text is not None:
             price_match = re.search(r'\$?\s*(\d{1,3}(?:,\d{3})*)', price_text)
             rent_price = int(price_match.group(1).replace(',', '')) if price_match else None
         
-        beds_el = await element.query_selector(".amenities")
+        amenities_text = card["amenities"]
         bedrooms = None
-        if beds_el:
-            beds_text = await beds_el.inner_text()
-            if re.search(r'studio', beds_text, re.IGNORECASE):
+        bathrooms = None
+        if amenities_text is not None:
+            if re.search(r'studio', amenities_text, re.IGNORECASE):
                 bedrooms = 0
             else:
-                beds_match = re.search(r'(\d+)\s*(?:bed|bedroom)', beds_text, re.IGNORECASE)
+                beds_match = re.search(r'(\d+)\s*(?:bed|bedroom)', amenities_text, re.IGNORECASE)
                 bedrooms = int(beds_match.group(1)) if beds_match else None
-        
-        baths_el = await element.query_selector(".amenities")
-        bathrooms = None
-        if baths_el:
-            baths_text = await baths_el.inner_text()
-            baths_match = re.search(r'(\d+(?:\.\d+)?)\s*(?:bath|bathroom)', baths_text, re.IGNORECASE)
+            baths_match = re.search(r'(\d+(?:\.\d+)?)\s*(?:bath|bathroom)', amenities_text, re.IGNORECASE)
             bathrooms = float(baths_match.group(1)) if baths_match else None
         
-        date_el = await element.query_selector("div.available")
-        date_available = (await date_el.inner_text()).strip() if date_el else None
+        date_available = card["available"].strip() if card["available"] is not None else None
         
-        app_link_el = await element.query_selector("a.apm-apply-now")
         application_link = None
-        if app_link_el:
-            app_href = await app_link_el.get_attribute("href")
-            if app_href:
-                application_link = app_href if app_href.startswith("http") else f"https://www.rlwa.com{app_href}"
+        app_href = card["apply_href"]
+        if app_href:
+            application_link = app_href if app_href.startswith("http") else f"https://www.rlwa.com{app_href}"
         
         if not application_link:
             application_link = "https://www.rlwa.com/forms"
         
         amenities = []
         
-        amenity_el = await element.query_selector(".amenities")
-        if amenity_el:
-            amenity_text = (await amenity_el.inner_text()).strip()
-            if amenity_text:
-                amenities.append(amenity_text)
+        if amenities_text and amenities_text.strip():
+            amenities.append(amenities_text.strip())
         
-        tagline_el = await element.query_selector(".tagline")
-        if tagline_el:
-            tagline_text = (await tagline_el.inner_text()).strip()
-            if tagline_text:
-                amenities.append(tagline_text)
+        tagline_text = (card["tagline"] or "").strip()
+        if tagline_text:
+            amenities.append(tagline_text)
         
         return {
             "listing_link": listing_link,
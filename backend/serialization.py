@@ -0,0 +1,58 @@
+"""
+JSON encoding for API responses, and the columnar listings wire format.
+
+dumps() uses orjson when it is installed and falls back to the standard
+library otherwise, so orjson stays an optional speed-up.
+
+The columnar format sends each field once instead of once per row:
+
+    {"columns": ["address", "source", ...],
+     "values": [[...addresses...], [0, 0, 1, ...], ...],
+     "dictionaries": {"source": ["koto", "meridian", ...], "category": [...]},
+     "count": 1234}
+
+values[i] holds column i for every row, in row order. Columns listed in
+dictionaries hold indexes into that list instead of the strings (null stays
+null). Rebuilding row objects on the client is a zip over values.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:  # optional, see requirements.txt
+    orjson = None
+
+# Low-cardinality text columns sent as dictionary indexes.
+DICTIONARY_COLUMNS = ("source", "category")
+
+
+def dumps(payload) -> bytes:
+    """Compact JSON bytes for payload."""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, separators=(",", ":")).encode()
+
+
+def to_columnar(columns: list[str], rows: list[tuple], dictionary_columns=DICTIONARY_COLUMNS) -> dict:
+    """Columnar form of rows (tuples in columns order), dictionary-encoding dictionary_columns."""
+    values = [list(column) for column in zip(*rows)] if rows else [[] for _ in columns]
+    dictionaries = {}
+    for name in dictionary_columns:
+        if name not in columns:
+            continue
+        i = columns.index(name)
+        index: dict = {}
+        values[i] = [None if v is None else index.setdefault(v, len(index)) for v in values[i]]
+        dictionaries[name] = list(index)
+    return {"columns": list(columns), "values": values, "dictionaries": dictionaries, "count": len(rows)}
+
+
+def from_columnar(payload: dict) -> list[dict]:
+    """Row dicts back from to_columnar output (for tests and benchmarks)."""
+    columns = payload["columns"]
+    values = []
+    for name, column in zip(columns, payload["values"]):
+        lookup = payload["dictionaries"].get(name)
+        values.append([None if v is None else lookup[v] for v in column] if lookup is not None else column)
+    return [dict(zip(columns, row)) for row in zip(*values)]
@@ -0,0 +1,113 @@
+"""
+The aiosqlite connection pool, and database.py's one-off connections when it
+is closed.
+
+Run from backend/:
+    python -m unittest discover tests
+"""
+
+import asyncio
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+import database
+from db_pool import ConnectionPool
+
+
+class ConnectionPoolTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.workdir = tempfile.mkdtemp(prefix="test-pool-")
+        self.path = os.path.join(self.workdir, "pool.db")
+        with sqlite3.connect(self.path) as db:
+            db.execute("CREATE TABLE t (v INTEGER)")
+        self.pool = ConnectionPool(self.path, readers=2)
+        await self.pool.open()
+
+    async def asyncTearDown(self):
+        await self.pool.close()
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    async def count(self) -> int:
+        async with self.pool.reader() as db:
+            cursor = await db.execute("SELECT COUNT(*) FROM t")
+            return (await cursor.fetchone())[0]
+
+    async def test_readers_are_query_only(self):
+        async with self.pool.reader() as db:
+            with self.assertRaisesRegex(sqlite3.OperationalError, "readonly"):
+                await db.execute("INSERT INTO t VALUES (1)")
+        async with self.pool.writer() as db:
+            await db.execute("INSERT INTO t VALUES (1)")
+            await db.commit()
+        self.assertEqual(await self.count(), 1)
+
+    async def test_writers_take_turns(self):
+        events = []
+
+        async def write(name: str):
+            async with self.pool.writer() as db:
+                events.append(f"{name} start")
+                await db.execute("INSERT INTO t VALUES (1)")
+                await asyncio.sleep(0.02)
+                await db.commit()
+                events.append(f"{name} end")
+
+        await asyncio.gather(write("a"), write("b"))
+        self.assertEqual(events, ["a start", "a end", "b start", "b end"])
+        stats = self.pool.stats()["write"]
+        self.assertEqual((stats["acquired"], stats["waited"]), (2, 1))
+
+    async def test_writer_rolls_back_on_error(self):
+        with self.assertRaises(RuntimeError):
+            async with self.pool.writer() as db:
+                await db.execute("INSERT INTO t VALUES (1)")
+                raise RuntimeError("boom")
+        async with self.pool.writer() as db:
+            await db.execute("INSERT INTO t VALUES (2)")
+            await db.commit()
+        async with self.pool.reader() as db:
+            cursor = await db.execute("SELECT v FROM t")
+            self.assertEqual([row[0] for row in await cursor.fetchall()], [2])
+
+    async def test_readers_wait_when_all_are_borrowed(self):
+        async with self.pool.reader(), self.pool.reader():
+            self.assertEqual(self.pool.stats()["readers_in_use"], 2)
+            waiting = asyncio.create_task(self.count())
+            await asyncio.sleep(0.02)
+            self.assertFalse(waiting.done())
+        self.assertEqual(await waiting, 0)
+        self.assertEqual(self.pool.stats()["readers_in_use"], 0)
+        self.assertEqual(self.pool.stats()["read"]["waited"], 1)
+
+
+class OneOffConnectionTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.workdir = tempfile.mkdtemp(prefix="test-pool-")
+        database.DB_PATH = os.path.join(self.workdir, "listings.db")
+        await database.init_db()
+
+    async def asyncTearDown(self):
+        await database.close_pool()
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    async def test_closed_pool_falls_back_to_one_off_connections(self):
+        self.assertIsNone(database.get_pool_stats())
+        await database.upsert_listings([{"address": "1 Sueno"}], "koto")
+        async with database._read() as db:
+            with self.assertRaisesRegex(sqlite3.OperationalError, "readonly"):
+                await db.execute("DELETE FROM listings")
+        self.assertEqual(len(await database.get_all_listings()), 1)
+
+        await database.open_pool()
+        await database.upsert_listings([{"address": "2 Sueno"}], "koto")
+        self.assertEqual(database.get_pool_stats()["write"]["acquired"], 1)
+        await database.close_pool()
+        self.assertIsNone(database.get_pool_stats())
+        self.assertEqual(len(await database.get_all_listings()), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
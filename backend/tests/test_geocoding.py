@@ -0,0 +1,131 @@
+"""
+Listing coordinates: the listings_rtree triggers, /listings/within queries and
+the geocode cache.
+
+Run from backend/:
+    python -m unittest discover tests
+"""
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+
+import database
+import geocoding
+
+
+class CountingGeocoder(geocoding.OfflineGeocoder):
+    """The offline geocoder, recording every address it is asked for; misses on `unknown`."""
+
+    def __init__(self, unknown: tuple[str, ...] = ()):
+        self.unknown = unknown
+        self.calls = []
+
+    async def geocode(self, address: str) -> tuple[float, float] | None:
+        self.calls.append(address)
+        if address in self.unknown:
+            return None
+        return await super().geocode(address)
+
+
+class GeocodingTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.workdir = tempfile.mkdtemp(prefix="test-geocoding-")
+        self.db_path = database.DB_PATH = os.path.join(self.workdir, "listings.db")
+        await database.init_db()
+
+    async def asyncTearDown(self):
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def rtree(self) -> dict[int, tuple]:
+        with sqlite3.connect(self.db_path) as db:
+            rows = db.execute("SELECT id, min_lat, min_lng FROM listings_rtree").fetchall()
+        return {id_: (lat, lng) for id_, lat, lng in rows}
+
+    def ids(self) -> dict[str, int]:
+        with sqlite3.connect(self.db_path) as db:
+            return dict(db.execute("SELECT address, id FROM listings").fetchall())
+
+    async def test_rtree_follows_inserts_updates_and_deletes(self):
+        with sqlite3.connect(self.db_path) as db:
+            db.execute(
+                "INSERT INTO listings (address, source, scraped_at, updated_at, lat, lng) "
+                "VALUES ('1 Pasado', 'koto', '', '', 34.41, -119.86)"
+            )
+            db.execute("INSERT INTO listings (address, source, scraped_at, updated_at) VALUES ('2 Pasado', 'koto', '', '')")
+        ids = self.ids()
+        self.assertEqual(set(self.rtree()), {ids["1 Pasado"]})
+
+        await database.set_listing_coords([(ids["2 Pasado"], 34.412, -119.862)])
+        self.assertAlmostEqual(self.rtree()[ids["2 Pasado"]][0], 34.412, places=4)
+        await database.set_listing_coords([(ids["2 Pasado"], 34.415, -119.855)])
+        self.assertAlmostEqual(self.rtree()[ids["2 Pasado"]][0], 34.415, places=4)
+
+        with sqlite3.connect(self.db_path) as db:
+            db.execute("UPDATE listings SET lat = NULL, lng = NULL WHERE address = '1 Pasado'")
+        self.assertEqual(set(self.rtree()), {ids["2 Pasado"]})
+        with sqlite3.connect(self.db_path) as db:
+            db.execute("DELETE FROM listings WHERE address = '2 Pasado'")
+        self.assertEqual(self.rtree(), {})
+
+    async def test_within_checks_exact_bounds_and_orders_by_price(self):
+        await database.upsert_listings(
+            [
+                {"address": "Edge", "price": 3000},
+                {"address": "Inside", "price": None},
+                {"address": "Cheap", "price": 1200},
+                {"address": "Just outside", "price": 900},
+            ],
+            "meridian",
+        )
+        ids = self.ids()
+        await database.set_listing_coords([
+            (ids["Edge"], 34.41, -119.86),
+            (ids["Inside"], 34.412, -119.858),
+            (ids["Cheap"], 34.413, -119.857),
+            # Within the R*Tree's 32-bit rounding of the box, but outside it.
+            (ids["Just outside"], 34.4150001, -119.857),
+        ])
+        found = await database.get_listings_within(34.41, -119.86, 34.415, -119.85)
+        self.assertEqual([row["address"] for row in found], ["Cheap", "Edge", "Inside"])
+        self.assertEqual(
+            [row["address"] for row in await database.get_listings_within(34.41, -119.86, 34.415, -119.85, limit=1)],
+            ["Cheap"],
+        )
+
+    async def test_geocode_cache_hits_and_retries_misses(self):
+        await database.upsert_listings(
+            [{"address": "6510 Del Playa Drive, Unit A"}, {"address": "Nowhere"}], "koto"
+        )
+        await database.upsert_listings([{"address": "6510 del playa dr #a"}], "wolfe")
+        geocoder = CountingGeocoder(unknown=("Nowhere",))
+
+        counts = await geocoding.geocode_missing("koto", geocoder)
+        self.assertEqual(counts, {"cached": 0, "geocoded": 1, "unresolved": 1})
+        self.assertEqual(sorted(geocoder.calls), ["6510 Del Playa Drive, Unit A", "Nowhere"])
+
+        # Same normalized address from another source: served from the cache.
+        geocoder.calls.clear()
+        counts = await geocoding.geocode_missing("wolfe", geocoder)
+        self.assertEqual(counts, {"cached": 1, "geocoded": 0, "unresolved": 0})
+        # A cached miss is not retried before GEOCODE_RETRY_DAYS...
+        counts = await geocoding.geocode_missing("koto", geocoder)
+        self.assertEqual(counts, {"cached": 0, "geocoded": 0, "unresolved": 1})
+        self.assertEqual(geocoder.calls, [])
+
+        # ...and is once it has expired.
+        expired = datetime.now(timezone.utc) - timedelta(days=geocoding.GEOCODE_RETRY_DAYS + 1)
+        with sqlite3.connect(self.db_path) as db:
+            db.execute("UPDATE geocode_cache SET geocoded_at = ? WHERE lat IS NULL", (expired.isoformat(),))
+        geocoder.unknown = ()
+        counts = await geocoding.geocode_missing("koto", geocoder)
+        self.assertEqual(counts, {"cached": 0, "geocoded": 1, "unresolved": 0})
+        self.assertEqual(geocoder.calls, ["Nowhere"])
+        self.assertEqual(len(self.rtree()), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
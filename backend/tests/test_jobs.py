@@ -0,0 +1,78 @@
+"""
+Scrape jobs and the per-source progress they report.
+
+Run from backend/:
+    python -m unittest discover tests
+"""
+
+import asyncio
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import database
+import scheduler
+from tests.test_retention import SOURCE, fake_scraper, listing
+
+
+class ScrapeJobCountsTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.workdir = tempfile.mkdtemp(prefix="test-jobs-")
+        database.DB_PATH = os.path.join(self.workdir, "listings.db")
+        await database.init_db()
+
+    async def asyncTearDown(self):
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    async def run_job(self, listings: list[dict], content_hash: str) -> dict:
+        with mock.patch.object(scheduler, "SCRAPERS", [(SOURCE, fake_scraper(listings, content_hash))]):
+            job = await scheduler.run_all_scrapers_to_db(trigger="test")
+        return job.snapshot()
+
+    async def test_job_reports_upsert_counts_per_source(self):
+        rows = [listing("1 Del Playa", 2000), listing("2 Del Playa", 2500)]
+        first = await self.run_job(rows, "h1")
+        self.assertEqual(first["sources"][SOURCE]["state"], "ok")
+        self.assertEqual(
+            first["sources"][SOURCE]["counts"],
+            {"inserted": 2, "updated": 0, "unchanged": 0, "retired": 0},
+        )
+
+        second = await self.run_job([listing("1 Del Playa", 2100)], "h2")
+        self.assertEqual(
+            second["sources"][SOURCE]["counts"],
+            {"inserted": 0, "updated": 1, "unchanged": 0, "retired": 1},
+        )
+        self.assertEqual(second["counts"]["retired"], 1)
+
+        skipped = await self.run_job([listing("1 Del Playa", 2100)], "h2")
+        self.assertEqual(skipped["sources"][SOURCE]["state"], "unchanged")
+        self.assertIsNone(skipped["sources"][SOURCE]["counts"])
+
+    async def test_single_source_scrape_joins_the_running_job(self):
+        calls = []
+        release = asyncio.Event()
+        scrape = fake_scraper([listing("1 Del Playa", 2000)], "h1")
+
+        async def slow_scrape(unchanged_hash=None):
+            calls.append(unchanged_hash)
+            await release.wait()
+            return await scrape(unchanged_hash)
+
+        with mock.patch.object(scheduler, "SCRAPERS", [(SOURCE, slow_scrape)]):
+            job, _ = scheduler.start_scrape_job(trigger="test")
+            await asyncio.sleep(0.05)
+            single = asyncio.create_task(scheduler.scrape_source(SOURCE))
+            await asyncio.sleep(0.05)
+            release.set()
+            outcome = await single
+            await job.wait()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(outcome["status"], "ok")
+        self.assertEqual(outcome["result"]["listings"][0]["address"], "1 Del Playa")
+
+
+if __name__ == "__main__":
+    unittest.main()
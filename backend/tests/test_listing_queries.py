@@ -0,0 +1,116 @@
+"""
+Keyset pagination cursors and index use of the /listings sorts.
+
+Run from backend/:
+    python -m unittest discover tests
+"""
+
+import base64
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+import database
+
+
+def encode(values) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+
+class ListingQueryTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.workdir = tempfile.mkdtemp(prefix="test-listings-")
+        self.db_path = database.DB_PATH = os.path.join(self.workdir, "listings.db")
+        await database.init_db()
+        await database.upsert_listings(
+            [{"address": f"{i} Sabado Tarde", "price": i * 100 or None, "bedrooms": i % 3 or None} for i in range(12)],
+            "koto",
+        )
+
+    async def asyncTearDown(self):
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    async def test_pages_cover_every_listing_once(self):
+        for sort in database.LISTING_SORTS:
+            seen, cursor = [], None
+            while True:
+                page = await database.query_listings({}, sort=sort, limit=5, cursor=cursor)
+                seen.extend(row["address"] for row in page["listings"])
+                cursor = page["next_cursor"]
+                if not cursor:
+                    break
+            self.assertEqual(len(seen), 12, sort)
+            self.assertEqual(len(set(seen)), 12, sort)
+
+    async def test_tuple_pages_match_dict_pages(self):
+        for sort in database.LISTING_SORTS:
+            cursors = [None, None]
+            while True:
+                rows = await database.query_listings({}, sort=sort, limit=5, cursor=cursors[0])
+                tuples = await database.query_listings({}, sort=sort, limit=5, cursor=cursors[1], as_tuples=True)
+                self.assertEqual(
+                    [tuple(row[c] for c in database.LISTING_COLUMNS) for row in rows["listings"]],
+                    tuples["listings"],
+                    sort,
+                )
+                self.assertEqual(rows["next_cursor"], tuples["next_cursor"], sort)
+                cursors = [rows["next_cursor"], tuples["next_cursor"]]
+                if not rows["next_cursor"]:
+                    break
+
+    async def test_malformed_cursors_raise_value_error(self):
+        page = await database.query_listings({}, sort="bedrooms_asc", limit=5)
+        bad = [
+            ("newest", "not base64!"),
+            ("newest", "WzEsIHt9LCAxXQ"),  # [1, {}, 1]
+            ("price_asc", encode(["price_asc", False, "x", 1])),
+            ("price_asc", encode(["price_asc", False, True, 1])),
+            ("price_asc", encode(["price_asc", True, 300, 1])),
+            ("newest", encode(["newest", True, None, 1])),
+            ("newest", encode(["newest", False, "2026-01-01", "1"])),
+            ("price_asc", page["next_cursor"]),  # made for bedrooms_asc
+        ]
+        for sort, cursor in bad:
+            with self.assertRaises(ValueError, msg=cursor):
+                await database.query_listings({}, sort=sort, cursor=cursor)
+
+    def test_every_sort_is_served_by_an_index(self):
+        with sqlite3.connect(self.db_path) as db:
+            for sort in database.LISTING_SORTS:
+                where, params = database._filter_clauses({"bedrooms_min": 1})
+                plan = db.execute(
+                    f"EXPLAIN QUERY PLAN SELECT id FROM listings WHERE {' AND '.join(where)} "
+                    f"ORDER BY {database._order_by(sort)} LIMIT 50",
+                    params,
+                ).fetchall()
+                details = " | ".join(row[3] for row in plan)
+                self.assertNotIn("TEMP B-TREE", details, sort)
+
+    async def test_scraped_listings_keep_the_scraper_shape(self):
+        wolfe = {
+            "address": "6500 Del Playa", "price": 3000, "bedrooms": 3, "bathrooms": 2.0,
+            "listing_link": "https://example.com/6500", "contact_info": "805-555-0100",
+        }
+        await database.upsert_listings([wolfe], "wolfe")
+        revision = (await database.get_listing_changes(0))["revision"]
+        # Only a scraper-specific field changed: stored, but not a new revision.
+        await database.upsert_listings([{**wolfe, "contact_info": "805-555-0199"}], "wolfe")
+        self.assertEqual((await database.get_listing_changes(0))["revision"], revision)
+
+        listings = await database.get_scraped_listings(["wolfe", "koto"])
+        self.assertEqual(listings["wolfe"], [{**wolfe, "contact_info": "805-555-0199", "source": "wolfe"}])
+        with sqlite3.connect(self.db_path) as db:
+            db.execute("UPDATE listings SET scraped_fields = NULL WHERE source = 'koto'")
+        rebuilt = (await database.get_scraped_listings(["koto"]))["koto"]
+        self.assertEqual(len(rebuilt), 12)
+        self.assertEqual(
+            set(rebuilt[1]),
+            {"listing_link", "address", "price", "bedrooms", "bathrooms", "category", "source"},
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+"""
+GET /listings through the ASGI app: ETags, 304s and generation-keyed cache
+invalidation.
+
+Run from backend/:
+    python -m unittest discover tests
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import httpx
+
+import database
+import main
+
+
+def listing(i: int) -> dict:
+    return {"address": f"{i} Trigo Road", "price": 1000 + i, "bedrooms": i % 4, "bathrooms": 1.0}
+
+
+class ListingsEndpointTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.workdir = tempfile.mkdtemp(prefix="test-endpoint-")
+        database.DB_PATH = os.path.join(self.workdir, "listings.db")
+        await database.init_db()
+        await database.upsert_listings([listing(i) for i in range(3)], "koto")
+        self.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://test")
+
+    async def asyncTearDown(self):
+        await self.client.aclose()
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    async def test_matching_etag_gets_304(self):
+        first = await self.client.get("/listings", params={"sort": "price_asc"})
+        self.assertEqual(first.status_code, 200)
+        etag = first.headers["etag"]
+        self.assertRegex(etag, r'^"[0-9a-f]{32}"$')
+        self.assertIn("Accept", first.headers["vary"])
+
+        params = {"sort": "price_asc"}
+        for header in (etag, f'"other", {etag}', "*"):
+            response = await self.client.get("/listings", params=params, headers={"If-None-Match": header})
+            self.assertEqual(response.status_code, 304, header)
+            self.assertEqual(response.headers["etag"], etag)
+            self.assertEqual(response.content, b"")
+        stale = await self.client.get("/listings", params=params, headers={"If-None-Match": '"other"'})
+        self.assertEqual(stale.status_code, 200)
+        self.assertEqual(stale.content, first.content)
+
+    async def test_responses_are_cached_per_query_until_the_data_changes(self):
+        stats = main._listings_cache.stats
+        first = await self.client.get("/listings")
+        hits = stats()["hits"]
+        self.assertEqual((await self.client.get("/listings")).headers["etag"], first.headers["etag"])
+        self.assertEqual(stats()["hits"], hits + 1)
+        other = await self.client.get("/listings", params={"limit": 2})
+        self.assertNotEqual(other.headers["etag"], first.headers["etag"])
+        self.assertEqual(stats()["hits"], hits + 1)
+
+        await database.upsert_listings([listing(9)], "koto")
+        self.assertEqual(stats()["entries"], 2)
+        response = await self.client.get("/listings", headers={"If-None-Match": first.headers["etag"]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["total"], 4)
+        self.assertEqual(stats()["entries"], 1)
+
+    async def test_an_upsert_that_changes_nothing_keeps_listings_but_refreshes_per_source(self):
+        first = await self.client.get("/listings")
+        await database.upsert_listings([listing(i) for i in range(3)], "koto")
+        response = await self.client.get("/listings", headers={"If-None-Match": first.headers["etag"]})
+        # last_success_at moved, so the body (and ETag) did too.
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["listings"], first.json()["listings"])
+
+    async def test_unchanged_page_check_changes_the_etag(self):
+        first = await self.client.get("/listings")
+        etag = first.headers["etag"]
+        await database.record_page_check("koto", "h1", skipped=True)
+
+        response = await self.client.get("/listings", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["etag"], etag)
+        stats = await database.get_scrape_metadata()
+        self.assertEqual(
+            response.json()["per_source"]["koto"]["last_success_at"],
+            stats["sources"]["koto"]["last_success_at"],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
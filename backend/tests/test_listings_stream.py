@@ -0,0 +1,99 @@
+"""
+NDJSON streaming of /listings: batch boundaries, filters, and the pooled
+reader being released between batches.
+
+Run from backend/:
+    python -m unittest discover tests
+"""
+
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import httpx
+
+import database
+import main
+
+ROWS = 1203  # over two LISTING_STREAM_BATCH boundaries
+
+
+class ListingsStreamTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.workdir = tempfile.mkdtemp(prefix="test-stream-")
+        database.DB_PATH = os.path.join(self.workdir, "listings.db")
+        await database.init_db()
+        await database.upsert_listings(
+            [
+                {"address": f"{i} Camino Pescadero", "price": (i * 37) % 1000 or None, "bedrooms": i % 5}
+                for i in range(ROWS)
+            ],
+            "wolfe",
+        )
+        self.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://test")
+
+    async def asyncTearDown(self):
+        await self.client.aclose()
+        await database.close_pool()
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    async def stream(self, headers=None, **params) -> tuple[httpx.Response, list[dict]]:
+        response = await self.client.get("/listings", params=params, headers=headers)
+        lines = response.text.splitlines() if response.status_code == 200 else []
+        return response, [json.loads(line) for line in lines]
+
+    async def test_streams_every_row_once_across_batches(self):
+        response, rows = await self.stream(format="ndjson", sort="price_asc")
+        self.assertEqual(response.headers["content-type"], main.NDJSON_MEDIA_TYPE)
+        self.assertEqual(len(rows), ROWS)
+        self.assertEqual(len({row["address"] for row in rows}), ROWS)
+        prices = [row["price"] for row in rows]
+        known = [p for p in prices if p is not None]
+        self.assertEqual(known, sorted(known))
+        self.assertEqual(prices[len(known):], [None] * (ROWS - len(known)))
+        self.assertEqual(set(rows[0]), set(database.LISTING_COLUMNS))
+
+        _, by_accept = await self.stream(headers={"Accept": main.NDJSON_MEDIA_TYPE}, sort="price_asc")
+        self.assertEqual(by_accept, rows)
+
+    async def test_filters_and_limit(self):
+        matching = sum(1 for i in range(ROWS) if i % 5 >= 2)
+        _, rows = await self.stream(format="ndjson", bedrooms_min=2)
+        self.assertEqual(len(rows), matching)
+        self.assertTrue(all(row["bedrooms"] >= 2 for row in rows))
+        _, rows = await self.stream(format="ndjson", bedrooms_min=2, sort="newest", limit=450)
+        self.assertEqual(len(rows), 450)
+
+    async def test_rejects_cursor_and_answers_if_none_match(self):
+        response, _ = await self.stream(format="ndjson", cursor="abc")
+        self.assertEqual(response.status_code, 400)
+
+        first, _ = await self.stream(format="ndjson")
+        etag = first.headers["etag"]
+        again, _ = await self.stream(headers={"If-None-Match": etag}, format="ndjson")
+        self.assertEqual(again.status_code, 304)
+        await database.upsert_listings([{"address": "1 New Row"}], "wolfe")
+        changed, rows = await self.stream(headers={"If-None-Match": etag}, format="ndjson")
+        self.assertEqual(changed.status_code, 200)
+        self.assertEqual(len(rows), ROWS + 1)
+
+    async def test_reader_is_returned_between_batches(self):
+        database.DB_POOL_SIZE, pool_size = 1, database.DB_POOL_SIZE
+        try:
+            await database.open_pool()
+        finally:
+            database.DB_POOL_SIZE = pool_size
+        batches = 0
+        async for batch in database.stream_listings({}, batch_size=500):
+            batches += 1
+            self.assertEqual(database.get_pool_stats()["readers_in_use"], 0)
+            # The only reader is free, so another query does not wait for the stream.
+            await asyncio.wait_for(database.get_scrape_metadata(), timeout=1)
+        self.assertEqual(batches, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
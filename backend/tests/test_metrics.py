@@ -0,0 +1,72 @@
+"""
+Prometheus text output of metrics.py.
+
+Run from backend/:
+    python -m unittest discover tests
+"""
+
+import unittest
+from unittest import mock
+
+import metrics
+
+
+class RenderTest(unittest.TestCase):
+    def test_exact_text_of_a_known_registry(self):
+        with mock.patch.object(metrics, "_registry", []):
+            requests = metrics.Counter("demo_requests_total", "Requests handled.", ("route", "status"))
+            in_flight = metrics.Gauge("demo_in_flight", "Requests in flight.")
+            latency = metrics.Histogram("demo_seconds", "Latency.", ("route",), buckets=(0.1, 1))
+
+            requests.inc("/listings", 200)
+            requests.inc("/listings", 200, amount=2)
+            requests.inc('/a "b"\\c\nd', 500)
+            in_flight.set(1.5)
+            for value in (0.05, 0.1, 0.5, 3):
+                latency.observe(value, "/listings")
+            text = metrics.render()
+
+        self.assertEqual(
+            text,
+            "# HELP demo_requests_total Requests handled.\n"
+            "# TYPE demo_requests_total counter\n"
+            'demo_requests_total{route="/a \\"b\\"\\\\c\\nd",status="500"} 1\n'
+            'demo_requests_total{route="/listings",status="200"} 3\n'
+            "# HELP demo_in_flight Requests in flight.\n"
+            "# TYPE demo_in_flight gauge\n"
+            "demo_in_flight 1.5\n"
+            "# HELP demo_seconds Latency.\n"
+            "# TYPE demo_seconds histogram\n"
+            'demo_seconds_bucket{route="/listings",le="0.1"} 2\n'
+            'demo_seconds_bucket{route="/listings",le="1"} 3\n'
+            'demo_seconds_bucket{route="/listings",le="+Inf"} 4\n'
+            'demo_seconds_sum{route="/listings"} 3.65\n'
+            'demo_seconds_count{route="/listings"} 4\n',
+        )
+
+    def test_set_total_mirrors_a_running_total(self):
+        with mock.patch.object(metrics, "_registry", []):
+            launches = metrics.Counter("demo_launches_total", "Launches.")
+            launches.set_total(7)
+            self.assertEqual(metrics.render().splitlines()[-1], "demo_launches_total 7")
+
+    def test_label_count_is_checked(self):
+        with mock.patch.object(metrics, "_registry", []):
+            counter = metrics.Counter("demo_total", "Demo.", ("source",))
+            with self.assertRaises(ValueError):
+                counter.inc()
+
+    def test_app_counters_are_named_total(self):
+        import main  # noqa: F401  (registers the app's metrics)
+
+        counters = [m.name for m in metrics._registry if isinstance(m, metrics.Counter)]
+        self.assertTrue(counters)
+        for name in counters:
+            self.assertTrue(name.endswith("_total"), name)
+        gauges = [m.name for m in metrics._registry if isinstance(m, metrics.Gauge)]
+        for name in gauges:
+            self.assertFalse(name.endswith("_total"), name)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+"""
+Retirement and purge of listings that disappear from their source.
+
+Run from backend/:
+    python -m unittest discover tests
+"""
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+
+import database
+import scheduler
+
+SOURCE = "meridian"
+
+
+def listing(address: str, price: int) -> dict:
+    return {"address": address, "price": price, "bedrooms": 2, "bathrooms": 1.0, "source": SOURCE}
+
+
+def fake_scraper(listings: list[dict], content_hash: str):
+    """A scraper that reports `listings`, or unchanged when the stored hash matches."""
+
+    async def scrape(unchanged_hash: str | None = None) -> dict:
+        if unchanged_hash == content_hash:
+            return {"listings": [], "unchanged": True, "content_hash": content_hash, "source": SOURCE}
+        return {"listings": listings, "content_hash": content_hash, "source": SOURCE}
+
+    return scrape
+
+
+async def scrape(listings: list[dict], content_hash: str) -> str:
+    return (await scheduler.scrape_source_to_db(SOURCE, fake_scraper(listings, content_hash)))["status"]
+
+
+class RetireAfterUnchangedSkipsTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.workdir = tempfile.mkdtemp(prefix="test-retention-")
+        self.db_path = database.DB_PATH = os.path.join(self.workdir, "listings.db")
+        await database.init_db()
+
+    async def asyncTearDown(self):
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def backdate(self, days: float):
+        """Move every stored timestamp of SOURCE `days` into the past."""
+        then = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
+        with sqlite3.connect(self.db_path) as db:
+            db.execute("UPDATE source_stats SET last_success_at = ?, last_updated = ?", (then, then))
+            db.execute("UPDATE page_hashes SET checked_at = ?, changed_at = ?", (then, then))
+            db.execute("UPDATE listings SET scraped_at = ?, updated_at = ?, last_seen_at = ?", (then, then, then))
+
+    async def test_removal_after_quiet_period_is_not_purged(self):
+        both = [listing("1 Del Playa", 2000), listing("2 Del Playa", 2500)]
+        self.assertEqual(await scrape(both, "h1"), "ok")
+        # The page then stays the same for longer than the retention period...
+        self.backdate(scheduler.LISTING_RETENTION_DAYS + 10)
+        self.assertEqual(await scrape(both, "h1"), "unchanged")
+        # ...until one unit drops off it.
+        self.assertEqual(await scrape(both[:1], "h2"), "ok")
+
+        purged = await database.purge_inactive_listings(scheduler.LISTING_RETENTION_DAYS)
+        self.assertEqual(purged, 0)
+        with sqlite3.connect(self.db_path) as db:
+            active, last_seen_at = db.execute(
+                "SELECT active, last_seen_at FROM listings WHERE address = '2 Del Playa'"
+            ).fetchone()
+        self.assertEqual(active, 0)
+        age = datetime.now(timezone.utc) - datetime.fromisoformat(last_seen_at)
+        self.assertLess(age, timedelta(minutes=5))
+
+    async def test_unchanged_skip_advances_last_success(self):
+        rows = [listing("1 Del Playa", 2000)]
+        await scrape(rows, "h1")
+        self.backdate(3)
+        await scrape(rows, "h1")
+        meta = await database.get_scrape_metadata()
+        last_success = datetime.fromisoformat(meta["sources"][SOURCE]["last_success_at"])
+        self.assertLess(datetime.now(timezone.utc) - last_success, timedelta(minutes=5))
+
+    async def test_unchanged_run_records_no_listing_count(self):
+        rows = [listing("1 Del Playa", 2000)]
+        await scrape(rows, "h1")
+        await scrape(rows, "h1")
+        runs = (await database.get_recent_scrape_runs(10))[SOURCE]
+        self.assertEqual([(r["status"], r["listing_count"]) for r in runs], [("unchanged", None), ("ok", 1)])
+
+
+if __name__ == "__main__":
+    unittest.main()
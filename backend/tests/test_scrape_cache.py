@@ -0,0 +1,130 @@
+"""
+The per-source /scrape/{source} result cache.
+
+Run from backend/:
+    python -m unittest discover tests
+"""
+
+import asyncio
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import scrape_cache
+
+import database
+import main
+import scheduler
+from scrape_cache import ScrapeResultCache
+
+
+class FakeScraper:
+    """A scraper coroutine that counts its calls and can be held until released."""
+
+    def __init__(self, fail: bool = False):
+        self.calls = 0
+        self.fail = fail
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def __call__(self) -> dict:
+        self.calls += 1
+        await self.release.wait()
+        if self.fail:
+            raise RuntimeError("page did not load")
+        return {"listings": [{"address": f"run {self.calls}"}]}
+
+
+class ScrapeResultCacheTest(unittest.IsolatedAsyncioTestCase):
+    async def test_hit_within_ttl_and_miss_after_it(self):
+        cache = ScrapeResultCache(ttl_seconds=60)
+        scraper = FakeScraper()
+        clock = [1000.0]
+        with mock.patch.object(scrape_cache.time, "monotonic", lambda: clock[0]):
+            first, outcome = await cache.get("koto", scraper)
+            self.assertEqual(outcome, "miss")
+            clock[0] += 59
+            again, outcome = await cache.get("koto", scraper)
+            self.assertEqual((outcome, again), ("hit", first))
+            clock[0] += 2
+            fresh, outcome = await cache.get("koto", scraper)
+        self.assertEqual(outcome, "miss")
+        self.assertEqual(fresh["listings"][0]["address"], "run 2")
+        self.assertEqual(scraper.calls, 2)
+
+    async def test_concurrent_callers_share_one_scrape(self):
+        cache = ScrapeResultCache(ttl_seconds=60)
+        scraper = FakeScraper()
+        scraper.release.clear()
+        waiting = [asyncio.create_task(cache.get("koto", scraper)) for _ in range(3)]
+        await asyncio.sleep(0)
+        scraper.release.set()
+        results = await asyncio.gather(*waiting)
+        self.assertEqual(scraper.calls, 1)
+        self.assertEqual(sorted(outcome for _, outcome in results), ["coalesced", "coalesced", "miss"])
+        self.assertTrue(all(result is results[0][0] for result, _ in results))
+
+    async def test_force_skips_the_cached_result_but_joins_a_running_scrape(self):
+        cache = ScrapeResultCache(ttl_seconds=60)
+        scraper = FakeScraper()
+        await cache.get("koto", scraper)
+        result, outcome = await cache.get("koto", scraper, force=True)
+        self.assertEqual((outcome, scraper.calls), ("forced", 2))
+        self.assertEqual(result["listings"][0]["address"], "run 2")
+
+        scraper.release.clear()
+        running = asyncio.create_task(cache.get("koto", scraper, force=True))
+        await asyncio.sleep(0)
+        joined = asyncio.create_task(cache.get("koto", scraper, force=True))
+        await asyncio.sleep(0)
+        scraper.release.set()
+        self.assertEqual([(await running)[1], (await joined)[1]], ["forced", "coalesced"])
+        self.assertEqual(scraper.calls, 3)
+
+    async def test_errors_reach_every_caller_and_are_not_cached(self):
+        cache = ScrapeResultCache(ttl_seconds=60)
+        scraper = FakeScraper(fail=True)
+        scraper.release.clear()
+        waiting = [asyncio.create_task(cache.get("koto", scraper)) for _ in range(2)]
+        await asyncio.sleep(0)
+        scraper.release.set()
+        for outcome in await asyncio.gather(*waiting, return_exceptions=True):
+            self.assertIsInstance(outcome, RuntimeError)
+
+        scraper.fail = False
+        result, outcome = await cache.get("koto", scraper)
+        self.assertEqual(outcome, "miss")
+        self.assertEqual(scraper.calls, 2)
+        stats = cache.stats()["sources"]["koto"]
+        self.assertEqual((stats["miss"], stats["coalesced"], stats["error"]), (2, 1, 1))
+
+
+class ScrapeEndpointCacheTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.workdir = tempfile.mkdtemp(prefix="test-scrape-cache-")
+        database.DB_PATH = os.path.join(self.workdir, "listings.db")
+        await database.init_db()
+
+    async def asyncTearDown(self):
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    async def test_empty_scrape_is_not_cached(self):
+        calls = []
+
+        async def empty_scrape(unchanged_hash=None):
+            calls.append(unchanged_hash)
+            return {"listings": [], "error": "no cards matched", "source": "koto"}
+
+        cache = ScrapeResultCache(ttl_seconds=300)
+        with mock.patch.object(scheduler, "SCRAPERS", [("koto", empty_scrape)]):
+            for _ in range(2):
+                with self.assertRaisesRegex(RuntimeError, "no cards matched"):
+                    await cache.get("koto", lambda: main._scrape_to_db("koto"))
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(cache.stats()["sources"]["koto"]["error"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+"""
+The columnar listings wire format.
+
+Run from backend/:
+    python -m unittest discover tests
+"""
+
+import json
+import unittest
+from unittest import mock
+
+import serialization
+from serialization import from_columnar, to_columnar
+
+COLUMNS = ["address", "source", "price", "category"]
+ROWS = [
+    ("1 El Nido", "koto", 1800, "Residential"),
+    ("2 El Nido", "wolfe", None, None),
+    ("3 El Nido", "koto", 2400, "Commercial"),
+    ("4 El Nido", "meridian", 2100, "Residential"),
+]
+
+
+class ColumnarTest(unittest.TestCase):
+    def test_exact_encoding(self):
+        self.assertEqual(
+            to_columnar(COLUMNS, ROWS),
+            {
+                "columns": COLUMNS,
+                "values": [
+                    ["1 El Nido", "2 El Nido", "3 El Nido", "4 El Nido"],
+                    [0, 1, 0, 2],
+                    [1800, None, 2400, 2100],
+                    [0, None, 1, 0],
+                ],
+                "dictionaries": {"source": ["koto", "wolfe", "meridian"], "category": ["Residential", "Commercial"]},
+                "count": 4,
+            },
+        )
+
+    def test_round_trip(self):
+        rows = from_columnar(json.loads(serialization.dumps(to_columnar(COLUMNS, ROWS))))
+        self.assertEqual(rows, [dict(zip(COLUMNS, row)) for row in ROWS])
+
+    def test_empty_and_without_dictionary_columns(self):
+        empty = to_columnar(COLUMNS, [])
+        self.assertEqual((empty["values"], empty["count"]), ([[], [], [], []], 0))
+        self.assertEqual(from_columnar(empty), [])
+
+        plain = to_columnar(["address", "price"], [("1 El Nido", 1800)])
+        self.assertEqual(plain["dictionaries"], {})
+        self.assertEqual(plain["values"], [["1 El Nido"], [1800]])
+
+    def test_dumps_with_and_without_orjson(self):
+        payload = {"listings": to_columnar(COLUMNS, ROWS), "next_cursor": None, "total": 4}
+        self.assertEqual(json.loads(serialization.dumps(payload)), payload)
+        with mock.patch.object(serialization, "orjson", None):
+            self.assertEqual(serialization.dumps(payload), json.dumps(payload, separators=(",", ":")).encode())
+
+
+if __name__ == "__main__":
+    unittest.main()
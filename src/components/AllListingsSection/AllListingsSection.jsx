@@ -3,6 +3,7 @@ import ListingList from '../ListingList';
 import './AllListingsSection.css';
 
 const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
+const REFRESH_POLL_MS = 2000;
 
 const SOURCE_LABELS = {
   meridian: 'Meridian Group',
@@ -21,6 +22,7 @@ function AllListingsSection() {
   const [selectedListingIds, setSelectedListingIds] = useState([]);
   const [selectedListingsMap, setSelectedListingsMap] = useState({});
   const [shareMessage, setShareMessage] = useState('');
+  const [refreshProgress, setRefreshProgress] = useState(null);
 
   // Filters
   const [priceMin, setPriceMin] = useState('');
@@ -47,14 +49,30 @@ function AllListingsSection() {
     }
   };
 
+  // The refresh endpoint returns a job right away; poll it until the scrape finishes.
   const handleRefresh = async () => {
     setLoading(true);
     setError(null);
     try {
       const response = await fetch(`${API_URL}/listings/refresh`, { method: 'POST' });
       if (!response.ok) throw new Error(`HTTP ${response.status}`);
+      let job = await response.json();
+      while (job.status === 'running') {
+        setRefreshProgress({ completed: job.completed, total: job.total });
+        await new Promise((resolve) => setTimeout(resolve, REFRESH_POLL_MS));
+        const statusResponse = await fetch(`${API_URL}/listings/refresh/${job.job_id}`);
+        if (!statusResponse.ok) throw new Error(`HTTP ${statusResponse.status}`);
+        job = await statusResponse.json();
+      }
+      setRefreshProgress(null);
+      if (job.status === 'failed') throw new Error(job.error || 'Scrape failed');
+      const failed = Object.entries(job.sources || {})
+        .filter(([, progress]) => progress.state === 'failed' || progress.state === 'empty')
+        .map(([source]) => SOURCE_LABELS[source] || source);
       await loadListings();
+      if (failed.length) setError(`Could not refresh: ${failed.join(', ')}`);
     } catch (err) {
+      setRefreshProgress(null);
       setError(err.message || 'Failed to refresh listings');
       setLoading(false);
     }
@@ -211,7 +229,9 @@ function AllListingsSection() {
             onClick={handleRefresh}
             disabled={loading}
           >
-            {loading ? 'Scraping…' : 'Re-scrape all sources'}
+            {refreshProgress
+              ? `Scraping… ${refreshProgress.completed}/${refreshProgress.total}`
+              : loading ? 'Scraping…' : 'Re-scrape all sources'}
           </button>
           {lastScraped && (
             <span className="all-listings-meta">
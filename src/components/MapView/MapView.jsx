@@ -11,6 +11,8 @@ const mapContainerStyle = {
   height: '500px',
 };
 
+const LOCALITY_HINTS = ['isla vista', 'goleta', 'santa barbara'];
+
 const mapOptions = {
   disableDefaultUI: false,
   zoomControl: true,
@@ -19,85 +21,100 @@ const mapOptions = {
 };
 
 function MapView() {
-  const [listings, setListings] = useState([]);
   const [markers, setMarkers] = useState([]);
+  const [fallbackMarkers, setFallbackMarkers] = useState([]);
+  const [truncated, setTruncated] = useState(false);
   const [selectedMarker, setSelectedMarker] = useState(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
-  const geocoderRef = useRef(null);
+  const mapRef = useRef(null);
+  const abortRef = useRef(null);
   const cacheRef = useRef({});
 
   const { isLoaded, loadError } = useJsApiLoader({
     googleMapsApiKey: import.meta.env.VITE_GOOGLE_MAPS_API_KEY,
   });
 
-  // Fetch listings from backend
+  // Coordinates are geocoded on the server; fetch only the listings in the viewport.
+  const fetchViewport = useCallback(async () => {
+    const bounds = mapRef.current?.getBounds();
+    if (!bounds) return;
+    const sw = bounds.getSouthWest();
+    const ne = bounds.getNorthEast();
+    const bbox = [sw.lng(), sw.lat(), ne.lng(), ne.lat()].map((v) => v.toFixed(6)).join(',');
+
+    abortRef.current?.abort();
+    const controller = new AbortController();
+    abortRef.current = controller;
+    setLoading(true);
+    try {
+      const res = await fetch(`${API_URL}/listings/within?bbox=${bbox}`, { signal: controller.signal });
+      if (!res.ok) throw new Error(`HTTP ${res.status}`);
+      const data = await res.json();
+      setMarkers(
+        (data.listings || []).map((listing) => ({
+          ...listing,
+          position: { lat: listing.lat, lng: listing.lng },
+        }))
+      );
+      setTruncated(Boolean(data.truncated));
+      setError(null);
+    } catch (err) {
+      if (err.name === 'AbortError') return;
+      setError(err.message || 'Failed to load listings');
+    }
+    setLoading(false);
+  }, []);
+
+  const handleLoad = useCallback((map) => {
+    mapRef.current = map;
+  }, []);
+
+  // Listings the server has no coordinates for (all of them when no GEOCODER
+  // is configured) are geocoded here in the browser, once per page load.
   useEffect(() => {
-    const fetchListings = async () => {
+    if (!isLoaded) return;
+    let cancelled = false;
+    const geocodeUnlocated = async () => {
       try {
-        const res = await fetch(`${API_URL}/listings`);
+        const res = await fetch(`${API_URL}/listings/unlocated`);
         if (!res.ok) throw new Error(`HTTP ${res.status}`);
         const data = await res.json();
-        setListings(data.listings || []);
+        const geocoder = new window.google.maps.Geocoder();
+        const located = await Promise.all(
+          (data.listings || []).map(async (listing) => {
+            const address = listing.address;
+            if (!cacheRef.current[address]) {
+              const lowered = address.toLowerCase();
+              const query = LOCALITY_HINTS.some((hint) => lowered.includes(hint))
+                ? address
+                : `${address}, Isla Vista, CA`;
+              try {
+                const { results } = await geocoder.geocode({ address: query });
+                if (!results[0]) return null;
+                cacheRef.current[address] = {
+                  lat: results[0].geometry.location.lat(),
+                  lng: results[0].geometry.location.lng(),
+                };
+              } catch {
+                return null;
+              }
+            }
+            return { ...listing, position: cacheRef.current[address] };
+          })
+        );
+        if (!cancelled) setFallbackMarkers(located.filter(Boolean));
       } catch (err) {
-        setError(err.message || 'Failed to load listings');
+        if (!cancelled) setError(err.message || 'Failed to load listings');
       }
     };
-    fetchListings();
-  }, []);
-
-  // Geocode listings once the map API is loaded and listings are available
-  const geocodeListings = useCallback(() => {
-    if (!isLoaded || listings.length === 0) return;
-
-    if (!geocoderRef.current) {
-      geocoderRef.current = new window.google.maps.Geocoder();
-    }
-
-    const geocoder = geocoderRef.current;
-    const newMarkers = [];
-    let pending = listings.length;
-
-    const done = () => {
-      pending--;
-      if (pending === 0) {
-        setMarkers(newMarkers);
-        setLoading(false);
-      }
+    geocodeUnlocated();
+    return () => {
+      cancelled = true;
     };
+  }, [isLoaded]);
 
-    listings.forEach((listing) => {
-      const address = listing.address;
-
-      // Use cache if available
-      if (cacheRef.current[address]) {
-        newMarkers.push({ ...listing, position: cacheRef.current[address] });
-        done();
-        return;
-      }
-
-      // Append "Isla Vista, CA" for better geocoding accuracy
-      const query = address.toLowerCase().includes('isla vista') || address.toLowerCase().includes('goleta') || address.toLowerCase().includes('santa barbara')
-        ? address
-        : `${address}, Isla Vista, CA`;
-
-      geocoder.geocode({ address: query }, (results, status) => {
-        if (status === 'OK' && results[0]) {
-          const pos = {
-            lat: results[0].geometry.location.lat(),
-            lng: results[0].geometry.location.lng(),
-          };
-          cacheRef.current[address] = pos;
-          newMarkers.push({ ...listing, position: pos });
-        }
-        done();
-      });
-    });
-  }, [isLoaded, listings]);
-
-  useEffect(() => {
-    geocodeListings();
-  }, [geocodeListings]);
+  useEffect(() => () => abortRef.current?.abort(), []);
 
   const formatPrice = (price) => {
     if (price === null || price === undefined) return 'Price N/A';
@@ -119,17 +136,17 @@ function MapView() {
         See all listings on the map. Click a pin for details.
       </p>
       {error && <div className="map-error">{error}</div>}
-      {loading && listings.length > 0 && (
-        <p className="map-geocoding-status">Geocoding addresses...</p>
-      )}
+      {loading && <p className="map-geocoding-status">Loading listings...</p>}
       <div className="map-container">
         <GoogleMap
           mapContainerStyle={mapContainerStyle}
           center={ISLA_VISTA_CENTER}
           zoom={15}
           options={mapOptions}
+          onLoad={handleLoad}
+          onIdle={fetchViewport}
         >
-          {markers.map((marker, idx) => (
+          {[...markers, ...fallbackMarkers].map((marker, idx) => (
             <Marker
               key={`${marker.address}-${marker.source}-${idx}`}
               position={marker.position}
@@ -149,9 +166,9 @@ function MapView() {
                   {selectedMarker.bathrooms != null ? ` | ${selectedMarker.bathrooms} bath` : ''}
                 </p>
                 <p className="map-info-source">Source: {selectedMarker.source}</p>
-                {selectedMarker.listing_link && (
+                {selectedMarker.url && (
                   <a
-                    href={selectedMarker.listing_link}
+                    href={selectedMarker.url}
                     target="_blank"
                     rel="noopener noreferrer"
                     className="map-info-link"
@@ -165,7 +182,8 @@ function MapView() {
         </GoogleMap>
       </div>
       <p className="map-marker-count">
-        {markers.length} of {listings.length} listings mapped
+        {markers.length} listings in view{truncated ? ' (zoom in to see all)' : ''}
+        {fallbackMarkers.length > 0 && ` + ${fallbackMarkers.length} located in the browser`}
       </p>
     </div>
   );